@@ -0,0 +1,57 @@
+"""sprint_107_entity_concepts
+
+Revision ID: 3e9a51c7b2d8
+Revises: 5b0e7d3c91a4
+Create Date: 2026-10-19 16:21:05.318274
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3e9a51c7b2d8'
+down_revision: Union[str, Sequence[str], None] = '5b0e7d3c91a4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Add concepts dictionary and entity_concepts index tables (Sprint 107).
+
+    Both start empty; backend/analyzers/concept_index.py fills them from
+    raw_entities.enrichment_concepts on its first sync.
+    """
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    if not inspector.has_table('concepts'):
+        op.create_table(
+            'concepts',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('label', sa.String(), nullable=False),
+            sa.PrimaryKeyConstraint('id'),
+        )
+        with op.batch_alter_table('concepts') as batch_op:
+            batch_op.create_index('ix_concepts_id', ['id'], unique=False)
+            batch_op.create_index('ix_concepts_label', ['label'], unique=True)
+    if not inspector.has_table('entity_concepts'):
+        op.create_table(
+            'entity_concepts',
+            sa.Column('entity_id', sa.Integer(), nullable=False),
+            sa.Column('concept_id', sa.Integer(), nullable=False),
+            sa.Column('domain', sa.String(), nullable=False),
+            sa.Column('updated_at', sa.DateTime(), nullable=True),
+            sa.PrimaryKeyConstraint('entity_id', 'concept_id'),
+        )
+        with op.batch_alter_table('entity_concepts') as batch_op:
+            batch_op.create_index(
+                'ix_entity_concepts_domain_concept', ['domain', 'concept_id'], unique=False
+            )
+
+
+def downgrade() -> None:
+    """Remove concepts and entity_concepts tables."""
+    op.drop_table('entity_concepts')
+    op.drop_table('concepts')
@@ -0,0 +1,35 @@
+"""sprint_100_raw_entities_updated_at
+
+Revision ID: 5b0e7d3c91a4
+Revises: c4b6cf8f8f13
+Create Date: 2026-10-19 14:02:17.530912
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b0e7d3c91a4'
+down_revision: Union[str, Sequence[str], None] = 'c4b6cf8f8f13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Add raw_entities.updated_at used as the OLAP replica watermark (Sprint 100)."""
+    bind = op.get_bind()
+    columns = {c['name'] for c in sa.inspect(bind).get_columns('raw_entities')}
+    if 'updated_at' not in columns:
+        with op.batch_alter_table('raw_entities') as batch_op:
+            batch_op.add_column(sa.Column('updated_at', sa.DateTime(), nullable=True))
+            batch_op.create_index('ix_raw_entities_updated_at', ['updated_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Remove raw_entities.updated_at."""
+    with op.batch_alter_table('raw_entities') as batch_op:
+        batch_op.drop_index('ix_raw_entities_updated_at')
+        batch_op.drop_column('updated_at')
@@ -0,0 +1,44 @@
+"""sprint_92_linkage_models
+
+Revision ID: c4b6cf8f8f13
+Revises: 8ac20d60f654
+Create Date: 2026-10-19 09:12:41.204113
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4b6cf8f8f13'
+down_revision: Union[str, Sequence[str], None] = '8ac20d60f654'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Add linkage_models table (Sprint 92)."""
+    bind = op.get_bind()
+    if not sa.inspect(bind).has_table('linkage_models'):
+        op.create_table(
+            'linkage_models',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('domain', sa.String(length=64), nullable=False),
+            sa.Column('params_json', sa.Text(), nullable=False),
+            sa.Column('prior', sa.Float(), nullable=False),
+            sa.Column('pairs_trained', sa.Integer(), nullable=True),
+            sa.Column('iterations', sa.Integer(), nullable=True),
+            sa.Column('converged', sa.Boolean(), nullable=True),
+            sa.Column('trained_at', sa.DateTime(), nullable=True),
+            sa.PrimaryKeyConstraint('id'),
+        )
+        with op.batch_alter_table('linkage_models') as batch_op:
+            batch_op.create_index('ix_linkage_models_id', ['id'], unique=False)
+            batch_op.create_index('ix_linkage_models_domain', ['domain'], unique=True)
+
+
+def downgrade() -> None:
+    """Remove linkage_models table."""
+    op.drop_table('linkage_models')
@@ -0,0 +1,341 @@
+"""
+Concept Index — Sprint 107.
+
+Normalizes raw_entities.enrichment_concepts ("A, B, C") into two tables so
+topic analytics become SQL aggregates over integer ids instead of re-parsing
+every concept string in Python on each request:
+
+  concepts         (id, label)                            — dictionary
+  entity_concepts  (entity_id, concept_id, domain, updated_at)
+
+Maintenance:
+  - the enrichment worker indexes each entity in the same transaction that
+    writes its concepts (index_entities)
+  - every other writer (ingest, edits, merges, transformations, …) is caught
+    up by sync(): rows whose entity is gone or whose stored updated_at no
+    longer matches are dropped, entities changed since the last sync are
+    re-indexed. An unchanged source costs a single MAX/COUNT query. sync()
+    runs on the write side only — schedule_sync() after every committed
+    entity write (routers/deps._invalidate_entity_caches) and once at
+    startup — so analytics reads never open a write transaction.
+  - new dictionary labels are inserted with ON CONFLICT DO NOTHING and
+    re-selected, so concurrent writers (the enrichment worker and a
+    background sync) can add the same label safely.
+
+Like the OLAP replica, writes through raw SQL that do not bump updated_at
+are not detected; concept_index.rebuild() re-indexes everything.
+
+Sprint 108: per-domain sparse co-occurrence matrices
+(backend/analyzers/concept_matrix.py) are cached here. Each is stamped with
+its domain's (row count, max entity_id, max updated_at) in entity_concepts,
+so a write only rebuilds the matrix of the domain it touched.
+
+Sprint 110: per-domain heavy hitters. Each domain keeps a Space-Saving
+sketch (backend/olap_sketches.py) of concept ids, updated with the
+(entity, concept) rows every index write adds. Top concepts are read from
+it in O(capacity) instead of a GROUP BY over the domain; the analyzer then
+fetches exact counts for just the reported ids. Removing rows cannot be
+undone in a Space-Saving sketch, so a write that drops (entity, concept)
+rows marks the domain dirty and its sketch is rebuilt from one
+`GROUP BY … LIMIT capacity` on the next read. Sketch counts are upper
+bounds (a rolled-back write may also have been counted), never served as-is.
+
+Public API
+----------
+parse_concepts(raw)                       → list[str]
+concept_index.index_entities(db, rows)    → int  (entities indexed; no commit)
+concept_index.sync()                      → int  (entities re-indexed)
+concept_index.schedule_sync()                    sync() on a background thread
+concept_index.rebuild()                   → int
+concept_index.matrix(domain_id)           → ConceptMatrix (cached per domain)
+concept_index.top_concepts(domain_id, k)  → ([(concept_id, count_upper, error)], entities)
+"""
+from __future__ import annotations
+
+import logging
+import threading
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from typing import Any, Iterable, Optional
+
+import pandas as pd
+from sqlalchemy import and_, delete, exists, func, insert, or_, select
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from sqlalchemy.engine import Engine
+
+from backend import models
+from backend.analyzers.concept_matrix import ConceptMatrix
+from backend.olap_sketches import SpaceSaving
+
+logger = logging.getLogger(__name__)
+
+SYNC_CHUNK = 5_000
+TOPK_CAPACITY = 256   # counters per domain; top-k queries are served for k ≤ this
+_IN_CHUNK = 500   # bound parameters per IN (...) list
+
+# Concepts stored as "A, B, C" — split on "," then strip each
+_SEP = ","
+
+_entities = models.RawEntity.__table__
+_concepts = models.Concept.__table__
+_entity_concepts = models.EntityConcept.__table__
+
+
+def parse_concepts(raw: Optional[str]) -> list[str]:
+    """Split a comma-separated concept string into a clean list."""
+    if not raw:
+        return []
+    return [c.strip() for c in raw.split(_SEP) if c.strip()]
+
+
+def _chunks(items: list, size: int) -> Iterable[list]:
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def _insert_labels(db):
+    """INSERT into concepts that skips labels another writer added meanwhile."""
+    dialect = db.get_bind().dialect.name if hasattr(db, "get_bind") else db.dialect.name
+    if dialect == "sqlite":
+        return sqlite.insert(_concepts).on_conflict_do_nothing(index_elements=["label"])
+    if dialect == "postgresql":
+        return postgresql.insert(_concepts).on_conflict_do_nothing(index_elements=["label"])
+    if dialect == "mysql":
+        return mysql.insert(_concepts).prefix_with("IGNORE")
+    return insert(_concepts)
+
+
+def concept_ids(db, labels: Iterable[str]) -> dict[str, int]:
+    """Dictionary ids for `labels`, inserting the ones not seen before."""
+    wanted = sorted(set(labels))
+    ids: dict[str, int] = {}
+    for part in _chunks(wanted, _IN_CHUNK):
+        ids.update(db.execute(
+            select(_concepts.c.label, _concepts.c.id).where(_concepts.c.label.in_(part))
+        ).all())
+    missing = [label for label in wanted if label not in ids]
+    if missing:
+        db.execute(_insert_labels(db), [{"label": label} for label in missing])
+        for part in _chunks(missing, _IN_CHUNK):
+            ids.update(db.execute(
+                select(_concepts.c.label, _concepts.c.id).where(_concepts.c.label.in_(part))
+            ).all())
+    return ids
+
+
+@dataclass
+class DomainTopK:
+    heavy: SpaceSaving   # concept_id → entity count (upper bound)
+    entities: int        # entities with at least one concept
+
+
+class ConceptIndex:
+    def __init__(self, source_engine: Optional[Engine] = None):
+        self._source = source_engine
+        self._lock = threading.RLock()       # in-memory state
+        self._sync_lock = threading.Lock()   # one catch-up at a time
+        self._sync_pending = False
+        self._source_stats: Optional[tuple] = None
+        self._matrices: dict[str, tuple[tuple, ConceptMatrix]] = {}
+        self._topk: dict[str, DomainTopK] = {}
+        self._topk_dirty: set[str] = set()
+
+    @property
+    def source(self) -> Engine:
+        if self._source is None:
+            from backend.database import engine
+            self._source = engine
+        return self._source
+
+    # ── Write path ────────────────────────────────────────────────────────
+
+    def index_entities(self, db, rows: Iterable[Any]) -> int:
+        """
+        (Re)index entities — anything with id, domain, enrichment_concepts and
+        updated_at (ORM objects or result rows). Runs on `db` (Session or
+        Connection) without committing, so the index changes with the caller's
+        transaction. ORM objects must be flushed so updated_at is current.
+        """
+        rows = list(rows)
+        if not rows:
+            return 0
+        ec = _entity_concepts
+        old: set[tuple] = set()
+        for part in _chunks([r.id for r in rows], _IN_CHUNK):
+            old.update(tuple(o) for o in db.execute(
+                select(ec.c.entity_id, ec.c.concept_id, ec.c.domain).where(ec.c.entity_id.in_(part))
+            ).all())
+            db.execute(delete(ec).where(ec.c.entity_id.in_(part)))
+
+        parsed = [(r, set(parse_concepts(r.enrichment_concepts))) for r in rows]
+        dictionary = concept_ids(db, (c for _, labels in parsed for c in labels))
+        values = [
+            {"entity_id": r.id, "concept_id": dictionary[c],
+             "domain": r.domain or "default", "updated_at": r.updated_at}
+            for r, labels in parsed for c in labels
+        ]
+        if values:
+            db.execute(insert(ec), values)
+        self._track(old, {(v["entity_id"], v["concept_id"], v["domain"]) for v in values})
+        return len(rows)
+
+    def _track(self, old: set[tuple], new: set[tuple]) -> None:
+        """Fold an (entity_id, concept_id, domain) row diff into the top-k sketches."""
+        with self._lock:
+            self._topk_dirty.update(d for _, _, d in old - new)
+            added: dict[str, Counter] = defaultdict(Counter)
+            for _, concept_id, domain in new - old:
+                added[domain][concept_id] += 1
+            had_concepts = {(e, d) for e, _, d in old}
+            new_entities = Counter(d for e, d in {(e, d) for e, _, d in new} - had_concepts)
+            for domain, counts in added.items():
+                topk = self._topk.get(domain)
+                if topk is None or domain in self._topk_dirty:
+                    continue   # built from the table on its next read
+                topk.heavy.add_counts(counts.items())
+                topk.entities += new_entities[domain]
+
+    def index_entity(self, db, entity: models.RawEntity) -> None:
+        """Index one ORM entity inside the caller's session (flushes first)."""
+        db.flush()
+        self.index_entities(db, [entity])
+
+    # ── Catch-up ──────────────────────────────────────────────────────────
+
+    def sync(self) -> int:
+        """Bring entity_concepts up to date with raw_entities. Returns entities re-indexed."""
+        e, ec = _entities, _entity_concepts
+        with self._sync_lock:
+            with self.source.connect() as conn:
+                stats = tuple(conn.execute(
+                    select(func.max(e.c.id), func.count(), func.max(e.c.updated_at))
+                ).one())
+            if stats == self._source_stats:
+                return 0
+
+            has_concepts = and_(e.c.enrichment_concepts.is_not(None), e.c.enrichment_concepts != "")
+            current = exists().where(
+                ec.c.entity_id == e.c.id,
+                ec.c.updated_at.is_not_distinct_from(e.c.updated_at),
+            )
+            indexed = exists().where(ec.c.entity_id == e.c.id)
+            # Entities with concepts not indexed yet, or indexed before their last change
+            where = and_(~current, or_(has_concepts, indexed))
+            if self._source_stats is not None:
+                # Only entities new or touched since the last sync can be missing
+                max_id, _, since = self._source_stats
+                changed = e.c.id > (max_id or 0)
+                if since is not None:
+                    changed = or_(changed, e.c.updated_at >= since)
+                where = and_(where, changed)
+
+            stmt = (
+                select(e.c.id, e.c.domain, e.c.enrichment_concepts, e.c.updated_at)
+                .where(where).order_by(e.c.id)
+            )
+            gone = ~exists().where(e.c.id == ec.c.entity_id)
+            count = 0
+            with self.source.begin() as conn:
+                # Rows of deleted entities
+                domains = conn.execute(select(ec.c.domain).where(gone).distinct()).scalars().all()
+                if domains:
+                    conn.execute(delete(ec).where(gone))
+                    with self._lock:
+                        self._topk_dirty.update(domains)
+                result = conn.execute(stmt)
+                while batch := result.fetchmany(SYNC_CHUNK):
+                    count += self.index_entities(conn, batch)
+            self._source_stats = stats
+            if count:
+                logger.info("Concept index: %d entities indexed", count)
+            return count
+
+    def rebuild(self) -> int:
+        with self._sync_lock, self._lock:
+            with self.source.begin() as conn:
+                conn.execute(delete(_entity_concepts))
+            self._source_stats = None
+            self._topk.clear()
+            self._topk_dirty.clear()
+        return self.sync()
+
+    def schedule_sync(self) -> None:
+        """Run sync() on a daemon thread; requests made while one is pending coalesce."""
+        with self._lock:
+            if self._sync_pending:
+                return
+            self._sync_pending = True
+        threading.Thread(target=self._sync_worker, name="concept-sync", daemon=True).start()
+
+    def _sync_worker(self) -> None:
+        with self._lock:
+            # Cleared before the work: writes committed during it schedule another run
+            self._sync_pending = False
+        try:
+            self.sync()
+        except Exception:
+            logger.exception("Concept index: background sync failed")
+
+    # ── Heavy hitters ─────────────────────────────────────────────────────
+
+    def _build_topk(self, domain_id: str) -> DomainTopK:
+        ec = _entity_concepts
+        in_domain = ec.c.domain == domain_id
+        n = func.count().label("n")
+        with self.source.connect() as conn:
+            top = conn.execute(
+                select(ec.c.concept_id, n).where(in_domain)
+                .group_by(ec.c.concept_id).order_by(n.desc(), ec.c.concept_id)
+                .limit(TOPK_CAPACITY)
+            ).all()
+            entities = conn.execute(
+                select(func.count(func.distinct(ec.c.entity_id))).where(in_domain)
+            ).scalar() or 0
+        heavy = SpaceSaving(capacity=TOPK_CAPACITY)
+        heavy.add_counts(top)   # ≤ capacity exact counts: no evictions, zero error
+        topk = DomainTopK(heavy=heavy, entities=entities)
+        self._topk[domain_id] = topk
+        self._topk_dirty.discard(domain_id)
+        return topk
+
+    def top_concepts(self, domain_id: str, k: int) -> tuple[list[tuple[int, int, int]], int]:
+        """
+        The domain's k most frequent concepts as (concept_id, count upper
+        bound, max overcount) and its number of entities with concepts.
+        """
+        with self._lock:
+            topk = self._topk.get(domain_id)
+            if topk is None or domain_id in self._topk_dirty:
+                topk = self._build_topk(domain_id)
+            heavy = topk.heavy
+            return [(cid, count, heavy.errors[cid]) for cid, count in heavy.top(k)], topk.entities
+
+    # ── Co-occurrence matrices ────────────────────────────────────────────
+
+    def matrix(self, domain_id: str) -> ConceptMatrix:
+        """Entity × concept co-occurrence (XᵀX) for one domain, as indexed (read-only)."""
+        with self._lock:
+            ec = _entity_concepts
+            in_domain = ec.c.domain == domain_id
+            with self.source.connect() as conn:
+                stamp = tuple(conn.execute(
+                    select(func.count(), func.max(ec.c.entity_id), func.max(ec.c.updated_at))
+                    .where(in_domain)
+                ).one())
+                cached = self._matrices.get(domain_id)
+                if cached and cached[0] == stamp:
+                    return cached[1]
+                incidence = pd.read_sql(
+                    select(ec.c.entity_id, ec.c.concept_id).where(in_domain), conn
+                )
+                labels = dict(conn.execute(
+                    select(_concepts.c.id, _concepts.c.label).where(
+                        _concepts.c.id.in_(select(ec.c.concept_id).where(in_domain))
+                    )
+                ).all())
+            m = ConceptMatrix.from_incidence(incidence, labels)
+            self._matrices[domain_id] = (stamp, m)
+            return m
+
+
+concept_index = ConceptIndex()
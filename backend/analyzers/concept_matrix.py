@@ -0,0 +1,96 @@
+"""
+Concept Co-occurrence Matrix — Sprint 108.
+
+Co-occurrence as linear algebra instead of a Python Counter over
+itertools.combinations: with X the binary entity × concept incidence matrix
+(scipy.sparse CSR, built from entity_concepts), G = XᵀX holds
+
+  G[a, a] = number of entities tagged a
+  G[a, b] = number of entities tagged both a and b
+
+One sparse product replaces the per-entity quadratic pair loop. PMI / NPMI
+for every non-zero pair are then computed vectorized from G's diagonal:
+
+  PMI(a, b)  = log2( G[a,b]·N / (G[a,a]·G[b,b]) )
+  NPMI(a, b) = PMI(a, b) / −log2( G[a,b] / N )          ∈ [−1, 1]
+
+Columns are ordered by descending frequency (then label), so the top-k
+concepts are the first k columns. Matrices are cached per domain on the
+concept index and rebuilt only when raw_entities changed
+(concept_index.matrix(domain_id)).
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+
+@dataclass
+class ConceptMatrix:
+    labels: np.ndarray          # column → concept label
+    counts: np.ndarray          # column → entities tagged (diag of XᵀX)
+    gram: sp.csr_matrix         # XᵀX, concepts × concepts
+    upper: sp.coo_matrix        # strictly upper triangle of gram (each pair once)
+    n_entities: int
+
+    @classmethod
+    def from_incidence(cls, incidence: pd.DataFrame, labels: dict[int, str]) -> "ConceptMatrix":
+        """Build from (entity_id, concept_id) rows; `labels` maps concept_id → label."""
+        if incidence.empty:
+            empty = sp.csr_matrix((0, 0), dtype=np.int64)
+            return cls(np.array([], dtype=object), np.array([], dtype=np.int64),
+                       empty, empty.tocoo(), 0)
+        rows, entities = pd.factorize(incidence["entity_id"], sort=False)
+        cols, concepts = pd.factorize(incidence["concept_id"], sort=False)
+        counts = np.bincount(cols, minlength=len(concepts))
+        names = np.array([labels[c] for c in concepts], dtype=object)
+
+        # Renumber columns by (count desc, label)
+        order = np.lexsort((names, -counts))
+        rank = np.empty_like(order)
+        rank[order] = np.arange(len(order))
+
+        x = sp.csr_matrix(
+            (np.ones(len(rows), dtype=np.int64), (rows, rank[cols])),
+            shape=(len(entities), len(concepts)),
+        )
+        gram = (x.T @ x).tocsr()
+        return cls(
+            labels=names[order],
+            counts=counts[order],
+            gram=gram,
+            upper=sp.triu(gram, k=1).tocoo(),
+            n_entities=len(entities),
+        )
+
+    def top_pairs(self, top_n: int) -> dict[str, np.ndarray]:
+        """The `top_n` most frequent pairs with vectorized PMI / NPMI (column arrays)."""
+        u = self.upper
+        # Highest count first; ties by the more frequent concepts
+        order = np.lexsort((u.col, u.row, -u.data))[:top_n]
+        a, b, co = u.row[order], u.col[order], u.data[order].astype(np.float64)
+        n = float(self.n_entities)
+        pmi = np.log2(co * n / (self.counts[a] * self.counts[b]))
+        h = -np.log2(co / n)
+        # A pair present in every entity is perfectly associated
+        npmi = np.divide(pmi, h, out=np.ones_like(pmi), where=h > 0)
+        return {
+            "a": a, "b": b, "count": u.data[order],
+            "pmi": np.round(pmi, 3), "npmi": np.round(npmi, 3),
+        }
+
+    def assign_to_seeds(self, n_seeds: int) -> np.ndarray:
+        """
+        Seed column for every concept: the first `n_seeds` columns (most
+        frequent concepts) seed themselves; every other concept goes to the
+        seed it co-occurs with most (ties, including no co-occurrence, to the
+        more frequent seed).
+        """
+        k = min(n_seeds, len(self.counts))
+        scores = self.gram[:k].toarray()            # k × concepts, k is small
+        seed = scores.argmax(axis=0)
+        seed[:k] = np.arange(k)
+        return seed
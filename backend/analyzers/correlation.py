@@ -1,81 +1,127 @@
 """
 Correlation analyzer — Cramér's V between categorical fields using numpy.
 No sklearn required.
+
+Sprint 109: vectorized all-pairs evaluation.
+  - the domain's fields are read once from the OLAP replica (where domain
+    attributes are already typed columns), scoped to the domain
+  - every usable column is factorized once into integer codes; each
+    contingency table is one np.bincount over combined codes (a * n_b + b)
+  - column pairs are evaluated in parallel (CORRELATION_WORKERS threads)
+  - domains larger than CORRELATION_SAMPLE_ROWS are analyzed on a uniform
+    reservoir sample of that size; each V then carries a 95% interval from a
+    parametric (multinomial) bootstrap of its sampled contingency table
+
+Sprint 114: columns come from the shared Arrow snapshot of the replica
+(olap_store.snapshot()) instead of a DuckDB read per request; codes are
+taken straight from the Arrow dictionary encoding, without a round trip
+through pandas strings. Samples are a seeded uniform draw of row indices.
 """
 from __future__ import annotations
 
 import logging
-from typing import Any
+import os
+from concurrent.futures import ThreadPoolExecutor
+from itertools import combinations
+from typing import Any, Optional
 
 import numpy as np
-import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
 
-from backend.database import engine
+from backend.olap_store import olap_store
 from backend.schema_registry import registry
 
 logger = logging.getLogger(__name__)
 
-# Fields that carry too many unique values or are free text — skip them
-_SKIP_FIELDS = frozenset({
-    "entity_name", "title", "sku", "gtin", "doi", "nct_id",
-    "enrichment_concepts", "normalized_json", "enrichment_doi",
-    "id", "enrichment_citation_count", "enrichment_status", "enrichment_source",
-    "validation_status", "creation_date", "barcode", "branches",
-    "gtin_reason", "gtin_empty_reason_1", "gtin_empty_reason_2",
-    "gtin_empty_reason_3", "gtin_entity_reason", "gtin_reason_lower",
-    "gtin_empty_reason_typo", "equipment", "measure", "union_type",
-    "entity_code_universal_1", "entity_code_universal_2",
-    "entity_code_universal_3", "entity_code_universal_4",
-    "brand_lower", "model", "unit_of_measure", "entity_key",
-    "variant_status", "variant", "taxes", "branches",
-    "allow_sales_without_stock", "control_stock", "is_decimal_sellable",
-})
-
 # Categorical fields — must have fewer than this many distinct values
 _MAX_CARDINALITY = 50
 
+# Domains above this many rows are analyzed on a sample of this size
+CORRELATION_SAMPLE_ROWS = int(os.environ.get("CORRELATION_SAMPLE_ROWS", "200000"))
+CORRELATION_WORKERS = int(os.environ.get("CORRELATION_WORKERS", "4"))
+
+_CONFIDENCE = 0.95
+_BOOTSTRAP_DRAWS = 200
+_SAMPLE_SEED = 42
+
+
+def _arrow_codes(column: pa.ChunkedArray) -> tuple[np.ndarray, int]:
+    """Integer codes (-1 for NULL) of an Arrow column over the categories it contains."""
+    if not pa.types.is_dictionary(column.type):
+        column = pc.dictionary_encode(column)
+    idx = column.combine_chunks().indices.fill_null(-1).to_numpy(zero_copy_only=False)
+    # Dictionaries may hold values of other domains / unsampled rows: renumber densely
+    present = idx >= 0
+    codes = np.full(len(idx), -1, dtype=np.int64)
+    if not present.any():
+        return codes, 0
+    _, codes[present] = np.unique(idx[present], return_inverse=True)
+    return codes, int(codes.max()) + 1
+
 
-def _cramers_v(x: np.ndarray, y: np.ndarray) -> float:
+def _contingency(x: np.ndarray, nx: int, y: np.ndarray, ny: int) -> np.ndarray:
+    """Contingency table of two code arrays over rows where both are non-null."""
+    both = (x >= 0) & (y >= 0)
+    ct = np.bincount(x[both] * ny + y[both], minlength=nx * ny).reshape(nx, ny)
+    # Only categories present in the pairwise non-null rows count towards k
+    return ct[ct.sum(axis=1) > 0][:, ct.sum(axis=0) > 0]
+
+
+def _v_from_tables(ct: np.ndarray) -> np.ndarray:
     """
-    Compute Cramér's V association between two 1-D categorical arrays.
-    Returns a float in [0, 1]; 0 = no association, 1 = perfect association.
+    Cramér's V of one (r × c) or a stack (… × r × c) of contingency tables.
+    k = min(r, c) of the tables' shape.
     """
-    # Build contingency table
-    x_cats = np.unique(x)
-    y_cats = np.unique(y)
-    # Fast contingency using pandas crosstab
-    ct = np.zeros((len(x_cats), len(y_cats)), dtype=np.int64)
-    x_idx = {v: i for i, v in enumerate(x_cats)}
-    y_idx = {v: i for i, v in enumerate(y_cats)}
-    for xi, yi in zip(x, y):
-        ct[x_idx[xi], y_idx[yi]] += 1
-
-    n = ct.sum()
-    if n == 0:
-        return 0.0
-
-    # Chi-squared statistic
-    row_sums = ct.sum(axis=1, keepdims=True)
-    col_sums = ct.sum(axis=0, keepdims=True)
-    expected = row_sums * col_sums / n
+    ct = ct.astype(np.float64)
+    n = ct.sum(axis=(-2, -1), keepdims=True)
+    expected = ct.sum(axis=-1, keepdims=True) * ct.sum(axis=-2, keepdims=True) / n
     with np.errstate(divide="ignore", invalid="ignore"):
-        chi2 = np.where(expected > 0, (ct - expected) ** 2 / expected, 0.0).sum()
+        chi2 = np.where(expected > 0, (ct - expected) ** 2 / expected, 0.0).sum(axis=(-2, -1))
+    k = min(ct.shape[-2], ct.shape[-1])
+    v = np.sqrt(chi2 / (n[..., 0, 0] * (k - 1)))
+    return np.minimum(v, 1.0)
+
 
-    k = min(ct.shape[0], ct.shape[1])
-    if k <= 1 or n <= 1:
+def _cramers_v_table(ct: np.ndarray) -> float:
+    n = int(ct.sum())
+    if n <= 1 or min(ct.shape) <= 1:
         return 0.0
+    return round(float(_v_from_tables(ct)), 4)
 
-    v = math.sqrt(chi2 / (n * (k - 1)))  # type: ignore[name-defined]
-    return round(float(min(v, 1.0)), 4)
 
+def _v_interval(ct: np.ndarray, seed: int) -> tuple[float, float]:
+    """Bootstrap (multinomial over the observed cell proportions) interval for V."""
+    n = int(ct.sum())
+    rng = np.random.default_rng(seed)
+    draws = rng.multinomial(n, (ct / n).ravel(), size=_BOOTSTRAP_DRAWS).reshape(-1, *ct.shape)
+    v = np.nan_to_num(_v_from_tables(draws))
+    alpha = (1 - _CONFIDENCE) / 2
+    lo, hi = np.quantile(v, [alpha, 1 - alpha])
+    return round(float(lo), 4), round(float(hi), 4)
 
-# Use math.sqrt from stdlib — numpy sqrt is fine too, but avoid the need for extra import
-import math  # noqa: E402
+
+def _strength(v: float) -> str:
+    return "strong" if v >= 0.5 else "moderate" if v >= 0.2 else "weak"
 
 
 class CorrelationAnalyzer:
     """Compute pairwise Cramér's V between categorical fields."""
 
+    def __init__(self, sample_rows: Optional[int] = None, workers: Optional[int] = None):
+        self.sample_rows = sample_rows or CORRELATION_SAMPLE_ROWS
+        self.workers = workers or CORRELATION_WORKERS
+
+    def _load(self, domain_id: str, fields: list[str]) -> tuple[pa.Table, int, bool]:
+        """The domain's `fields` (sampled if the domain is large), its row count, sampled?"""
+        table = olap_store.snapshot().domain(domain_id, fields)
+        n = table.num_rows
+        sampled = n > self.sample_rows
+        if sampled:
+            rng = np.random.default_rng(_SAMPLE_SEED)
+            table = table.take(np.sort(rng.choice(n, self.sample_rows, replace=False)))
+        return table, n, sampled
+
     def top_correlations(
         self, domain_id: str, top_n: int = 20
     ) -> dict[str, Any]:
@@ -87,9 +133,12 @@ class CorrelationAnalyzer:
               "domain_id": str,
               "n_entities": int,
               "fields_analyzed": int,
+              "sampled": bool,           # rows_analyzed < n_entities
+              "rows_analyzed": int,
               "correlations": [
                 {"field_a": str, "field_b": str, "cramers_v": float,
-                 "strength": "weak"|"moderate"|"strong"}
+                 "strength": "weak"|"moderate"|"strong",
+                 "ci_low": float|None, "ci_high": float|None}   # set when sampled
               ]
             }
         """
@@ -97,56 +146,47 @@ class CorrelationAnalyzer:
         if domain is None:
             raise ValueError(f"Domain '{domain_id}' not found")
 
-        # Which fields to analyze — from domain schema, not _SKIP_FIELDS
-        candidate_fields = [
-            attr.name
-            for attr in domain.attributes
-            if attr.name not in _SKIP_FIELDS
-        ]
+        # Which fields to analyze — the domain plan's correlation fields
+        available = olap_store.columns
+        candidate_fields = [f for f in domain.plan.correlation_fields if f in available]
 
-        with engine.connect() as conn:
-            cols_sql = ", ".join(f'"{f}"' for f in candidate_fields)
-            df = pd.read_sql(
-                f"SELECT {cols_sql} FROM raw_entities",  # noqa: S608
-                conn,
-            )
+        table, n_entities, sampled = self._load(domain_id, candidate_fields)
 
-        n_entities = len(df)
-
-        # Filter to low-cardinality, non-null columns
-        usable: list[str] = []
+        # Encode once; keep low-cardinality, non-empty columns
+        coded: dict[str, tuple[np.ndarray, int]] = {}
         for col in candidate_fields:
-            if col not in df.columns:
-                continue
-            series = df[col].dropna().astype(str)
-            if series.empty:
-                continue
-            if series.nunique() > _MAX_CARDINALITY:
+            codes, n_cats = _arrow_codes(table[col])
+            if n_cats == 0 or n_cats > _MAX_CARDINALITY:
                 continue
-            usable.append(col)
-
-        correlations: list[dict] = []
-        for a, b in combinations_sorted(usable):
-            mask = df[a].notna() & df[b].notna()
-            x = df.loc[mask, a].astype(str).values
-            y = df.loc[mask, b].astype(str).values
-            if len(x) < 5:
-                continue
-            v = _cramers_v(x, y)
+            coded[col] = (codes, n_cats)
+        usable = list(coded)
+
+        def evaluate(job: tuple[int, tuple[str, str]]) -> Optional[dict]:
+            i, (a, b) = job
+            ct = _contingency(*coded[a], *coded[b])
+            if ct.sum() < 5:
+                return None
+            v = _cramers_v_table(ct)
             if v < 0.05:
-                continue  # Skip near-zero associations
-            strength = (
-                "strong" if v >= 0.5
-                else "moderate" if v >= 0.2
-                else "weak"
-            )
-            correlations.append({
+                return None  # Skip near-zero associations
+            lo, hi = _v_interval(ct, seed=i) if sampled else (None, None)
+            return {
                 "field_a": a,
                 "field_b": b,
                 "cramers_v": v,
-                "strength": strength,
-            })
+                "strength": _strength(v),
+                "ci_low": lo,
+                "ci_high": hi,
+            }
+
+        jobs = list(enumerate(combinations(usable, 2)))
+        if len(jobs) > 1 and self.workers > 1:
+            with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                results = list(pool.map(evaluate, jobs))
+        else:
+            results = [evaluate(job) for job in jobs]
 
+        correlations = [r for r in results if r is not None]
         correlations.sort(key=lambda x: x["cramers_v"], reverse=True)
         correlations = correlations[:top_n]
 
@@ -154,11 +194,7 @@ class CorrelationAnalyzer:
             "domain_id": domain_id,
             "n_entities": n_entities,
             "fields_analyzed": len(usable),
+            "sampled": sampled,
+            "rows_analyzed": table.num_rows,
             "correlations": correlations,
         }
-
-
-def combinations_sorted(fields: list[str]):
-    """Yield all (a, b) pairs with a < b (sorted)."""
-    from itertools import combinations
-    yield from combinations(fields, 2)
@@ -1,20 +1,41 @@
 """
 Knowledge Gap Detector — Phase 10 (Artifact Studio)
 Scans a domain and returns a prioritized list of actionable data gaps.
+
+Sprint 111: every gap metric (enrichment, concept density, quality,
+authority backlog and the missing-value count of each core string
+attribute) comes from one pass, instead of one query per check plus a full
+column fetch per attribute. Metrics are cached per domain and dropped
+explicitly on entity writes (invalidate_gap_cache, called from
+routers/deps._invalidate_entity_caches).
+
+Sprint 114: the entity metrics are vectorized pyarrow.compute kernels over
+the shared Arrow snapshot of the OLAP replica (olap_store.snapshot()), the
+same table the correlation analyzer reads; only the authority backlog is
+counted in the source database. The cache is stamped with the snapshot
+version and the authority counts.
 """
 from __future__ import annotations
 
+import threading
 from dataclasses import dataclass, field
-from datetime import datetime, timezone
-from typing import List
+from typing import List, Optional
 
-from sqlalchemy import func
+import pyarrow as pa
+import pyarrow.compute as pc
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
 
 from backend import models
-from backend.schema_registry import SchemaRegistry
+from backend.olap_snapshot import count_if, strings
+from backend.olap_store import CORE_COLUMNS, olap_store
+from backend.schema_registry import registry
 
-_registry = SchemaRegistry()
+# Values treated as "no value" by the dimension completeness check
+_EMPTY = ("", "unknown", "n/a", "none", "null", "-", "sin datos")
+
+_e = models.RawEntity.__table__
+_a = models.AuthorityRecord.__table__
 
 
 @dataclass
@@ -29,31 +50,129 @@ class GapItem:
     action: str
 
 
+@dataclass
+class GapMetrics:
+    total: int
+    not_enriched: int
+    enriched: int
+    sparse_concepts: int          # enriched with ≤1 concept tag
+    scored: int
+    low_quality: int              # quality_score < 0.3
+    authority_total: int
+    authority_pending: int
+    missing: dict[str, int] = field(default_factory=dict)   # attribute → empty count
+
+
+def _string_fields(domain_id: str) -> list:
+    domain = registry.get_domain(domain_id)
+    if not domain:
+        return []
+    return [a for a in domain.plan.core_strings if a.name in CORE_COLUMNS]
+
+
+def _write_stamp(db: Session) -> tuple:
+    """Cheap markers that move on any ORM write the metrics depend on."""
+    return tuple(db.execute(select(
+        func.max(_e.c.id), func.count(), func.max(_e.c.updated_at),
+        select(func.count()).select_from(_a).scalar_subquery(),
+        select(func.count()).select_from(_a).where(_a.c.status == "pending").scalar_subquery(),
+    ).select_from(_e)).one())
+
+
+def _authority_counts(db: Session) -> tuple[int, int]:
+    return tuple(db.execute(select(
+        func.count(), func.count().filter(_a.c.status == "pending"),
+    ).select_from(_a)).one())
+
+
+def compute_gap_metrics(table: pa.Table, authority: tuple[int, int], fields: list[str]) -> GapMetrics:
+    """All entity gap metrics in one pass over an Arrow snapshot table."""
+    status = table["enrichment_status"]
+    done = pc.equal(status, "done")
+    concepts = table["enrichment_concepts"]
+    sparse = pc.or_kleene(pc.is_null(concepts), pc.invert(pc.match_substring(concepts, ",")))
+    quality = table["quality_score"]
+    empty = pa.array(_EMPTY)
+    missing = {}
+    for f in fields:
+        values = strings(table[f])
+        missing[f] = count_if(pc.or_kleene(
+            pc.is_null(values), pc.is_in(pc.utf8_lower(pc.utf8_trim(values, " ")), value_set=empty),
+        ))
+    return GapMetrics(
+        total=table.num_rows,
+        not_enriched=count_if(pc.not_equal(status, "done")),
+        enriched=count_if(done),
+        sparse_concepts=count_if(pc.and_kleene(done, sparse)),
+        scored=quality.length() - quality.null_count,
+        low_quality=count_if(pc.less(quality, 0.3)),
+        authority_total=authority[0],
+        authority_pending=authority[1],
+        missing=missing,
+    )
+
+
+class _GapCache:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries: dict[str, tuple[tuple, GapMetrics]] = {}
+
+    def get(self, domain_id: str, stamp: tuple) -> Optional[GapMetrics]:
+        with self._lock:
+            entry = self._entries.get(domain_id)
+        return entry[1] if entry and entry[0] == stamp else None
+
+    def set(self, domain_id: str, stamp: tuple, metrics: GapMetrics) -> None:
+        with self._lock:
+            self._entries[domain_id] = (stamp, metrics)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+_gap_cache = _GapCache()
+
+
+def invalidate_gap_cache() -> None:
+    """Drop cached gap metrics (they span every entity, so all domains go)."""
+    _gap_cache.clear()
+
+
 class GapAnalyzer:
     """Runs all gap checks and returns results sorted by severity then impact."""
 
+    def metrics(self, domain_id: str, db: Session) -> GapMetrics:
+        """Gap metrics for the domain's attributes (cached until the next write)."""
+        fields = [a.name for a in _string_fields(domain_id)]
+        snap = olap_store.snapshot()
+        authority = _authority_counts(db)
+        stamp = (tuple(fields), snap.version, *authority)
+        m = _gap_cache.get(domain_id, stamp)
+        if m is None:
+            m = compute_gap_metrics(snap.table, authority, fields)
+            _gap_cache.set(domain_id, stamp, m)
+        return m
+
     def analyze(self, domain_id: str, db: Session) -> List[GapItem]:
+        m = self.metrics(domain_id, db)
         gaps: List[GapItem] = []
-        gaps += self._enrichment_gaps(db)
-        gaps += self._authority_gaps(db)
-        gaps += self._concept_density(db)
-        gaps += self._dimension_completeness(domain_id, db)
-        gaps += self._quality_gaps(db)
+        gaps += self._enrichment_gaps(m)
+        gaps += self._authority_gaps(m)
+        gaps += self._concept_density(m)
+        gaps += self._dimension_completeness(domain_id, m)
+        gaps += self._quality_gaps(m)
         # Sort: critical first, then by pct desc within each severity
         _order = {"critical": 0, "warning": 1, "ok": 2}
         return sorted(gaps, key=lambda g: (_order.get(g.severity, 3), -g.pct))
 
     # ── 1. Enrichment coverage ────────────────────────────────────────────────
 
-    def _enrichment_gaps(self, db: Session) -> List[GapItem]:
-        total = db.query(models.RawEntity).count()
+    def _enrichment_gaps(self, m: GapMetrics) -> List[GapItem]:
+        total = m.total
         if total == 0:
             return []
-        not_done = (
-            db.query(models.RawEntity)
-            .filter(models.RawEntity.enrichment_status != "done")
-            .count()
-        )
+        not_done = m.not_enriched
         pct = not_done / total * 100
         if pct > 40:
             severity = "critical"
@@ -74,15 +193,11 @@ class GapAnalyzer:
 
     # ── 2. Authority resolution backlog ──────────────────────────────────────
 
-    def _authority_gaps(self, db: Session) -> List[GapItem]:
-        total = db.query(models.AuthorityRecord).count()
+    def _authority_gaps(self, m: GapMetrics) -> List[GapItem]:
+        total = m.authority_total
         if total == 0:
             return []
-        pending = (
-            db.query(models.AuthorityRecord)
-            .filter(models.AuthorityRecord.status == "pending")
-            .count()
-        )
+        pending = m.authority_pending
         if pending == 0:
             return []
         pct = pending / total * 100
@@ -99,19 +214,11 @@ class GapAnalyzer:
 
     # ── 3. Concept density ────────────────────────────────────────────────────
 
-    def _concept_density(self, db: Session) -> List[GapItem]:
-        enriched = (
-            db.query(models.RawEntity)
-            .filter(models.RawEntity.enrichment_status == "done")
-            .all()
-        )
-        if not enriched:
+    def _concept_density(self, m: GapMetrics) -> List[GapItem]:
+        if not m.enriched:
             return []
-        sparse = [
-            e for e in enriched
-            if not e.enrichment_concepts or len(e.enrichment_concepts.split(",")) <= 1
-        ]
-        pct = len(sparse) / len(enriched) * 100
+        sparse = m.sparse_concepts   # no "," → at most one concept
+        pct = sparse / m.enriched * 100
         if pct <= 15:
             return []
         severity = "critical" if pct > 50 else "warning"
@@ -120,27 +227,22 @@ class GapAnalyzer:
             severity=severity,
             title="Low Concept Density",
             description=(
-                f"{len(sparse)} enriched entities ({pct:.1f}%) have ≤1 concept tag, "
+                f"{sparse} enriched entities ({pct:.1f}%) have ≤1 concept tag, "
                 "limiting semantic search and topic modeling quality."
             ),
-            affected_count=len(sparse),
-            total_count=len(enriched),
+            affected_count=sparse,
+            total_count=m.enriched,
             pct=pct,
             action="Re-enrich sparse entities or review enrichment source quality to improve concept coverage.",
         )]
 
     # ── 5. Low-quality entities ───────────────────────────────────────────────
 
-    def _quality_gaps(self, db: Session) -> List[GapItem]:
-        total_with_score = db.query(func.count(models.RawEntity.id)).filter(
-            models.RawEntity.quality_score != None
-        ).scalar() or 0
+    def _quality_gaps(self, m: GapMetrics) -> List[GapItem]:
+        total_with_score = m.scored
 
         if total_with_score > 0:
-            low_quality_count = db.query(func.count(models.RawEntity.id)).filter(
-                models.RawEntity.quality_score < 0.3,
-                models.RawEntity.quality_score != None,
-            ).scalar() or 0
+            low_quality_count = m.low_quality
             low_quality_pct = low_quality_count / total_with_score
             severity = "critical" if low_quality_pct > 0.3 else "warning" if low_quality_pct > 0.1 else "ok"
             return [GapItem(
@@ -170,27 +272,14 @@ class GapAnalyzer:
 
     # ── 4. Dimension completeness ─────────────────────────────────────────────
 
-    def _dimension_completeness(self, domain_id: str, db: Session) -> List[GapItem]:
-        domain = _registry.get_domain(domain_id)
-        if not domain:
-            return []
-        total = db.query(models.RawEntity).count()
+    def _dimension_completeness(self, domain_id: str, m: GapMetrics) -> List[GapItem]:
+        total = m.total
         if total == 0:
             return []
 
-        _EMPTY = {"", "unknown", "n/a", "none", "null", "-", "sin datos"}
         gaps: List[GapItem] = []
-
-        string_fields = [a for a in domain.attributes if a.type == "string" and a.is_core]
-        for attr in string_fields:
-            col = getattr(models.RawEntity, attr.name, None)
-            if col is None:
-                continue
-            rows = db.query(col).all()
-            missing = sum(
-                1 for (v,) in rows
-                if v is None or str(v).strip().lower() in _EMPTY
-            )
+        for attr in _string_fields(domain_id):
+            missing = m.missing.get(attr.name, 0)
             pct = missing / total * 100
             if pct < 20:
                 continue
@@ -1,89 +1,107 @@
 """
-Topic Modeling analyzer — pure Python + DuckDB + numpy, no sklearn/NLTK.
+Topic Modeling analyzer — SQL aggregates + pure Python, no sklearn/NLTK.
 
 Works on the `enrichment_concepts` column of RawEntity, which stores
 concepts as a comma-separated string: "Machine Learning, Neural Network, ...".
+
+Sprint 107: concept strings are normalized into integer ids
+(backend/analyzers/concept_index.py); frequencies are GROUP BY aggregates
+over entity_concepts, scoped to the domain.
+
+Sprint 108: co-occurrence and clusters come from the domain's cached sparse
+XᵀX matrix (backend/analyzers/concept_matrix.py) with vectorized PMI / NPMI.
+
+Sprint 110: top topics are served from per-domain Space-Saving sketches,
+with exact counts fetched only for the reported concepts.
 """
 from __future__ import annotations
 
 import logging
-import math
-from collections import Counter
-from itertools import combinations
-from typing import Any
+from typing import Any, Optional
 
-import pandas as pd
+from sqlalchemy import func, select
 
-from backend.database import engine
+from backend import models
+from backend.analyzers.concept_index import ConceptIndex, concept_index
+from backend.analyzers.concept_matrix import ConceptMatrix
 from backend.schema_registry import registry
 
 logger = logging.getLogger(__name__)
 
-# Concepts stored as "A, B, C" — split on ", " then strip each
-_SEP = ","
-
-
-def _parse_concepts(raw: str | None) -> list[str]:
-    """Split comma-separated concept string into clean list."""
-    if not raw:
-        return []
-    return [c.strip() for c in raw.split(_SEP) if c.strip()]
-
-
-def _load_concepts_df(domain_id: str) -> pd.DataFrame:
-    """
-    Load rows that have enrichment_concepts for the given domain.
-    Returns a DataFrame with columns: id, enrichment_concepts, and domain
-    categorical fields.
-    """
-    domain = registry.get_domain(domain_id)
-    if domain is None:
-        raise ValueError(f"Domain '{domain_id}' not found")
-
-    with engine.connect() as conn:
-        df = pd.read_sql(
-            "SELECT id, enrichment_concepts FROM raw_entities "
-            "WHERE enrichment_concepts IS NOT NULL AND enrichment_concepts != ''",
-            conn,
-        )
-    return df
-
+_ec = models.EntityConcept.__table__
+_concepts = models.Concept.__table__
 
 class TopicAnalyzer:
     """Analyze enrichment_concepts for a given domain."""
 
+    def __init__(self, index: Optional[ConceptIndex] = None):
+        self._index = index
+
+    @property
+    def index(self) -> ConceptIndex:
+        return self._index or concept_index
+
+    @staticmethod
+    def _check_domain(domain_id: str) -> None:
+        if registry.get_domain(domain_id) is None:
+            raise ValueError(f"Domain '{domain_id}' not found")
+
+    def _matrix(self, domain_id: str) -> ConceptMatrix:
+        self._check_domain(domain_id)
+        return self.index.matrix(domain_id)
+
+    @staticmethod
+    def _exact_counts(conn, domain_id: str, concept_ids: list[int]) -> list[tuple[str, int]]:
+        """(label, entity count) for just `concept_ids`, by descending count."""
+        n = func.count().label("n")
+        stmt = (
+            select(_concepts.c.label, n)
+            .join(_concepts, _concepts.c.id == _ec.c.concept_id)
+            .where(_ec.c.domain == domain_id, _ec.c.concept_id.in_(concept_ids))
+            .group_by(_ec.c.concept_id, _concepts.c.label)
+            .order_by(n.desc(), _concepts.c.label)
+        )
+        return [tuple(r) for r in conn.execute(stmt).all()]
+
     # ── Top topics ──────────────────────────────────────────────────────────
 
     def top_topics(self, domain_id: str, top_n: int = 30) -> dict[str, Any]:
         """
-        Return concept frequencies across all enriched entities.
+        Return concept frequencies across the domain's enriched entities.
+
+        The top concepts come from the domain's Space-Saving sketch; their
+        counts are then counted exactly. error_bound is the largest sketch
+        overcount among them (0 = the ranking is exact).
 
         Returns:
             {
               "domain_id": str,
               "total_enriched": int,
+              "error_bound": int,
               "topics": [{"concept": str, "count": int, "pct": float}, ...]
             }
         """
-        df = _load_concepts_df(domain_id)
-        total_enriched = len(df)
-
-        counter: Counter = Counter()
-        for raw in df["enrichment_concepts"]:
-            counter.update(_parse_concepts(raw))
+        self._check_domain(domain_id)
+        index = self.index
+        heavy, total_enriched = index.top_concepts(domain_id, top_n)
+        counts = []
+        if heavy:
+            with index.source.connect() as conn:
+                counts = self._exact_counts(conn, domain_id, [cid for cid, _, _ in heavy])
 
         topics = [
             {
-                "concept": concept,
+                "concept": label,
                 "count": count,
                 "pct": round(count / total_enriched * 100, 2) if total_enriched else 0.0,
             }
-            for concept, count in counter.most_common(top_n)
+            for label, count in counts
         ]
 
         return {
             "domain_id": domain_id,
             "total_enriched": total_enriched,
+            "error_bound": max((err for _, _, err in heavy), default=0),
             "topics": topics,
         }
 
@@ -97,50 +115,30 @@ class TopicAnalyzer:
             {
               "domain_id": str,
               "total_enriched": int,
-              "pairs": [{"concept_a": str, "concept_b": str, "count": int, "pmi": float}, ...]
+              "pairs": [{"concept_a": str, "concept_b": str, "count": int,
+                         "pmi": float, "npmi": float}, ...]
             }
         """
-        df = _load_concepts_df(domain_id)
-        total_enriched = len(df)
-
-        pair_counter: Counter = Counter()
-        concept_counter: Counter = Counter()
+        m = self._matrix(domain_id)
+        top = m.top_pairs(top_n)
 
-        for raw in df["enrichment_concepts"]:
-            concepts = _parse_concepts(raw)
-            concept_counter.update(concepts)
-            # Each pair counted once per entity (sorted to canonicalize)
-            for a, b in combinations(sorted(set(concepts)), 2):
-                pair_counter[(a, b)] += 1
-
-        # Pointwise Mutual Information: log2(P(a,b) / (P(a)*P(b)))
-        # P(a) = concept_counter[a] / total_enriched
         pairs = []
-        for (a, b), co_count in pair_counter.most_common(top_n * 5):
-            if total_enriched == 0:
-                pmi = 0.0
-            else:
-                p_a = concept_counter[a] / total_enriched
-                p_b = concept_counter[b] / total_enriched
-                p_ab = co_count / total_enriched
-                if p_a > 0 and p_b > 0 and p_ab > 0:
-                    pmi = round(math.log2(p_ab / (p_a * p_b)), 3)
-                else:
-                    pmi = 0.0
+        for a, b, count, pmi, npmi in zip(
+            m.labels[top["a"]], m.labels[top["b"]],
+            top["count"].tolist(), top["pmi"].tolist(), top["npmi"].tolist(),
+        ):
+            concept_a, concept_b = sorted((a, b))
             pairs.append({
-                "concept_a": a,
-                "concept_b": b,
-                "count": co_count,
+                "concept_a": concept_a,
+                "concept_b": concept_b,
+                "count": count,
                 "pmi": pmi,
+                "npmi": npmi,
             })
 
-        # Sort by raw count for UI (most frequent pairs first), cap at top_n
-        pairs.sort(key=lambda x: x["count"], reverse=True)
-        pairs = pairs[:top_n]
-
         return {
             "domain_id": domain_id,
-            "total_enriched": total_enriched,
+            "total_enriched": m.n_entities,
             "pairs": pairs,
         }
 
@@ -148,13 +146,14 @@ class TopicAnalyzer:
 
     def topic_clusters(self, domain_id: str, n_clusters: int = 6) -> dict[str, Any]:
         """
-        Group concepts into clusters using greedy PMI-based single-linkage.
+        Group concepts into clusters using greedy co-occurrence single-linkage.
 
-        Algorithm (pure Python, no sklearn):
-        1. Build concept co-occurrence graph (edges weighted by co_count).
-        2. Greedy: pick the top-N concepts by frequency as seeds.
-        3. Assign each remaining concept to the seed it co-occurs with most.
-        4. Return clusters as lists of {concept, count} dicts.
+        Algorithm (no sklearn):
+        1. Pick the top-N concepts by frequency as seeds.
+        2. Assign each remaining concept to the seed it co-occurs with most
+           (ties go to the more frequent seed) — one argmax over the seed
+           rows of the co-occurrence matrix.
+        3. Return clusters as lists of {concept, count} dicts.
 
         Returns:
             {
@@ -166,53 +165,21 @@ class TopicAnalyzer:
               ]
             }
         """
-        df = _load_concepts_df(domain_id)
-
-        pair_counter: Counter = Counter()
-        concept_counter: Counter = Counter()
-
-        for raw in df["enrichment_concepts"]:
-            concepts = _parse_concepts(raw)
-            concept_counter.update(concepts)
-            for a, b in combinations(sorted(set(concepts)), 2):
-                pair_counter[(a, b)] += 1
-
-        if not concept_counter:
+        m = self._matrix(domain_id)
+        if not len(m.labels):
             return {"domain_id": domain_id, "n_clusters": 0, "clusters": []}
 
-        # Seeds = top-n_clusters concepts by frequency
-        top_concepts = [c for c, _ in concept_counter.most_common()]
-        seeds = top_concepts[:n_clusters]
-
-        # Assign each concept to the seed with highest co-occurrence score
-        cluster_map: dict[str, str] = {s: s for s in seeds}
-
-        for concept in top_concepts[n_clusters:]:
-            best_seed = None
-            best_score = -1
-            for seed in seeds:
-                key = tuple(sorted([concept, seed]))
-                score = pair_counter.get(key, 0)  # type: ignore[arg-type]
-                if score > best_score:
-                    best_score = score
-                    best_seed = seed
-            if best_seed is not None:
-                cluster_map[concept] = best_seed
-
-        # Build output clusters
-        clusters_dict: dict[str, list[dict]] = {s: [] for s in seeds}
-        for concept, seed in cluster_map.items():
-            clusters_dict[seed].append({
-                "concept": concept,
-                "count": concept_counter[concept],
-            })
-
+        seed_of = m.assign_to_seeds(n_clusters)
         clusters = []
-        for idx, seed in enumerate(seeds):
-            members = sorted(clusters_dict[seed], key=lambda x: x["count"], reverse=True)
+        for idx in range(min(n_clusters, len(m.labels))):
+            cols = (seed_of == idx).nonzero()[0]   # already in count order
+            members = [
+                {"concept": label, "count": count}
+                for label, count in zip(m.labels[cols], m.counts[cols].tolist())
+            ]
             clusters.append({
                 "id": idx,
-                "seed": seed,
+                "seed": m.labels[idx],
                 "size": len(members),
                 "members": members,
             })
@@ -1,17 +1,101 @@
 """
 Phase 11 — Context Engineering Layer
 ContextEngine: assembles rich, structured domain context for LLM injection.
+
+Sprint 112: assembled snapshots are cached per domain together with their
+format_for_llm text, so /context/snapshot, session creation and context-
+injected RAG queries no longer recompute schema, stats, gaps and topics on
+every call. An entry is reused while its domain schema object is unchanged
+and the gap detector's write stamp (raw_entities MAX(id) / COUNT /
+MAX(updated_at), authority record counts — one aggregate query) still
+matches; invalidate_context_cache() drops entries after committed writes
+(routers/deps._invalidate_entity_caches).
+
+Each domain carries a version number that only moves when a rebuild
+produces different content, so callers can tell whether the injected
+context changed by comparing one integer.
+
+Public API
+----------
+ContextEngine().snapshot(domain_id, db)              → DomainContext (cached)
+ContextEngine().build_domain_context(domain_id, db)  → dict (cached snapshot)
+invalidate_context_cache(domain_id=None)
 """
 import json
 import logging
+import threading
+from dataclasses import dataclass
 from datetime import datetime, timezone
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 
 from sqlalchemy.orm import Session
 
 logger = logging.getLogger(__name__)
 
 
+@dataclass(frozen=True)
+class DomainContext:
+    domain_id: str
+    version: int              # bumped only when the content changes
+    context: Dict[str, Any]   # build_domain_context() payload
+    text: str                 # format_for_llm(context)
+
+
+class _ContextCache:
+    """domain_id → (schema, write stamp, DomainContext); invalidation clears the stamp."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries: Dict[str, tuple] = {}
+        self._versions: Dict[str, int] = {}
+
+    def get(self, domain_id: str, schema: Any, stamp: tuple) -> Optional[DomainContext]:
+        with self._lock:
+            entry = self._entries.get(domain_id)
+        if entry and entry[0] is schema and entry[1] == stamp:
+            return entry[2]
+        return None
+
+    def put(self, domain_id: str, schema: Any, stamp: tuple,
+            context: Dict[str, Any], text: str) -> DomainContext:
+        with self._lock:
+            entry = self._entries.get(domain_id)
+            previous = entry[2] if entry else None
+            if previous and _content(previous.context) == _content(context):
+                snap = previous   # same content: keep version and generated_at
+            else:
+                version = self._versions.get(domain_id, 0) + 1
+                self._versions[domain_id] = version
+                context["version"] = version
+                snap = DomainContext(domain_id, version, context, text)
+            self._entries[domain_id] = (schema, stamp, snap)
+            return snap
+
+    def invalidate(self, domain_id: Optional[str] = None) -> None:
+        with self._lock:
+            # Keep the snapshot (for version continuity), forget its stamp
+            for key in list(self._entries) if domain_id is None else [domain_id]:
+                if key in self._entries:
+                    schema, _, snap = self._entries[key]
+                    self._entries[key] = (schema, None, snap)
+
+
+def _content(ctx: Dict[str, Any]) -> Dict[str, Any]:
+    return {k: v for k, v in ctx.items() if k not in ("generated_at", "version")}
+
+
+_context_cache = _ContextCache()
+
+
+def invalidate_context_cache(domain_id: Optional[str] = None) -> None:
+    """
+    Force the next snapshot of `domain_id` (None = every domain) to be
+    rebuilt. Entity stats and gaps span all entities, so entity writes
+    invalidate every domain.
+    """
+    _context_cache.invalidate(domain_id)
+
+
 class ContextEngine:
     """
     Assembles a structured snapshot of a domain's current state:
@@ -19,9 +103,24 @@ class ContextEngine:
     Suitable for injecting into LLM system prompts.
     """
 
+    def snapshot(self, domain_id: str, db: Session) -> DomainContext:
+        """The domain's cached context, rebuilt only if its inputs changed."""
+        from backend.analyzers.gap_detector import _write_stamp
+        from backend.schema_registry import registry
+
+        schema = registry.get_domain(domain_id)
+        stamp = _write_stamp(db)
+        cached = _context_cache.get(domain_id, schema, stamp)
+        if cached is not None:
+            return cached
+        ctx = self._assemble(domain_id, db)
+        return _context_cache.put(domain_id, schema, stamp, ctx, self.format_for_llm(ctx))
+
     def build_domain_context(self, domain_id: str, db: Session) -> Dict[str, Any]:
         """Return a rich context dict for the given domain."""
+        return self.snapshot(domain_id, db).context
 
+    def _assemble(self, domain_id: str, db: Session) -> Dict[str, Any]:
         ctx: Dict[str, Any] = {
             "domain_id":    domain_id,
             "generated_at": datetime.now(timezone.utc).isoformat(),
@@ -44,8 +143,8 @@ class ContextEngine:
     # ── Private helpers ────────────────────────────────────────────────────────
 
     def _get_schema(self, domain_id: str) -> Dict[str, Any]:
-        from backend.schema_registry import SchemaRegistry
-        domain = SchemaRegistry().get_domain(domain_id)
+        from backend.schema_registry import registry
+        domain = registry.get_domain(domain_id)
         if domain is None:
             return {}
         return {
@@ -58,11 +157,9 @@ class ContextEngine:
         }
 
     def _get_entity_stats(self, domain_id: str, db: Session) -> Dict[str, Any]:
-        from backend import models
-        total    = db.query(models.RawEntity).count()
-        enriched = db.query(models.RawEntity).filter(
-            models.RawEntity.enrichment_status == "done"
-        ).count()
+        from backend.analyzers.gap_detector import GapAnalyzer
+        m = GapAnalyzer().metrics(domain_id, db)   # shares the cached gap aggregate
+        total, enriched = m.total, m.enriched
         return {
             "total":        total,
             "enriched":     enriched,
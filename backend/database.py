@@ -1,6 +1,9 @@
 import os
+import re
+import sqlite3
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import declarative_base, sessionmaker
 
 SQLALCHEMY_DATABASE_URL = os.environ.get("DATABASE_URL", "sqlite:///./sql_app.db")
@@ -22,6 +25,33 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
 
+# ── SQLite SQL functions (Sprint 93) ──────────────────────────────────────────
+# PostgreSQL/MySQL ship REGEXP_REPLACE and Unicode-aware LOWER/UPPER; SQLite does not,
+# so set-based harmonization and transformations register Python equivalents on every connection
+# (including test engines — the listener is attached to the Engine class).
+
+def _sqlite_regexp_replace(value, pattern, replacement):
+    if value is None:
+        return None
+    return re.sub(pattern, replacement, value)
+
+
+def _sqlite_unicode_lower(value):
+    return value.lower() if isinstance(value, str) else value
+
+
+def _sqlite_unicode_upper(value):
+    return value.upper() if isinstance(value, str) else value
+
+
+@event.listens_for(Engine, "connect")
+def _register_sqlite_functions(dbapi_conn, _connection_record):
+    if isinstance(dbapi_conn, sqlite3.Connection):
+        dbapi_conn.create_function("regexp_replace", 3, _sqlite_regexp_replace, deterministic=True)
+        dbapi_conn.create_function("ukip_lower", 1, _sqlite_unicode_lower, deterministic=True)
+        dbapi_conn.create_function("ukip_upper", 1, _sqlite_unicode_upper, deterministic=True)
+
+
 def get_db():
     db = SessionLocal()
     try:
@@ -10,6 +10,7 @@ from backend.adapters.enrichment.openalex import OpenAlexAdapter
 from backend.adapters.enrichment.scholar import ScholarAdapter
 from backend.adapters.enrichment.scopus import ScopusAdapter
 from backend.adapters.enrichment.wos import WebOfScienceAdapter
+from backend.analyzers.concept_index import concept_index
 from backend.circuit_breaker import CircuitBreaker, CircuitOpenError
 
 logger = logging.getLogger(__name__)
@@ -165,6 +166,9 @@ def enrich_single_record(db: Session, entity: models.RawEntity) -> models.RawEnt
         logger.warning(f"Unexpected error enriching record ID {entity.id}: {type(e).__name__}: {e}")
         entity.enrichment_status = "failed"
 
+    if entity.enrichment_status == "completed":
+        # Sprint 107 — concept index changes in the same transaction
+        concept_index.index_entity(db, entity)
     db.commit()
     return entity
 
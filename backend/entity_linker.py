@@ -7,6 +7,12 @@ Algorithm:
   2. Build a TF-IDF matrix (smoothed IDF, L2-normalized rows).
   3. Cosine similarity via matrix dot-product (vectorized, fast).
   4. Return pairs above threshold, skipping dismissed pairs.
+
+Merging:
+  merge_entities       — one primary absorbs its secondaries (single group).
+  bulk_merge_entities  — thousands of groups in one transaction; foreign
+                         references are repointed with one UPDATE … FROM a
+                         temporary old_id → new_id mapping table.
 """
 from __future__ import annotations
 
@@ -16,6 +22,7 @@ from collections import Counter, defaultdict
 from dataclasses import dataclass
 
 import numpy as np
+from sqlalchemy import Column, Integer, MetaData, Table, bindparam, delete, or_, select, update
 from sqlalchemy.orm import Session
 
 from . import models
@@ -150,6 +157,110 @@ _MERGE_FIELDS = [
     "enrichment_doi", "enrichment_concepts", "enrichment_source",
 ]
 
+MERGE_STRATEGIES = ("keep_primary", "keep_non_empty", "keep_longest")
+
+_MERGE_CHUNK = 500   # ids per IN (...) list / DELETE statement
+
+# Columns that hold a raw_entities.id and must follow an entity into its primary
+_ENTITY_REFERENCES = [
+    (models.EntityRelationship.__table__, "source_id"),
+    (models.EntityRelationship.__table__, "target_id"),
+    (models.Annotation.__table__,         "entity_id"),
+    (models.StoreSyncMapping.__table__,   "local_entity_id"),
+]
+
+# Session-local old_id → new_id mapping used by repoint_references()
+_merge_id_map = Table(
+    "merge_id_map", MetaData(),
+    Column("old_id", Integer, primary_key=True),
+    Column("new_id", Integer, nullable=False),
+    prefixes=["TEMPORARY"],
+)
+
+
+def _chunks(ids: list[int], size: int = _MERGE_CHUNK):
+    for i in range(0, len(ids), size):
+        yield ids[i:i + size]
+
+
+def _merged_values(primary, secondaries, strategy: str) -> dict:
+    """
+    Compute the primary's post-merge field values. `primary` and `secondaries`
+    may be ORM entities or Core rows — only attribute access is used.
+    """
+    merged = {f: getattr(primary, f, None) for f in _MERGE_FIELDS}
+
+    for field_name in _MERGE_FIELDS:
+        primary_val = merged[field_name]
+        for sec in secondaries:
+            sec_val = getattr(sec, field_name, None)
+            if not sec_val:
+                continue
+            if strategy == "keep_primary":
+                break                              # primary always wins — skip all secondaries
+            elif strategy == "keep_non_empty":
+                if not primary_val:
+                    merged[field_name] = primary_val = sec_val
+            elif strategy == "keep_longest":
+                if len(str(sec_val)) > len(str(primary_val or "")):
+                    merged[field_name] = primary_val = sec_val
+
+    # Enrichment: take the maximum citation count
+    merged["enrichment_citation_count"] = max(
+        [primary.enrichment_citation_count or 0]
+        + [s.enrichment_citation_count or 0 for s in secondaries]
+    )
+
+    # Promote enrichment_status if any secondary is "completed"
+    all_statuses = {primary.enrichment_status} | {s.enrichment_status for s in secondaries}
+    merged["enrichment_status"] = (
+        "completed" if "completed" in all_statuses else primary.enrichment_status
+    )
+    return merged
+
+
+def repoint_references(db: Session, id_map: dict[int, int]) -> int:
+    """
+    Point every foreign reference to an absorbed entity at its primary.
+
+    The mapping is loaded once into a temporary table and each referencing
+    column is rewritten with a single UPDATE … FROM statement. Self-loop
+    relationships created by the rewrite and dismissals that mention an
+    absorbed id are dropped. Does not commit. Returns rows repointed.
+    """
+    if not id_map:
+        return 0
+    conn = db.connection()
+    _merge_id_map.drop(conn, checkfirst=True)
+    _merge_id_map.create(conn)
+    try:
+        rows = [{"old_id": old, "new_id": new} for old, new in id_map.items()]
+        for chunk in _chunks(rows):
+            conn.execute(_merge_id_map.insert(), chunk)
+
+        repointed = 0
+        for table, col in _ENTITY_REFERENCES:
+            stmt = (
+                update(table)
+                .where(table.c[col] == _merge_id_map.c.old_id)
+                .values({col: _merge_id_map.c.new_id})
+            )
+            repointed += conn.execute(stmt).rowcount or 0
+
+        rel = models.EntityRelationship.__table__
+        conn.execute(delete(rel).where(
+            rel.c.source_id == rel.c.target_id,
+            rel.c.source_id.in_(select(_merge_id_map.c.new_id)),
+        ))
+        dis = models.LinkDismissal.__table__
+        absorbed = select(_merge_id_map.c.old_id)
+        conn.execute(delete(dis).where(
+            or_(dis.c.entity_a_id.in_(absorbed), dis.c.entity_b_id.in_(absorbed))
+        ))
+    finally:
+        _merge_id_map.drop(conn, checkfirst=True)
+    return repointed
+
 
 def merge_entities(
     db: Session,
@@ -176,34 +287,10 @@ def merge_entities(
     if not secondaries:
         raise ValueError("No secondary entities found")
 
-    for field_name in _MERGE_FIELDS:
-        primary_val = getattr(primary, field_name, None)
-        for sec in secondaries:
-            sec_val = getattr(sec, field_name, None)
-            if not sec_val:
-                continue
-            if strategy == "keep_primary":
-                break                              # primary always wins — skip all secondaries
-            elif strategy == "keep_non_empty":
-                if not primary_val:
-                    setattr(primary, field_name, sec_val)
-                    primary_val = sec_val
-            elif strategy == "keep_longest":
-                if len(str(sec_val)) > len(str(primary_val or "")):
-                    setattr(primary, field_name, sec_val)
-                    primary_val = sec_val
+    for field_name, value in _merged_values(primary, secondaries, strategy).items():
+        setattr(primary, field_name, value)
 
-    # Enrichment: take the maximum citation count
-    max_citations = max(
-        [primary.enrichment_citation_count or 0]
-        + [s.enrichment_citation_count or 0 for s in secondaries]
-    )
-    primary.enrichment_citation_count = max_citations
-
-    # Promote enrichment_status if any secondary is "completed"
-    all_statuses = {primary.enrichment_status} | {s.enrichment_status for s in secondaries}
-    if "completed" in all_statuses:
-        primary.enrichment_status = "completed"
+    repoint_references(db, {sec.id: primary.id for sec in secondaries})
 
     # Remove secondaries
     for sec in secondaries:
@@ -212,3 +299,63 @@ def merge_entities(
     db.commit()
     db.refresh(primary)
     return primary
+
+
+def bulk_merge_entities(db: Session, groups: list[dict]) -> dict:
+    """
+    Merge many (primary_id, secondary_ids, strategy) groups in one transaction.
+
+    Rows are read column-wise in id chunks (no ORM identity map), merged values
+    are written back with one executemany UPDATE, references are repointed via
+    repoint_references() and secondaries are deleted in chunks.
+
+    Raises ValueError if an id appears in more than one group or a primary
+    does not exist. Missing secondaries are skipped. Commits on success.
+    """
+    seen: set[int] = set()
+    for g in groups:
+        ids = [g["primary_id"], *g["secondary_ids"]]
+        if seen.intersection(ids) or len(set(ids)) != len(ids):
+            raise ValueError(f"Entity ids overlap across merge groups (group primary {g['primary_id']})")
+        seen.update(ids)
+
+    table = models.RawEntity.__table__
+    cols = [table.c.id, table.c.enrichment_citation_count, table.c.enrichment_status] + [
+        table.c[f] for f in _MERGE_FIELDS
+    ]
+    rows: dict[int, object] = {}
+    for chunk in _chunks(sorted(seen)):
+        for row in db.execute(select(*cols).where(table.c.id.in_(chunk))):
+            rows[row.id] = row
+
+    missing = [g["primary_id"] for g in groups if g["primary_id"] not in rows]
+    if missing:
+        raise ValueError(f"Primary entities not found: {missing[:20]}")
+
+    updates: list[dict] = []
+    id_map: dict[int, int] = {}
+    for g in groups:
+        secondaries = [rows[s] for s in g["secondary_ids"] if s in rows]
+        if not secondaries:
+            continue
+        merged = _merged_values(rows[g["primary_id"]], secondaries, g.get("strategy") or "keep_non_empty")
+        updates.append({"_id": g["primary_id"], **merged})
+        id_map.update({s.id: g["primary_id"] for s in secondaries})
+
+    if updates:
+        db.execute(
+            update(table).where(table.c.id == bindparam("_id")),
+            updates,
+        )
+    repointed = repoint_references(db, id_map)
+
+    deleted = 0
+    for chunk in _chunks(sorted(id_map)):
+        deleted += db.execute(delete(table).where(table.c.id.in_(chunk))).rowcount or 0
+
+    db.commit()
+    return {
+        "groups_merged":      len(updates),
+        "deleted_count":      deleted,
+        "references_updated": repointed,
+    }
@@ -0,0 +1,77 @@
+"""
+Arrow IPC / Parquet responses — Sprint 106.
+
+Content negotiation for tabular endpoints (cube, cube export, analyzers):
+
+  Accept: application/vnd.apache.arrow.stream  → Arrow IPC stream
+  Accept: application/vnd.apache.parquet       → Parquet file
+
+Anything else keeps the JSON response. Scalar context that does not fit the
+table (domain_id, totals, …) travels in the Arrow schema metadata under
+"ukip", JSON-encoded. DuckDB results are passed through as Arrow tables
+without a pandas / dict round-trip.
+"""
+from __future__ import annotations
+
+import json
+from typing import Optional
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+from fastapi import Response
+
+ARROW_STREAM = "application/vnd.apache.arrow.stream"
+PARQUET = "application/vnd.apache.parquet"
+
+_MEDIA_TYPES = {ARROW_STREAM: "arrow", PARQUET: "parquet"}
+
+
+def negotiate(accept: Optional[str]) -> Optional[str]:
+    """'arrow' / 'parquet' when the Accept header asks for it, else None (JSON)."""
+    if not accept:
+        return None
+    for part in accept.split(","):
+        fmt = _MEDIA_TYPES.get(part.split(";")[0].strip().lower())
+        if fmt:
+            return fmt
+    return None
+
+
+def records_table(records: list[dict], columns: Optional[list[str]] = None) -> pa.Table:
+    """Build a table from row dicts (column order from `columns` or the first row)."""
+    if columns is None:
+        columns = list(records[0]) if records else []
+    return pa.table({c: [r.get(c) for r in records] for c in columns})
+
+
+def with_metadata(table: pa.Table, meta: dict) -> pa.Table:
+    return table.replace_schema_metadata({
+        **(table.schema.metadata or {}),
+        b"ukip": json.dumps(meta, default=str).encode(),
+    })
+
+
+def to_bytes(table: pa.Table, fmt: str) -> bytes:
+    sink = pa.BufferOutputStream()
+    if fmt == "parquet":
+        pq.write_table(table, sink)
+    else:
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def table_response(
+    table: pa.Table,
+    fmt: str,
+    meta: Optional[dict] = None,
+    filename: Optional[str] = None,
+) -> Response:
+    if meta:
+        table = with_metadata(table, meta)
+    media_type = PARQUET if fmt == "parquet" else ARROW_STREAM
+    headers = {"Vary": "Accept"}
+    if filename:
+        ext = "parquet" if fmt == "parquet" else "arrows"
+        headers["Content-Disposition"] = f'attachment; filename="{filename}.{ext}"'
+    return Response(content=to_bytes(table, fmt), media_type=media_type, headers=headers)
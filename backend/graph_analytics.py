@@ -4,6 +4,23 @@ Graph Analytics Engine — Sprint 73.
 All functions operate on pre-fetched edge data (list of tuples) to keep
 DB access in the caller and analytics logic pure and testable.
 
+Sprint 115: sparse graph cache. The relationship graph is held as a
+scipy.sparse CSR adjacency matrix over remapped node indices (entity ids
+sorted, index ↔ id via searchsorted):
+
+  - PageRank is a sparse mat-vec power iteration (same update and
+    normalisation as the original dict version: dangling mass is not
+    redistributed, scores are normalised at the end)
+  - weakly connected components come from scipy.sparse.csgraph
+  - degrees are vector sums over the adjacency, per-type breakdowns one
+    mask over the edge arrays
+
+graph_cache.get(db) keeps one CSRGraph, stamped with cheap aggregates over
+entity_relationships (count, MAX(id), MAX(created_at), endpoint sums — the
+sums move when a merge repoints edges) and dropped explicitly by
+invalidate_graph_cache() on relationship create / delete and entity
+merges. PageRank and components are computed once per cached graph.
+
 Public API
 ----------
 fetch_edges(db)                   → list[tuple[int, int, str, float]]
@@ -12,15 +29,29 @@ pagerank(edges, damping, max_iter, tol) → dict[int, float]
 connected_components(edges)       → dict[int, int]  (node → component_id)
 component_sizes(components)       → dict[int, int]  (component_id → size)
 shortest_path(source, target, edges) → dict | None
+graph_cache.get(db)               → CSRGraph (cached)
+invalidate_graph_cache()
 """
 from __future__ import annotations
+
+import threading
 from collections import defaultdict, deque
+from functools import cached_property
+from typing import Optional
+
+import numpy as np
+import scipy.sparse as sp
+from scipy.sparse.csgraph import connected_components as _csgraph_components
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
+
 from backend import models
 
 
 EdgeList = list[tuple[int, int, str, float]]  # (source_id, target_id, relation_type, weight)
 
+_rel = models.EntityRelationship.__table__
+
 
 # ── Data fetching ─────────────────────────────────────────────────────────────
 
@@ -35,31 +66,132 @@ def fetch_edges(db: Session) -> EdgeList:
     return [(r[0], r[1], r[2], r[3]) for r in rows]
 
 
+# ── Sparse graph ─────────────────────────────────────────────────────────────
+
+class CSRGraph:
+    """Directed multigraph as a CSR adjacency matrix over remapped node indices."""
+
+    def __init__(self, edges: EdgeList):
+        self.edges = edges
+        src = np.fromiter((e[0] for e in edges), dtype=np.int64, count=len(edges))
+        dst = np.fromiter((e[1] for e in edges), dtype=np.int64, count=len(edges))
+        # node_ids[i] is the entity id of node i
+        self.node_ids, inverse = np.unique(np.concatenate([src, dst]), return_inverse=True)
+        self.src, self.dst = inverse[:len(edges)], inverse[len(edges):]
+        self.relations = [e[2] for e in edges]
+        n = len(self.node_ids)
+        # A[i, j] = number of edges i → j
+        self.adjacency = sp.csr_matrix(
+            (np.ones(len(edges), dtype=np.float64), (self.src, self.dst)), shape=(n, n)
+        )
+        self.out_degree = np.bincount(self.src, minlength=n)
+        self.in_degree = np.bincount(self.dst, minlength=n)
+
+    @property
+    def n_nodes(self) -> int:
+        return len(self.node_ids)
+
+    @property
+    def n_edges(self) -> int:
+        return len(self.edges)
+
+    def index_of(self, entity_id: int) -> Optional[int]:
+        i = int(np.searchsorted(self.node_ids, entity_id))
+        return i if i < self.n_nodes and self.node_ids[i] == entity_id else None
+
+    # ── Degree ────────────────────────────────────────────────────────────
+
+    def degree(self, entity_id: int) -> dict:
+        """degree_centrality() for one entity (zeros when it has no edges)."""
+        i = self.index_of(entity_id)
+        out_by_type: dict[str, int] = defaultdict(int)
+        in_by_type:  dict[str, int] = defaultdict(int)
+        if i is not None:
+            for k in np.flatnonzero(self.src == i):
+                out_by_type[self.relations[k]] += 1
+            for k in np.flatnonzero(self.dst == i):
+                in_by_type[self.relations[k]] += 1
+        out_degree = sum(out_by_type.values())
+        in_degree  = sum(in_by_type.values())
+        return {
+            "in_degree":       in_degree,
+            "out_degree":      out_degree,
+            "total_degree":    in_degree + out_degree,
+            "in_by_type":      dict(in_by_type),
+            "out_by_type":     dict(out_by_type),
+        }
+
+    def top_degree(self, k: int) -> list[tuple[int, int]]:
+        """The k nodes with the highest total degree as (entity_id, degree)."""
+        total = self.in_degree + self.out_degree
+        order = np.lexsort((self.node_ids, -total))[:k]
+        return [(int(self.node_ids[i]), int(total[i])) for i in order]
+
+    # ── PageRank ──────────────────────────────────────────────────────────
+
+    def pagerank_scores(self, damping: float = 0.85, max_iter: int = 100,
+                        tol: float = 1e-6) -> np.ndarray:
+        """Scores per node index, normalised to sum to 1."""
+        n = self.n_nodes
+        if n == 0:
+            return np.zeros(0)
+        # Transposed transition matrix: column i spreads rank[i] over its out-edges
+        inv_out = np.divide(1.0, self.out_degree, out=np.zeros(n), where=self.out_degree > 0)
+        transition_t = (sp.diags(inv_out) @ self.adjacency).T.tocsr()
+        rank = np.full(n, 1.0 / n)
+        for _ in range(max_iter):
+            new_rank = (1.0 - damping) / n + damping * (transition_t @ rank)
+            diff = np.abs(new_rank - rank).sum()
+            rank = new_rank
+            if diff < tol:
+                break
+        total = rank.sum() or 1.0
+        return rank / total
+
+    @cached_property
+    def ranks(self) -> dict[int, float]:
+        """{entity_id: PageRank score} with default parameters, rounded like pagerank()."""
+        scores = np.round(self.pagerank_scores(), 6)
+        return dict(zip(self.node_ids.tolist(), scores.tolist()))
+
+    @cached_property
+    def rank_order(self) -> list[int]:
+        """Entity ids by descending PageRank (ties by id)."""
+        scores = np.array(list(self.ranks.values()))
+        return self.node_ids[np.lexsort((self.node_ids, -scores))].tolist()
+
+    def rank_of(self, entity_id: int) -> Optional[int]:
+        """1-based PageRank position of an entity, None if it has no edges."""
+        if self.index_of(entity_id) is None:
+            return None
+        return self._rank_positions[entity_id]
+
+    @cached_property
+    def _rank_positions(self) -> dict[int, int]:
+        return {nid: pos + 1 for pos, nid in enumerate(self.rank_order)}
+
+    # ── Components ────────────────────────────────────────────────────────
+
+    @cached_property
+    def components(self) -> dict[int, int]:
+        """{entity_id: component_id} for weakly connected components."""
+        if self.n_nodes == 0:
+            return {}
+        _, labels = _csgraph_components(self.adjacency, directed=True, connection="weak")
+        return dict(zip(self.node_ids.tolist(), labels.tolist()))
+
+    @cached_property
+    def sizes(self) -> dict[int, int]:
+        return component_sizes(self.components)
+
+
 # ── Degree Centrality ────────────────────────────────────────────────────────
 
 def degree_centrality(entity_id: int, edges: EdgeList) -> dict:
     """
     Return in-degree, out-degree, and per-relation-type breakdown for one entity.
     """
-    out_by_type: dict[str, int] = defaultdict(int)
-    in_by_type:  dict[str, int] = defaultdict(int)
-
-    for src, dst, rel, _ in edges:
-        if src == entity_id:
-            out_by_type[rel] += 1
-        if dst == entity_id:
-            in_by_type[rel] += 1
-
-    out_degree = sum(out_by_type.values())
-    in_degree  = sum(in_by_type.values())
-
-    return {
-        "in_degree":       in_degree,
-        "out_degree":      out_degree,
-        "total_degree":    in_degree + out_degree,
-        "in_by_type":      dict(in_by_type),
-        "out_by_type":     dict(out_by_type),
-    }
+    return CSRGraph(edges).degree(entity_id)
 
 
 # ── PageRank ────────────────────────────────────────────────────────────────
@@ -75,76 +207,19 @@ def pagerank(
     Returns {node_id: score} normalised so scores sum to 1.0.
     Returns {} when the graph is empty.
     """
-    nodes: set[int] = set()
-    out_neighbors: dict[int, list[int]] = defaultdict(list)
-    in_neighbors:  dict[int, list[int]] = defaultdict(list)
-
-    for src, dst, _, _ in edges:
-        nodes.add(src)
-        nodes.add(dst)
-        out_neighbors[src].append(dst)
-        in_neighbors[dst].append(src)
-
-    N = len(nodes)
-    if N == 0:
-        return {}
-
-    rank: dict[int, float] = {n: 1.0 / N for n in nodes}
-
-    for _ in range(max_iter):
-        new_rank: dict[int, float] = {}
-        for n in nodes:
-            r = (1.0 - damping) / N
-            for pred in in_neighbors.get(n, []):
-                out_deg = len(out_neighbors.get(pred, []))
-                if out_deg > 0:
-                    r += damping * rank[pred] / out_deg
-            new_rank[n] = r
-
-        diff = sum(abs(new_rank[n] - rank[n]) for n in nodes)
-        rank = new_rank
-        if diff < tol:
-            break
-
-    # Normalise
-    total = sum(rank.values()) or 1.0
-    return {n: round(v / total, 6) for n, v in rank.items()}
+    g = CSRGraph(edges)
+    scores = np.round(g.pagerank_scores(damping, max_iter, tol), 6)
+    return dict(zip(g.node_ids.tolist(), scores.tolist()))
 
 
 # ── Connected Components (weakly connected, treats edges as undirected) ───────
 
 def connected_components(edges: EdgeList) -> dict[int, int]:
     """
-    Return {node_id: component_id} for weakly connected components.
-    Uses iterative BFS to avoid Python recursion limits on large graphs.
+    Return {node_id: component_id} for weakly connected components
+    (scipy.sparse.csgraph over the CSR adjacency).
     """
-    adj: dict[int, set[int]] = defaultdict(set)
-    nodes: set[int] = set()
-
-    for src, dst, _, _ in edges:
-        adj[src].add(dst)
-        adj[dst].add(src)
-        nodes.add(src)
-        nodes.add(dst)
-
-    visited: dict[int, int] = {}
-    comp_id = 0
-
-    for node in nodes:
-        if node in visited:
-            continue
-        queue: deque[int] = deque([node])
-        while queue:
-            curr = queue.popleft()
-            if curr in visited:
-                continue
-            visited[curr] = comp_id
-            for neighbor in adj[curr]:
-                if neighbor not in visited:
-                    queue.append(neighbor)
-        comp_id += 1
-
-    return visited
+    return CSRGraph(edges).components
 
 
 def component_sizes(components: dict[int, int]) -> dict[int, int]:
@@ -202,3 +277,43 @@ def shortest_path(
             queue.append((neighbor, new_path, new_rels))
 
     return None  # unreachable
+
+
+# ── Cache ────────────────────────────────────────────────────────────────────
+
+def _graph_stamp(db: Session) -> tuple:
+    """Cheap aggregates that move on any insert, delete or endpoint repoint."""
+    return tuple(db.execute(select(
+        func.count(), func.max(_rel.c.id), func.max(_rel.c.created_at),
+        func.sum(_rel.c.source_id), func.sum(_rel.c.target_id),
+    )).one())
+
+
+class GraphCache:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entry: Optional[tuple[tuple, CSRGraph]] = None
+
+    def get(self, db: Session) -> CSRGraph:
+        """The relationship graph, rebuilt only when entity_relationships changed."""
+        stamp = _graph_stamp(db)
+        with self._lock:
+            entry = self._entry
+        if entry and entry[0] == stamp:
+            return entry[1]
+        graph = CSRGraph(fetch_edges(db))
+        with self._lock:
+            self._entry = (stamp, graph)
+        return graph
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entry = None
+
+
+graph_cache = GraphCache()
+
+
+def invalidate_graph_cache() -> None:
+    """Drop the cached graph (call after committing relationship changes)."""
+    graph_cache.clear()
@@ -0,0 +1,16 @@
+"""
+UKIP Harmonization Engine — set-based normalization steps.
+
+Each step declares, per field, an SQL expression that computes the new value
+from the current column value (TRIM, LOWER, REGEXP_REPLACE, …). Preview and
+apply never load entities into the ORM:
+
+  preview  — SELECT id, old, new … WHERE new IS DISTINCT FROM old LIMIT n
+  apply    — INSERT … SELECT into harmonization_change_records, then one
+             UPDATE raw_entities SET … WHERE new IS DISTINCT FROM old
+  undo     — UPDATE raw_entities SET f = cr.old_value
+             FROM harmonization_change_records cr WHERE cr.log_id = ?
+
+SQLite gets REGEXP_REPLACE / Unicode LOWER via functions registered in
+backend.database; PostgreSQL and MySQL use their native implementations.
+"""
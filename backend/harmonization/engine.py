@@ -0,0 +1,287 @@
+"""
+Set-based harmonization step execution.
+
+A step is a SqlStep: a mapping field → expression builder. Builders receive
+the raw_entities column and return a SQLAlchemy expression for the new value,
+so the same declaration drives preview counts, change capture and the UPDATE.
+"""
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from itertools import islice
+from typing import Callable, Iterable, Optional
+
+from sqlalchemy import String, func, insert, literal, or_, select, update
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.elements import ColumnElement
+from sqlalchemy.sql.functions import FunctionElement
+
+from backend import models
+
+_entities = models.RawEntity.__table__
+_changes = models.HarmonizationChangeRecord.__table__
+
+CHANGE_CHUNK = 5_000  # change records per executemany batch
+
+
+# ── Portable SQL functions ────────────────────────────────────────────────────
+
+class regexp_sub(FunctionElement):
+    """REGEXP_REPLACE(value, pattern, replacement) replacing every match."""
+    type = String()
+    inherit_cache = True
+    name = "regexp_sub"
+
+
+@compiles(regexp_sub)
+def _regexp_sub_default(element, compiler, **kw):
+    # SQLite (registered Python function) and MySQL 8 replace all matches by default
+    return "regexp_replace(%s)" % compiler.process(element.clauses, **kw)
+
+
+@compiles(regexp_sub, "postgresql")
+def _regexp_sub_pg(element, compiler, **kw):
+    return "regexp_replace(%s, 'g')" % compiler.process(element.clauses, **kw)
+
+
+class unicode_lower(FunctionElement):
+    """LOWER() that folds non-ASCII letters on every backend."""
+    type = String()
+    inherit_cache = True
+    name = "unicode_lower"
+
+
+@compiles(unicode_lower)
+def _unicode_lower_default(element, compiler, **kw):
+    return "lower(%s)" % compiler.process(element.clauses, **kw)
+
+
+@compiles(unicode_lower, "sqlite")
+def _unicode_lower_sqlite(element, compiler, **kw):
+    return "ukip_lower(%s)" % compiler.process(element.clauses, **kw)
+
+
+class unicode_upper(FunctionElement):
+    """UPPER() that folds non-ASCII letters on every backend."""
+    type = String()
+    inherit_cache = True
+    name = "unicode_upper"
+
+
+@compiles(unicode_upper)
+def _unicode_upper_default(element, compiler, **kw):
+    return "upper(%s)" % compiler.process(element.clauses, **kw)
+
+
+@compiles(unicode_upper, "sqlite")
+def _unicode_upper_sqlite(element, compiler, **kw):
+    return "ukip_upper(%s)" % compiler.process(element.clauses, **kw)
+
+
+def strip_ws(col: ColumnElement) -> ColumnElement:
+    """Python str.strip() equivalent (all leading/trailing whitespace)."""
+    return regexp_sub(col, literal(r"^\s+|\s+$"), literal(""))
+
+
+def collapse_ws(col: ColumnElement) -> ColumnElement:
+    """re.sub(r"\\s+", " ", value).strip() equivalent."""
+    return func.trim(regexp_sub(col, literal(r"\s+"), literal(" ")))
+
+
+# ── Step declarations ─────────────────────────────────────────────────────────
+
+@dataclass(frozen=True)
+class SqlStep:
+    """
+    fields: field → SQL expression builder over the raw_entities column.
+    py:     field → equivalent per-value function, used by the fused
+            row pipeline (backend.harmonization.pipeline). Both must agree.
+    """
+    step_id: str
+    fields:  dict[str, Callable[[ColumnElement], ColumnElement]]
+    py:      dict[str, Callable[[Optional[str]], Optional[str]]]
+
+    def new_value(self, field: str) -> ColumnElement:
+        return self.fields[field](_entities.c[field])
+
+    def changed(self, field: str) -> ColumnElement:
+        """Row predicate: the field would change (NULL-safe)."""
+        return self.new_value(field).is_distinct_from(_entities.c[field])
+
+    def any_changed(self) -> ColumnElement:
+        return or_(*[self.changed(f) for f in self.fields])
+
+
+_WS = re.compile(r"\s+")
+
+
+def _py_collapse_ws(v):
+    return None if v is None else _WS.sub(" ", v).strip()
+
+
+def _py_canonical(v):
+    return None if v is None else (v.strip() or None)
+
+
+def _py_entity_type(v):
+    return None if v is None else v.strip().lower()
+
+
+def _py_default_validation(v):
+    return v or "pending"
+
+
+SQL_STEPS: dict[str, SqlStep] = {
+    "normalize_labels": SqlStep(
+        "normalize_labels",
+        {"primary_label": collapse_ws, "secondary_label": collapse_ws},
+        {"primary_label": _py_collapse_ws, "secondary_label": _py_collapse_ws},
+    ),
+    "normalize_canonical_ids": SqlStep(
+        "normalize_canonical_ids",
+        {"canonical_id": lambda c: func.nullif(strip_ws(c), "")},
+        {"canonical_id": _py_canonical},
+    ),
+    "normalize_entity_types": SqlStep(
+        "normalize_entity_types",
+        {"entity_type": lambda c: unicode_lower(strip_ws(c))},
+        {"entity_type": _py_entity_type},
+    ),
+    "set_default_validation": SqlStep(
+        "set_default_validation",
+        {"validation_status": lambda c: func.coalesce(func.nullif(c, ""), "pending")},
+        {"validation_status": _py_default_validation},
+    ),
+}
+
+
+# ── Execution ─────────────────────────────────────────────────────────────────
+
+def _change_select(step: SqlStep, field: str):
+    return (
+        select(
+            _entities.c.id.label("record_id"),
+            literal(field).label("field"),
+            _entities.c[field].label("old_value"),
+            step.new_value(field).label("new_value"),
+        )
+        .where(step.changed(field))
+    )
+
+
+def count_changes(db: Session, step: SqlStep) -> int:
+    """Number of field-level changes the step would make (one COUNT per field)."""
+    return sum(
+        db.execute(select(func.count()).select_from(_entities).where(step.changed(f))).scalar() or 0
+        for f in step.fields
+    )
+
+
+def preview_changes(db: Session, step: SqlStep, limit: int) -> list[dict]:
+    """First `limit` field-level changes ordered by (field, record_id) — no writes."""
+    changes: list[dict] = []
+    for f in step.fields:
+        remaining = limit - len(changes)
+        if remaining <= 0:
+            break
+        rows = db.execute(
+            _change_select(step, f).order_by(_entities.c.id).limit(remaining)
+        ).mappings()
+        changes.extend(dict(r) for r in rows)
+    return changes
+
+
+def apply_step(db: Session, step: SqlStep, log_id: int) -> dict[str, int]:
+    """
+    Capture change records with INSERT … SELECT, then rewrite every affected
+    row with a single UPDATE. Does not commit. Returns {field: changed_rows}.
+    """
+    per_field: dict[str, int] = {}
+    for f in step.fields:
+        sel = _change_select(step, f).add_columns(literal(log_id).label("log_id"))
+        result = db.execute(
+            insert(_changes).from_select(
+                ["record_id", "field", "old_value", "new_value", "log_id"], sel
+            )
+        )
+        per_field[f] = result.rowcount or 0
+
+    if any(per_field.values()):
+        db.execute(
+            update(_entities)
+            .where(step.any_changed())
+            .values({f: step.new_value(f) for f in step.fields})
+            .execution_options(synchronize_session=False)
+        )
+    return per_field
+
+
+def change_sample(db: Session, log_id: int, limit: int = 20) -> list[dict]:
+    rows = db.execute(
+        select(_changes.c.record_id, _changes.c.field, _changes.c.old_value, _changes.c.new_value)
+        .where(_changes.c.log_id == log_id)
+        .order_by(_changes.c.id)
+        .limit(limit)
+    ).mappings()
+    return [dict(r) for r in rows]
+
+
+# ── Change records & undo/redo ────────────────────────────────────────────────
+
+def write_change_records(
+    db: Session, log_id: Optional[int], changes: Iterable[dict],
+    chunk_size: int = CHANGE_CHUNK,
+) -> int:
+    """
+    Insert change dicts (record_id, field, old_value, new_value) with one Core
+    executemany per chunk, so memory is bounded by chunk_size however many
+    changes the iterable yields. log_id=None keeps each change's own log_id
+    (multi-log writers such as the fused pipeline). Does not commit. Returns
+    rows written.
+    """
+    it = iter(changes)
+    written = 0
+    while True:
+        chunk = list(islice(it, chunk_size))
+        batch = chunk if log_id is None else [{**c, "log_id": log_id} for c in chunk]
+        if not batch:
+            return written
+        db.execute(insert(_changes), batch)
+        written += len(batch)
+
+
+def revert_log(db: Session, log_id: int, direction: str = "undo") -> int:
+    """
+    Restore (undo → old_value) or re-apply (redo → new_value) every change of
+    a log with one UPDATE raw_entities … FROM harmonization_change_records per
+    touched field. Does not commit. Returns rows updated.
+    """
+    source = _changes.c.old_value if direction == "undo" else _changes.c.new_value
+    fields = db.execute(
+        select(_changes.c.field).where(_changes.c.log_id == log_id).distinct()
+    ).scalars().all()
+
+    updated = 0
+    for f in fields:
+        if f not in _entities.c:
+            continue
+        result = db.execute(
+            update(_entities)
+            .where(
+                _changes.c.log_id == log_id,
+                _changes.c.field == f,
+                _changes.c.record_id == _entities.c.id,
+            )
+            .values({f: source})
+            .execution_options(synchronize_session=False)
+        )
+        updated += result.rowcount or 0
+    return updated
+
+
+def has_change_records(db: Session, log_id: int) -> bool:
+    return db.execute(
+        select(_changes.c.id).where(_changes.c.log_id == log_id).limit(1)
+    ).first() is not None
@@ -19,6 +19,8 @@ from slowapi.errors import RateLimitExceeded
 from slowapi.middleware import SlowAPIMiddleware
 
 from backend import database, enrichment_worker, models
+from backend.analyzers.concept_index import concept_index
+from backend.olap_store import olap_store
 from backend.routers.limiter import limiter
 
 # ── Domain routers ────────────────────────────────────────────────────────────
@@ -153,8 +155,14 @@ async def lifespan(app: FastAPI):
     # Start the scheduled-reports scheduler (Sprint 79)
     scheduled_reports.start_scheduler()
 
+    # Catch the concept index up with writes made while the server was down (Sprint 107)
+    concept_index.schedule_sync()
+
     yield  # Server is running
 
+    # Shutdown: release the OLAP replica's file lock (Sprint 100)
+    olap_store.close()
+
 
 # ── App ───────────────────────────────────────────────────────────────────────
 
@@ -1,6 +1,6 @@
 from datetime import datetime, timezone
 
-from sqlalchemy import Column, ForeignKey, Integer, String, Boolean, DateTime, Text, Float
+from sqlalchemy import Column, ForeignKey, Index, Integer, String, Boolean, DateTime, Text, Float
 from .database import Base
 
 
@@ -36,6 +36,10 @@ class UniversalEntity(Base):
     # Provenance
     source = Column(String, default="user")
 
+    # Sprint 100 — change watermark for the OLAP replica (backend/olap_store.py)
+    updated_at = Column(DateTime, default=lambda: datetime.now(timezone.utc),
+                        onupdate=lambda: datetime.now(timezone.utc), index=True)
+
 # Keep alias so existing imports of models.RawEntity still work
 RawEntity = UniversalEntity
 
@@ -571,3 +575,50 @@ class WebScraperConfig(Base):
     total_runs      = Column(Integer, default=0)
     total_enriched  = Column(Integer, default=0)
     created_at      = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+
+
+# ── Sprint 92: Probabilistic Record Linkage ───────────────────────────────────
+
+class LinkageModel(Base):
+    """
+    Fellegi–Sunter parameters learned by EM for one domain ("_all" = every domain).
+    params_json: {"fields": [...], "levels": [...], "m": [[...]], "u": [[...]]}
+    """
+    __tablename__ = "linkage_models"
+
+    id            = Column(Integer, primary_key=True, index=True)
+    domain        = Column(String(64), nullable=False, unique=True, index=True)
+    params_json   = Column(Text, nullable=False)
+    prior         = Column(Float, nullable=False, default=0.1)   # P(match) among candidate pairs
+    pairs_trained = Column(Integer, default=0)
+    iterations    = Column(Integer, default=0)
+    converged     = Column(Boolean, default=False)
+    trained_at    = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+
+
+# ── Sprint 107: Normalized concept index ──────────────────────────────────────
+
+class Concept(Base):
+    """Concept dictionary: one integer id per distinct enrichment concept label."""
+    __tablename__ = "concepts"
+
+    id    = Column(Integer, primary_key=True, index=True)
+    label = Column(String, nullable=False, unique=True, index=True)
+
+
+class EntityConcept(Base):
+    """
+    One row per (entity, concept) parsed from raw_entities.enrichment_concepts
+    (maintained by backend/analyzers/concept_index.py).
+    updated_at: the entity's updated_at when it was indexed — rows that no
+    longer match are stale.
+    """
+    __tablename__ = "entity_concepts"
+    __table_args__ = (
+        Index("ix_entity_concepts_domain_concept", "domain", "concept_id"),
+    )
+
+    entity_id  = Column(Integer, primary_key=True)   # raw_entities.id
+    concept_id = Column(Integer, primary_key=True)   # concepts.id
+    domain     = Column(String, nullable=False, default="default")
+    updated_at = Column(DateTime, nullable=True)
@@ -1,68 +1,56 @@
 import io
-import re
-import json
 import logging
 
-import duckdb
 import openpyxl
-import pandas as pd
 
-from backend.database import engine
-from backend.schema_registry import registry
+from backend.olap_store import olap_store
+from backend.schema_registry import SAFE_IDENTIFIER_RE, registry
 
 logger = logging.getLogger(__name__)
 
 # Only allow attribute names that are valid SQL identifiers.
-# This is a defense-in-depth check on top of the DataFrame column whitelist.
-_SAFE_IDENTIFIER_RE = re.compile(r'^[a-zA-Z_][a-zA-Z0-9_]*$')
-
-
+# This is a defense-in-depth check on top of the replica column whitelist.
 def _is_safe_identifier(name: str) -> bool:
     """Return True if name is a safe SQL identifier (no injection risk)."""
-    return bool(_SAFE_IDENTIFIER_RE.match(name))
+    return bool(SAFE_IDENTIFIER_RE.match(name))
+
 
+# Drill-down measures: name → DuckDB aggregate over the replica (Sprint 104)
+MEASURES = {
+    "count":         "COUNT(*)",
+    "citations_sum": 'CAST(SUM("enrichment_citation_count") AS BIGINT)',
+    "citations_avg": 'ROUND(AVG("enrichment_citation_count"), 4)',
+    "quality_sum":   'ROUND(SUM("quality_score"), 4)',
+    "quality_avg":   'ROUND(AVG("quality_score"), 4)',
+}
+MAX_DRILLDOWN_DIMENSIONS = 6
+TOP_VALUES = 5   # heavy hitters reported per dimension by get_dimensions
+DRILLDOWN_ROW_LIMIT = 10_000
 
-def _safe_parse(val) -> dict:
-    if pd.isna(val) or not val:
-        return {}
-    try:
-        return json.loads(val)
-    except (ValueError, TypeError):
-        return {}
+
+def _active_filters(filters: dict | None, columns: set[str]) -> dict[str, str]:
+    """Equality filters on safe replica columns, values stringified; others dropped."""
+    return {
+        field: str(value)
+        for field, value in (filters or {}).items()
+        if _is_safe_identifier(field) and field in columns and value is not None
+    }
 
 
 class DuckDBOLAPEngine:
     """
-    In-Memory OLAP Engine leveraging DuckDB to build Data Cubes out of the
-    domain-agnostic entities stored in SQLite.
+    OLAP Engine leveraging DuckDB to build Data Cubes out of the
+    domain-agnostic entities. All queries run on the persistent columnar
+    replica (backend/olap_store.py), where domain attributes are already
+    projected into typed columns.
     """
 
-    def _load_domain_df(self, domain) -> pd.DataFrame:
-        """Load raw_entities and project domain-specific attributes."""
-        df = pd.read_sql_table("raw_entities", engine)
-        if "normalized_json" in df.columns:
-            json_df = df["normalized_json"].apply(_safe_parse)
-            for attr in domain.attributes:
-                if not attr.is_core:
-                    df[attr.name] = json_df.apply(lambda x, n=attr.name: x.get(n))
-        return df
-
     @staticmethod
     def generate_cube_metrics(domain_id: str) -> dict:
         domain = registry.get_domain(domain_id)
         if not domain:
             raise ValueError(f"Domain '{domain_id}' not found")
 
-        df = pd.read_sql_table("raw_entities", engine)
-
-        if "normalized_json" in df.columns:
-            json_df = df["normalized_json"].apply(_safe_parse)
-            for attr in domain.attributes:
-                if not attr.is_core:
-                    df[attr.name] = json_df.apply(lambda x, n=attr.name: x.get(n))
-
-        valid_columns: set[str] = set(df.columns)
-
         metrics: dict = {
             "domain_id": domain.id,
             "domain_name": domain.name,
@@ -71,73 +59,68 @@ class DuckDBOLAPEngine:
             "cube_metrics": {},
         }
 
-        if len(df) == 0:
-            return metrics
-
-        con = duckdb.connect()
-        con.register("df", df)
-
-        metrics["total_records"] = con.execute("SELECT COUNT(*) FROM df").fetchone()[0]
+        with olap_store.cursor() as con:
+            metrics["total_records"] = con.execute("SELECT COUNT(*) FROM entities").fetchone()[0]
+            if metrics["total_records"]:
+                DuckDBOLAPEngine._distributions(con, domain, metrics)
+        return metrics
 
-        skip_fields = {"primary_label", "title", "canonical_id", "doi", "nct_id"}
+    @staticmethod
+    def _distributions(con, domain, metrics: dict) -> None:
+        valid_columns = olap_store.columns
 
-        for attr in domain.attributes:
-            if attr.name in skip_fields:
-                continue
+        # Safe, non-identifier-like attributes (unsafe names are logged by the plan)
+        for attr in domain.plan.dimensions:
             if attr.name not in valid_columns:
                 continue
-            if not _is_safe_identifier(attr.name):
-                logger.warning(f"OLAP: skipping unsafe attribute name '{attr.name}'")
-                continue
 
-            if attr.type == "string" or attr.name in df.columns:
-                try:
-                    col = f'"{attr.name}"'
-                    query = (
-                        f"SELECT CAST({col} AS VARCHAR) AS label, "
-                        f"COUNT(*) AS value "
-                        f"FROM df "
-                        f"WHERE {col} IS NOT NULL "
-                        f"GROUP BY {col} "
-                        f"ORDER BY value DESC "
-                        f"LIMIT 8"
+            try:
+                col = f'"{attr.name}"'
+                query = (
+                    f"SELECT CAST({col} AS VARCHAR) AS label, "
+                    f"COUNT(*) AS value "
+                    f"FROM entities "
+                    f"WHERE {col} IS NOT NULL "
+                    f"GROUP BY {col} "
+                    f"ORDER BY value DESC "
+                    f"LIMIT 8"
+                )
+                res_df = con.execute(query).df()
+
+                if not res_df.empty:
+                    res_df["label"] = res_df["label"].replace(
+                        {"None": "Unknown", "nan": "Unknown"}
                     )
-                    res_df = con.execute(query).df()
-
-                    if not res_df.empty:
-                        res_df["label"] = res_df["label"].replace(
-                            {"None": "Unknown", "nan": "Unknown"}
-                        )
-                        metrics["distributions"][attr.label] = res_df.to_dict(orient="records")
-                except Exception as e:
-                    logger.debug(f"OLAP: skipping distribution for '{attr.name}': {e}")
-
-        return metrics
+                    metrics["distributions"][attr.label] = res_df.to_dict(orient="records")
+            except Exception as e:
+                logger.debug(f"OLAP: skipping distribution for '{attr.name}': {e}")
 
     def get_dimensions(self, domain_id: str) -> list:
         """
-        Return domain attributes enriched with their distinct value count.
-        Used by the OLAP Cube Explorer to populate the dimension selector.
+        Return domain attributes enriched with their distinct value count
+        (exact up to 64 values, HyperLogLog estimate beyond) and most frequent
+        values (Space-Saving, counts are upper bounds). Used by the OLAP Cube
+        Explorer dimension selector and the NLQ system prompt.
         """
         domain = registry.get_domain(domain_id)
         if not domain:
             raise ValueError(f"Domain '{domain_id}' not found")
 
-        df = self._load_domain_df(domain)
-        skip_fields = {"primary_label", "title", "canonical_id", "doi", "nct_id"}
+        attrs = domain.plan.dimensions
+        # O(1): per-domain sketches maintained on the write path, no scan here
+        sketches = olap_store.dimension_sketches(domain_id)
 
         result = []
-        for attr in domain.attributes:
-            if attr.name in skip_fields:
-                continue
-            if not _is_safe_identifier(attr.name):
-                continue
-            distinct = int(df[attr.name].nunique()) if attr.name in df.columns and len(df) > 0 else 0
+        for attr in attrs:
+            sketch = sketches.get(attr.name)
             result.append({
                 "name": attr.name,
                 "label": attr.label,
                 "type": attr.type,
-                "distinct_count": distinct,
+                "distinct_count": sketch.distinct() if sketch else 0,
+                "top_values": [
+                    {"value": v, "count": c} for v, c in (sketch.top(TOP_VALUES) if sketch else [])
+                ],
             })
         return result
 
@@ -148,34 +131,15 @@ class DuckDBOLAPEngine:
         filters: dict | None = None,
     ) -> dict:
         """
-        Group entities by 1 or 2 dimensions with optional equality filters.
-        Returns rows sorted by count descending, capped at 200.
+        Group the domain's entities by 1 or 2 dimensions with optional equality
+        filters. Answered from the domain's pre-aggregated cube when it covers
+        the query (backend/olap_cubes.py), otherwise by a live DuckDB aggregate.
         """
         if not 1 <= len(group_by) <= 2:
             raise ValueError("group_by must specify 1 or 2 dimensions")
 
-        domain = registry.get_domain(domain_id)
-        if not domain:
-            raise ValueError(f"Domain '{domain_id}' not found")
-
-        attr_names = {a.name for a in domain.attributes}
-        valid_columns_schema = set()
-        for dim in group_by:
-            if not _is_safe_identifier(dim):
-                raise ValueError(f"Unsafe dimension name: '{dim}'")
-            if dim not in attr_names:
-                raise ValueError(f"Dimension '{dim}' is not in domain '{domain_id}'")
-            valid_columns_schema.add(dim)
-
-        df = self._load_domain_df(domain)
-
-        # Apply equality filters (field must exist in schema and DataFrame)
-        if filters:
-            for field, value in (filters or {}).items():
-                if not _is_safe_identifier(field):
-                    continue
-                if field in df.columns and value is not None:
-                    df = df[df[field].astype(str) == str(value)]
+        domain = self._get_domain(domain_id)
+        self._check_dimensions(domain, group_by)
 
         empty_response = {
             "domain_id": domain_id,
@@ -184,45 +148,185 @@ class DuckDBOLAPEngine:
             "total": 0,
             "rows": [],
         }
-        if len(df) == 0:
+
+        # Secondary whitelist: dimensions must exist in the replica
+        valid_columns = olap_store.columns
+        if any(dim not in valid_columns for dim in group_by):
             return empty_response
 
-        # Secondary whitelist: dimensions must exist in the real DataFrame
-        valid_columns_df = set(df.columns)
-        for dim in group_by:
-            if dim not in valid_columns_df:
-                return empty_response
+        active = _active_filters(filters, valid_columns)
 
-        con = duckdb.connect()
-        con.register("df", df)
+        with olap_store.cursor() as con:
+            rows = olap_store.cubes.lookup(
+                con, olap_store.version, domain, valid_columns, group_by, active
+            )
+            if rows is None:
+                rows = self._query_live(con, domain_id, group_by, active)
+        if not rows:
+            return empty_response
+
+        total = sum(r["count"] for r in rows)
+        for r in rows:
+            r["pct"] = round(r["count"] / total * 100, 1) if total > 0 else 0.0
 
+        return {
+            "domain_id": domain_id,
+            "group_by": group_by,
+            "filters": filters or {},
+            "total": total,
+            "rows": rows,
+        }
+
+    @staticmethod
+    def _query_live(con, domain_id: str, group_by: list, filters: dict) -> list:
+        """
+        Domain restriction, filters and projection pushed into one DuckDB
+        aggregate over the replica; only the (≤200) result rows are fetched.
+        """
+        where = ['"domain" = ?'] + [f'CAST("{f}" AS VARCHAR) = ?' for f in filters]
         select_cols = ", ".join([f'CAST("{d}" AS VARCHAR) AS "{d}"' for d in group_by])
         groupby_clause = ", ".join([f'"{d}"' for d in group_by])
         sql = (
             f"SELECT {select_cols}, COUNT(*) AS count "
-            f"FROM df "
+            f"FROM entities "
+            f"WHERE {' AND '.join(where)} "
             f"GROUP BY {groupby_clause} "
             f"ORDER BY count DESC "
             f"LIMIT 200"
         )
-        result_df = con.execute(sql).df()
-        total = int(result_df["count"].sum()) if not result_df.empty else 0
-
-        rows = [
-            {
-                "values": {d: row[d] for d in group_by},
-                "count": int(row["count"]),
-                "pct": round(row["count"] / total * 100, 1) if total > 0 else 0.0,
-            }
-            for _, row in result_df.iterrows()
+        res = con.execute(sql, [domain_id, *filters.values()]).fetchall()
+        return [
+            {"values": dict(zip(group_by, row[:-1])), "count": int(row[-1])}
+            for row in res
         ]
 
+    @staticmethod
+    def _get_domain(domain_id: str):
+        domain = registry.get_domain(domain_id)
+        if not domain:
+            raise ValueError(f"Domain '{domain_id}' not found")
+        return domain
+
+    @staticmethod
+    def _check_dimensions(domain, group_by: list) -> None:
+        attr_names = domain.plan.by_name
+        for dim in group_by:
+            if not _is_safe_identifier(dim):
+                raise ValueError(f"Unsafe dimension name: '{dim}'")
+            if dim not in attr_names:
+                raise ValueError(f"Dimension '{dim}' is not in domain '{domain.id}'")
+
+    # ── N-dimensional drill-down (Sprint 104) ─────────────────────────────
+
+    def drilldown_table(
+        self,
+        domain_id: str,
+        group_by: list,
+        measures: list | None = None,
+        filters: dict | None = None,
+        rollup: bool = False,
+        top_k: int | None = None,
+    ):
+        """
+        N-dimensional group-by as one DuckDB statement, returned as an Arrow
+        table with one column per dimension, `level` (number of grouped
+        dimensions; < len(group_by) marks a ROLLUP subtotal) and one column
+        per measure.
+
+        rollup=True adds subtotals for every prefix of group_by plus a grand
+        total. top_k keeps, within each parent group, the k children with the
+        highest count (ROW_NUMBER over the parent key) at every level; with
+        rollup, rows under a pruned subtotal are dropped too.
+        """
+        if not 1 <= len(group_by) <= MAX_DRILLDOWN_DIMENSIONS:
+            raise ValueError(
+                f"group_by must specify 1 to {MAX_DRILLDOWN_DIMENSIONS} dimensions"
+            )
+        if len(set(group_by)) != len(group_by):
+            raise ValueError("group_by dimensions must be distinct")
+        measures = list(dict.fromkeys(["count", *(measures or [])]))
+        unknown = [m for m in measures if m not in MEASURES]
+        if unknown:
+            raise ValueError(
+                f"Unknown measure(s) {unknown}. Allowed: {', '.join(MEASURES)}"
+            )
+        domain = self._get_domain(domain_id)
+        self._check_dimensions(domain, group_by)
+
+        valid_columns = olap_store.columns
+        active = _active_filters(filters, valid_columns)
+        n = len(group_by)
+        dims = [f'"{d}"' for d in group_by]
+
+        where = ['"domain" = ?'] + [f'CAST("{f}" AS VARCHAR) = ?' for f in active]
+        if not all(d in valid_columns for d in group_by):
+            # Declared but not replicated (core attribute kept only in JSON):
+            # same empty answer as query_cube, with the usual columns.
+            where.append("FALSE")
+        src_dims = ", ".join(
+            f"CAST({c} AS VARCHAR) AS {c}" if d in valid_columns else f"CAST(NULL AS VARCHAR) AS {c}"
+            for d, c in zip(group_by, dims)
+        )
+        dim_list = ", ".join(dims)
+        grouping = f"ROLLUP ({dim_list})" if rollup else dim_list
+        measure_sql = ", ".join(f'{MEASURES[m]} AS "{m}"' for m in measures)
+        # Parent key of a row: _gid plus every dimension above its deepest grouped one
+        parent_key = ", ".join(
+            ["_gid"]
+            + [f"CASE WHEN _gid & {1 << (n - 2 - i)} = 0 THEN {dims[i]} END" for i in range(n - 1)]
+        )
+        keep = []
+        if top_k:
+            keep.append(f"r._rank <= {int(top_k)}")
+            # Rollup drill-down: a row survives only if every ancestor subtotal did
+            for j in range(1, n if rollup else 1):
+                prefix = " AND ".join(
+                    f"p.{dims[i]} IS NOT DISTINCT FROM r.{dims[i]}" for i in range(j)
+                )
+                keep.append(
+                    f"(r.level <= {j} OR EXISTS (SELECT 1 FROM ranked p WHERE p.level = {j} "
+                    f"AND p._rank <= {int(top_k)} AND {prefix}))"
+                )
+        keep_clause = f"WHERE {' AND '.join(keep)}" if keep else ""
+        r_dims = ", ".join(f"r.{c}" for c in dims)
+        out_cols = ", ".join([r_dims, "r.level"] + [f'r."{m}"' for m in measures])
+
+        sql = (
+            f"WITH src AS ("
+            f"  SELECT {src_dims}, enrichment_citation_count, quality_score "
+            f"  FROM entities WHERE {' AND '.join(where)}"
+            f"), agg AS ("
+            f"  SELECT GROUPING({dim_list}) AS _gid, {dim_list}, {measure_sql} "
+            f"  FROM src GROUP BY {grouping}"
+            f"), ranked AS ("
+            f"  SELECT *, {n} - bit_count(_gid) AS level, ROW_NUMBER() OVER ("
+            f"    PARTITION BY {parent_key} ORDER BY count DESC, {dim_list}"
+            f"  ) AS _rank FROM agg"
+            f") "
+            f"SELECT {out_cols} "
+            f"FROM ranked r {keep_clause} "
+            f"ORDER BY r.level, r.count DESC, {r_dims} "
+            f"LIMIT {DRILLDOWN_ROW_LIMIT}"
+        )
+        with olap_store.cursor() as con:
+            return con.execute(sql, [domain_id, *active.values()]).to_arrow_table()
+
+    def drilldown(self, domain_id: str, group_by: list, measures: list | None = None,
+                  filters: dict | None = None, rollup: bool = False,
+                  top_k: int | None = None) -> dict:
+        """drilldown_table() as a compact columnar JSON payload."""
+        table = self.drilldown_table(domain_id, group_by, measures, filters, rollup, top_k)
         return {
             "domain_id": domain_id,
             "group_by": group_by,
+            "measures": [c for c in table.column_names if c in MEASURES],
             "filters": filters or {},
-            "total": total,
-            "rows": rows,
+            "rollup": rollup,
+            "top_k": top_k,
+            "row_count": table.num_rows,
+            "truncated": table.num_rows >= DRILLDOWN_ROW_LIMIT,
+            "columns": table.column_names,
+            "data": table.to_pydict(),
         }
 
     def export_to_excel(self, domain_id: str, dimension: str) -> bytes:
@@ -235,7 +339,7 @@ class DuckDBOLAPEngine:
 
         data = self.query_cube(domain_id, [dimension])
         domain = registry.get_domain(domain_id)
-        attr_map = {a.name: a for a in domain.attributes}
+        attr_map = domain.plan.by_name
         dim_label = attr_map[dimension].label if dimension in attr_map else dimension
 
         wb = openpyxl.Workbook()
@@ -0,0 +1,142 @@
+"""
+Pre-aggregated Cube Materializations — Sprint 103.
+
+The Cube Explorer, dashboard and NLQ issue the same 1-D and 2-D group-bys over
+and over. For each domain we materialize, inside the OLAP replica, one table
+holding every 0-, 1- and 2-dimension aggregate over the domain's declared
+dimensions, built with a single GROUP BY GROUPING SETS statement:
+
+    cube_<n>(_gid, <dim1>, …, <dimN>, count)
+
+`_gid` is GROUPING(dim1, …, dimN): bit (N-1-i) is set when dim i is rolled up,
+so a NULL produced by the rollup is never confused with a NULL value.
+
+A materialization answers a cube query when every group-by and filter field
+is one of its dimensions and at most two distinct fields are involved. It is
+stale as soon as the replica version moves (any synced write) and is dropped
+eagerly by invalidate(), which ingest, merge, harmonization, transformation
+and rule writers call after they commit. Stale cubes are rebuilt lazily on
+the next query.
+
+Each OLAPStore owns one CubeMaterializations (olap_store.cubes), since the
+cube tables live next to its replica.
+
+Public API
+----------
+olap_store.cubes.lookup(con, version, domain, columns, group_by, filters)
+    → list[dict] | None   (None → not answerable, run the live query)
+olap_store.cubes.invalidate(domain_id=None) → int   cubes dropped
+"""
+from __future__ import annotations
+
+import logging
+import threading
+from dataclasses import dataclass
+from itertools import combinations
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+MAX_CUBE_DIMENSIONS = 16   # grouping sets grow quadratically with dimensions
+CUBE_ROW_LIMIT = 200       # same cap as the live query_cube path
+
+# Free-text attributes that make poor dimensions (identifier-like ones are
+# already outside the domain's dimension plan)
+_SKIP_TYPES = {"text"}
+
+
+def cube_dimensions(domain, columns: set[str]) -> tuple[str, ...]:
+    """Declared domain attributes that can be materialized (replica columns only)."""
+    dims = [
+        a.name for a in domain.plan.dimensions
+        if a.type not in _SKIP_TYPES and a.name in columns
+    ]
+    return tuple(dims[:MAX_CUBE_DIMENSIONS])
+
+
+@dataclass
+class _Cube:
+    table: str
+    dims: tuple[str, ...]
+    version: int
+
+
+class CubeMaterializations:
+    def __init__(self):
+        self._cubes: dict[str, _Cube] = {}
+        self._tables: dict[str, str] = {}   # domain_id → table name (stable)
+        self._lock = threading.Lock()
+
+    # ── Invalidation ──────────────────────────────────────────────────────
+
+    def invalidate(self, domain_id: Optional[str] = None) -> int:
+        """Mark one domain's (or every) materialization stale."""
+        with self._lock:
+            keys = [domain_id] if domain_id else list(self._cubes)
+            return sum(1 for k in keys if self._cubes.pop(k, None) is not None)
+
+    # ── Build ─────────────────────────────────────────────────────────────
+
+    def _table_for(self, domain_id: str) -> str:
+        if domain_id not in self._tables:
+            self._tables[domain_id] = f"cube_{len(self._tables)}"
+        return self._tables[domain_id]
+
+    def _build(self, con, version: int, domain_id: str, dims: tuple[str, ...]) -> _Cube:
+        table = self._table_for(domain_id)
+        cols = [f'"{d}"' for d in dims]
+        sets = ["()"] + [f"({c})" for c in cols] + [f"({a}, {b})" for a, b in combinations(cols, 2)]
+        select = ", ".join(f'CAST({c} AS VARCHAR) AS {c}' for c in cols)
+        con.execute(
+            f"CREATE OR REPLACE TABLE {table} AS "
+            f"SELECT GROUPING({', '.join(cols)}) AS _gid, {select}, COUNT(*) AS count "
+            f'FROM entities WHERE "domain" = ? '
+            f"GROUP BY GROUPING SETS ({', '.join(sets)})",
+            [domain_id],
+        )
+        logger.info("OLAP cube: materialized %s (%d dimensions) for '%s'", table, len(dims), domain_id)
+        return _Cube(table, dims, version)
+
+    def _cube(self, con, version: int, domain_id: str, dims: tuple[str, ...]) -> _Cube:
+        with self._lock:
+            cube = self._cubes.get(domain_id)
+            if cube is None or cube.version != version or cube.dims != dims:
+                cube = self._cubes[domain_id] = self._build(con, version, domain_id, dims)
+            return cube
+
+    # ── Query ─────────────────────────────────────────────────────────────
+
+    def lookup(
+        self,
+        con,
+        version: int,
+        domain,
+        columns: set[str],
+        group_by: list[str],
+        filters: dict[str, str],
+    ) -> Optional[list[dict]]:
+        """
+        Rows {"values", "count"} for a group-by with equality filters (values
+        already stringified), answered from the domain's materialization; None
+        when the query falls outside what the materialization covers.
+        """
+        dims = cube_dimensions(domain, columns)
+        involved = set(group_by) | set(filters)
+        if not dims or len(involved) > 2 or not involved <= set(dims):
+            return None
+
+        cube = self._cube(con, version, domain.id, dims)
+        gid = sum(1 << (len(dims) - 1 - i) for i, d in enumerate(dims) if d not in involved)
+        select_cols = ", ".join(f'"{d}"' for d in group_by)
+        where = ["_gid = ?"] + [f'"{f}" = ?' for f in filters]
+        res = con.execute(
+            f"SELECT {select_cols}, count "
+            f"FROM {cube.table} WHERE {' AND '.join(where)} "
+            f"ORDER BY count DESC LIMIT {CUBE_ROW_LIMIT}",
+            [gid, *filters.values()],
+        ).fetchall()
+        return [
+            {"values": dict(zip(group_by, row[:-1])), "count": int(row[-1])}
+            for row in res
+        ]
+
@@ -0,0 +1,421 @@
+"""
+Persistent Columnar OLAP Store — Sprint 100.
+
+A DuckDB replica of raw_entities that every cube query runs against, instead
+of pd.read_sql_table() over the whole source table on each request.
+
+  - one long-lived DuckDB connection per process, opened on first use (file
+    at OLAP_STORE_PATH, default backend/data/olap_store.duckdb; ":memory:"
+    ok). DuckDB allows a single read-write process per file: a process that
+    finds the file locked (a second uvicorn worker, a script importing the
+    routers while the server runs) falls back to a private in-memory replica
+  - table `entities`: the analytic RawEntity columns plus every non-core
+    domain attribute projected out of normalized_json into a typed column
+    (Sprint 102: projected inside DuckDB with json_extract_string, one
+    vectorized pass per chunk instead of one Python call per row × attribute)
+  - sync() is incremental: rows with id > watermark or updated_at >= the last
+    seen updated_at are upserted. When the replica's row count or id sum
+    then still differs from the source, the source id list is reconciled:
+    deleted ids are removed with one anti-join and ids the watermark missed
+    (rows committed after a row with a higher id — concurrent writers) are
+    loaded. A source that has not changed since the last sync costs a single
+    MAX/COUNT/SUM query.
+
+Writes that bypass the ORM/Core (raw SQL text) do not touch updated_at and are
+only picked up by a rebuild (olap_store.rebuild()).
+
+Public API
+----------
+olap_store.sync()       → int    rows upserted + removed
+olap_store.refresh()    → int    sync() + rebuild dirty dimension sketches
+olap_store.schedule_refresh()    refresh() on a background thread (write path)
+olap_store.rebuild()    → int    drop and reload the replica
+olap_store.cursor()     → context manager yielding a synced DuckDB cursor
+olap_store.columns      → set[str] columns available to cube queries
+olap_store.cubes        → CubeMaterializations (backend/olap_cubes.py)
+olap_store.dimension_sketches(domain_id) → per-column HLL / Space-Saving
+                          sketches as last published (backend/olap_sketches.py)
+olap_store.snapshot()   → EntitySnapshot: shared Arrow table of the analytic
+                          columns (backend/olap_snapshot.py)
+"""
+from __future__ import annotations
+
+import logging
+import os
+import threading
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+import duckdb
+import pandas as pd
+from sqlalchemy import func, select
+from sqlalchemy.engine import Engine
+
+from backend import models
+from backend.olap_cubes import CubeMaterializations
+from backend.olap_sketches import ColumnSketch, DimensionSketches
+from backend.olap_snapshot import ArrowSnapshots, EntitySnapshot
+from backend.schema_registry import registry
+
+logger = logging.getLogger(__name__)
+
+OLAP_STORE_PATH = os.environ.get(
+    "OLAP_STORE_PATH", os.path.join(os.path.dirname(__file__), "data", "olap_store.duckdb")
+)
+SYNC_CHUNK = 20_000
+
+_TABLE = "entities"
+_UNSKETCHED = {"id", "normalized_json", "updated_at"}
+
+_entities = models.RawEntity.__table__
+
+# RawEntity columns replicated as-is → DuckDB type
+CORE_COLUMNS: dict[str, str] = {
+    "id":                        "BIGINT",
+    "domain":                    "VARCHAR",
+    "entity_type":               "VARCHAR",
+    "primary_label":             "VARCHAR",
+    "secondary_label":           "VARCHAR",
+    "canonical_id":              "VARCHAR",
+    "validation_status":         "VARCHAR",
+    "normalized_json":           "VARCHAR",
+    "enrichment_doi":            "VARCHAR",
+    "enrichment_citation_count": "BIGINT",
+    "enrichment_concepts":       "VARCHAR",
+    "enrichment_source":         "VARCHAR",
+    "enrichment_status":         "VARCHAR",
+    "quality_score":             "DOUBLE",
+    "source":                    "VARCHAR",
+    "updated_at":                "TIMESTAMP",
+}
+
+_ATTR_TYPES = {"integer": "BIGINT", "float": "DOUBLE"}
+_projected: tuple = (-1, None)   # (registry generation, spec) of the last projected_attributes()
+
+
+def projected_attributes() -> dict[str, str]:
+    """
+    Non-core attributes of every registered domain → DuckDB type. Names that
+    collide with core columns or are not safe identifiers are skipped; an
+    attribute declared with different types across domains falls back to VARCHAR.
+    """
+    global _projected
+    domains = registry.get_all_domains()
+    generation, cached = _projected
+    if cached is not None and generation == registry.generation:
+        return dict(cached)
+    spec: dict[str, str] = {}
+    for domain in domains:
+        for attr in domain.plan.json:
+            name = attr.name
+            if name in CORE_COLUMNS:
+                continue
+            typ = _ATTR_TYPES.get(attr.type, "VARCHAR")
+            spec[name] = typ if spec.get(name, typ) == typ else "VARCHAR"
+    spec = dict(sorted(spec.items()))
+    _projected = (registry.generation, spec)
+    return dict(spec)
+
+
+def _projection_sql(spec: dict[str, str], source: str = "normalized_json") -> str:
+    """
+    SELECT-list expressions that project every attribute in `spec` out of the
+    JSON text column in one vectorized DuckDB pass (json_extract_string).
+    Malformed / non-object JSON yields NULLs; nested values stay JSON text.
+    """
+    doc = f"CASE WHEN json_valid(CAST({source} AS VARCHAR)) THEN CAST({source} AS VARCHAR) END"
+    exprs = []
+    for name, typ in spec.items():
+        raw = f"json_extract_string({doc}, '$.{name}')"
+        if typ == "BIGINT":
+            expr = f"TRY_CAST(round(TRY_CAST({raw} AS DOUBLE)) AS BIGINT)"
+        elif typ == "DOUBLE":
+            expr = f"TRY_CAST({raw} AS DOUBLE)"
+        else:
+            expr = raw
+        exprs.append(f'{expr} AS "{name}"')
+    return ", ".join(exprs)
+
+
+class OLAPStore:
+    def __init__(self, path: str = OLAP_STORE_PATH, source_engine: Optional[Engine] = None):
+        self.path = path
+        self._connection: Optional[duckdb.DuckDBPyConnection] = None
+        self._source = source_engine
+        self._lock = threading.RLock()
+        self._refresh_lock = threading.Lock()
+        self._refresh_pending = False
+        self._spec: Optional[dict[str, str]] = None
+        self._select = "*"    # core columns + projection expressions for _spec
+        self._source_stats: Optional[tuple] = None
+        self.version = 0   # bumped whenever sync() changes the replica
+        self.rewrites = 0  # bumped when rows are changed, removed or land below max id
+        self.cubes = CubeMaterializations()   # Sprint 103 pre-aggregates
+        self.sketches = DimensionSketches()   # Sprint 105 per-dimension summaries
+        self.arrow = ArrowSnapshots()         # Sprint 114 shared Arrow table
+
+    # ── Connection ────────────────────────────────────────────────────────
+
+    @property
+    def _con(self) -> duckdb.DuckDBPyConnection:
+        if self._connection is None:
+            with self._lock:
+                if self._connection is None:
+                    self._connection = self._connect()
+        return self._connection
+
+    def _connect(self) -> duckdb.DuckDBPyConnection:
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            try:
+                return duckdb.connect(self.path)
+            except duckdb.IOException as e:
+                # Another process holds the single-writer lock on the file
+                logger.warning(
+                    "OLAP store: %s is locked by another process (%s); "
+                    "using a private in-memory replica", self.path, e,
+                )
+        return duckdb.connect(":memory:")
+
+    def close(self) -> None:
+        """Close the connection (releasing the file lock); reopened on next use."""
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+                self._spec = None
+                self._source_stats = None
+
+    # ── Schema ────────────────────────────────────────────────────────────
+
+    @property
+    def source(self) -> Engine:
+        if self._source is None:
+            from backend.database import engine
+            self._source = engine
+        return self._source
+
+    @property
+    def columns(self) -> set[str]:
+        return set(CORE_COLUMNS) | set(self._spec or projected_attributes())
+
+    def _existing_columns(self) -> dict[str, str]:
+        rows = self._con.execute(
+            "SELECT column_name, data_type FROM information_schema.columns "
+            "WHERE table_name = ? ORDER BY ordinal_position", [_TABLE]
+        ).fetchall()
+        return dict(rows)
+
+    def _create(self, spec: dict[str, str]) -> None:
+        cols = {**CORE_COLUMNS, **spec}
+        ddl = ", ".join(f'"{c}" {t}' for c, t in cols.items())
+        self._con.execute(f'DROP TABLE IF EXISTS {_TABLE}')
+        self._con.execute(f'CREATE TABLE {_TABLE} ({ddl}, PRIMARY KEY (id))')
+        self._source_stats = None
+        self.sketches.reset()
+        self.arrow.reset()
+        self.version += 1
+        self.rewrites += 1
+
+    def _ensure_schema(self) -> None:
+        spec = projected_attributes()
+        if spec == self._spec:
+            return
+        expected = {**CORE_COLUMNS, **spec}
+        if self._existing_columns() != expected:
+            logger.info("OLAP store: (re)creating replica with %d columns", len(expected))
+            self._create(spec)
+        else:
+            # Reopened persistent replica: sketches are in-memory only
+            self.sketches.mark_dirty(
+                d for (d,) in self._con.execute(f"SELECT DISTINCT domain FROM {_TABLE}").fetchall()
+            )
+        self._set_spec(spec)
+
+    def _set_spec(self, spec: dict[str, str]) -> None:
+        self._spec = spec
+        projection = _projection_sql(spec)
+        self._select = ", ".join(["*", projection] if projection else ["*"])
+
+    # ── Sync ──────────────────────────────────────────────────────────────
+
+    def _sketch_select(self) -> str:
+        cols = sorted(self.columns - _UNSKETCHED)
+        return ", ".join(['"domain" AS _domain'] + [f'CAST("{c}" AS VARCHAR) AS "{c}"' for c in cols])
+
+    def _load(self, where) -> int:
+        cols = [_entities.c[c] for c in CORE_COLUMNS]
+        stmt = select(*cols).where(where).order_by(_entities.c.id)
+        loaded = 0
+        with self.source.connect() as conn:
+            for chunk in pd.read_sql(stmt, conn, chunksize=SYNC_CHUNK):
+                self._con.register("_olap_chunk", chunk)
+                try:
+                    # Rows already replicated that really changed: old and new
+                    # domains lose their (insert-only) sketches
+                    rewritten = self._con.execute(
+                        f"SELECT e.domain, c.domain FROM {_TABLE} e JOIN _olap_chunk c ON e.id = c.id "
+                        f"WHERE e.updated_at IS DISTINCT FROM c.updated_at"
+                    ).fetchall()
+                    if rewritten:
+                        self.rewrites += 1
+                        self.sketches.mark_dirty({d for pair in rewritten for d in pair})
+                    known = pd.DataFrame({"id": pd.Series([i for (i,) in self._con.execute(
+                        f"SELECT id FROM {_TABLE} WHERE id IN (SELECT id FROM _olap_chunk)"
+                    ).fetchall()], dtype="int64")})
+                    self._con.register("_olap_known", known)
+                    # New ids below the replica's max id (late commits) would be
+                    # skipped by the Arrow snapshot's id-watermark append
+                    late = self._con.execute(
+                        f"SELECT COUNT(*) FROM _olap_chunk WHERE id NOT IN (SELECT id FROM _olap_known) "
+                        f"AND id < (SELECT COALESCE(MAX(id), 0) FROM {_TABLE})"
+                    ).fetchone()[0]
+                    if late:
+                        self.rewrites += 1
+                    self._con.execute(
+                        f"DELETE FROM {_TABLE} WHERE id IN (SELECT id FROM _olap_chunk)"
+                    )
+                    self._con.execute(
+                        f"INSERT INTO {_TABLE} BY NAME SELECT {self._select} FROM _olap_chunk"
+                    )
+                    # Rows new to the replica — whatever their id, since late
+                    # commits land below the watermark — are folded into the
+                    # sketches incrementally
+                    self.sketches.add_frame(self._con.execute(
+                        f"SELECT {self._sketch_select()} FROM {_TABLE} "
+                        f"WHERE id IN (SELECT id FROM _olap_chunk) "
+                        f"AND id NOT IN (SELECT id FROM _olap_known)"
+                    ).df())
+                finally:
+                    self._con.unregister("_olap_chunk")
+                    self._con.unregister("_olap_known")
+                loaded += len(chunk)
+        return loaded
+
+    def _reconcile(self, source_count: int, source_id_sum) -> int:
+        """
+        Match the replica's id set to the source's when count or id sum
+        differ: remove deleted ids, load ids the watermark predicates missed.
+        """
+        replica = self._con.execute(f"SELECT COUNT(*), SUM(id) FROM {_TABLE}").fetchone()
+        if replica == (source_count, source_id_sum):
+            return 0
+        with self.source.connect() as conn:
+            ids = pd.DataFrame({"id": conn.execute(select(_entities.c.id)).scalars().all()})
+        self._con.register("_olap_ids", ids)
+        try:
+            gone = f"FROM {_TABLE} WHERE id NOT IN (SELECT id FROM _olap_ids)"
+            removed = self._con.execute(f"SELECT COUNT(*) {gone}").fetchone()[0]
+            if removed:
+                self.sketches.mark_dirty(
+                    d for (d,) in self._con.execute(f"SELECT DISTINCT domain {gone}").fetchall()
+                )
+                self._con.execute(f"DELETE {gone}")
+                self.rewrites += 1
+            missing = [i for (i,) in self._con.execute(
+                f"SELECT id FROM _olap_ids WHERE id NOT IN (SELECT id FROM {_TABLE}) ORDER BY id"
+            ).fetchall()]
+        finally:
+            self._con.unregister("_olap_ids")
+        loaded = 0
+        for start in range(0, len(missing), SYNC_CHUNK):
+            loaded += self._load(_entities.c.id.in_(missing[start:start + SYNC_CHUNK]))
+        if missing:
+            logger.info("OLAP store: loaded %d rows missed by the watermark", len(missing))
+        return removed + loaded
+
+    def sync(self) -> int:
+        """Bring the replica up to date with raw_entities. Returns rows changed."""
+        with self._lock:
+            self._ensure_schema()
+            with self.source.connect() as conn:
+                stats = tuple(conn.execute(
+                    select(func.max(_entities.c.id), func.count(), func.max(_entities.c.updated_at),
+                           func.sum(_entities.c.id))
+                ).one())
+            if stats == self._source_stats:
+                return 0
+
+            max_id, since = self._con.execute(
+                f"SELECT COALESCE(MAX(id), 0), MAX(updated_at) FROM {_TABLE}"
+            ).fetchone()
+            where = _entities.c.id > max_id
+            if since is not None:
+                where = where | (_entities.c.updated_at >= since)
+            changed = self._load(where) + self._reconcile(stats[1], stats[3])
+
+            self._source_stats = stats
+            if changed:
+                self.version += 1
+            return changed
+
+    def rebuild(self) -> int:
+        with self._lock:
+            self._set_spec(projected_attributes())
+            self._create(self._spec)
+            return self.sync()
+
+    def refresh(self) -> int:
+        """
+        Write-path maintenance: sync the replica, then rebuild the sketches of
+        the domains rewrites and deletes left dirty. Returns rows changed.
+        """
+        with self._lock:
+            changed = self.sync()
+            for domain_id in self.sketches.dirty():
+                self.sketches.rebuild(domain_id, self._con.execute(
+                    f'SELECT {self._sketch_select()} FROM {_TABLE} WHERE "domain" = ?',
+                    [domain_id],
+                ).df())
+            return changed
+
+    def schedule_refresh(self) -> None:
+        """Run refresh() on a daemon thread; requests made while one is pending coalesce."""
+        with self._refresh_lock:
+            if self._refresh_pending:
+                return
+            self._refresh_pending = True
+        threading.Thread(target=self._refresh_worker, name="olap-refresh", daemon=True).start()
+
+    def _refresh_worker(self) -> None:
+        with self._refresh_lock:
+            # Cleared before the work: writes committed during it schedule another run
+            self._refresh_pending = False
+        try:
+            self.refresh()
+        except Exception:
+            logger.exception("OLAP store: background refresh failed")
+
+    # ── Query access ──────────────────────────────────────────────────────
+
+    def dimension_sketches(self, domain_id: str) -> dict[str, ColumnSketch]:
+        """
+        Per-column sketches for one domain, as last published. Only a process
+        that has not synced yet syncs here; a dirty domain keeps serving its
+        previous sketches while a background refresh rebuilds them.
+        """
+        if self._source_stats is None:
+            self.refresh()
+        elif self.sketches.is_dirty(domain_id):
+            self.schedule_refresh()
+        return self.sketches.for_domain(domain_id)
+
+    def snapshot(self) -> EntitySnapshot:
+        """Arrow table of the analytic columns at the current version (after a sync)."""
+        with self._lock:
+            self.sync()
+            columns = [*CORE_COLUMNS, *(self._spec or {})]
+            return self.arrow.refresh(self._con, self.version, self.rewrites, columns)
+
+    @contextmanager
+    def cursor(self) -> Iterator[duckdb.DuckDBPyConnection]:
+        """A cursor on the long-lived connection, after an incremental sync."""
+        self.sync()
+        cur = self._con.cursor()
+        try:
+            yield cur
+        finally:
+            cur.close()
+
+
+olap_store = OLAPStore()
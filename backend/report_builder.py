@@ -1,6 +1,10 @@
 """
 Report Builder — generates self-contained HTML reports per domain.
 No external template dependencies; uses f-strings with inline CSS.
+
+Entity KPIs are pyarrow.compute kernels over the shared Arrow snapshot of
+the OLAP replica (olap_store.snapshot()); only the harmonization log is
+read through the session.
 """
 from __future__ import annotations
 
@@ -8,11 +12,14 @@ import json
 from datetime import datetime, timezone
 from typing import List
 
-from sqlalchemy import func, text
+import pyarrow as pa
+import pyarrow.compute as pc
 from sqlalchemy.orm import Session
 
 from backend import models
 from backend.analyzers.topic_modeling import TopicAnalyzer
+from backend.olap_snapshot import count_if, value_counts
+from backend.olap_store import olap_store
 from backend.schema_registry import registry
 
 # ── CSS (inline, print-friendly) ─────────────────────────────────────────────
@@ -64,18 +71,22 @@ footer { margin-top: 48px; padding-top: 16px; border-top: 1px solid #e5e7eb;
 
 # ── Section builders ──────────────────────────────────────────────────────────
 
+def _entities(columns: list[str]) -> pa.Table:
+    """Entity columns of the shared Arrow snapshot (olap_store.snapshot())."""
+    return olap_store.snapshot().table.select(columns)
+
+
 def _section_entity_stats(db: Session) -> str:
-    total = db.query(func.count(models.RawEntity.id)).scalar() or 0
-    by_status = db.query(models.RawEntity.validation_status, func.count(models.RawEntity.id))\
-        .group_by(models.RawEntity.validation_status).all()
-    by_enrich = db.query(models.RawEntity.enrichment_status, func.count(models.RawEntity.id))\
-        .group_by(models.RawEntity.enrichment_status).all()
+    t = _entities(["validation_status", "enrichment_status"])
+    total = t.num_rows
+    by_status = value_counts(t["validation_status"])
+    if t["validation_status"].null_count:
+        by_status.append((None, t["validation_status"].null_count))
 
-    status_map = {r[0]: r[1] for r in by_status}
-    enrich_map = {r[0]: r[1] for r in by_enrich}
+    status_map = dict(by_status)
 
     valid_pct = round(status_map.get("valid", 0) / total * 100) if total else 0
-    enriched = enrich_map.get("completed", 0)
+    enriched = count_if(pc.equal(t["enrichment_status"], "completed"))
     enrich_pct = round(enriched / total * 100) if total else 0
 
     cards = [
@@ -110,15 +121,18 @@ def _section_entity_stats(db: Session) -> str:
 
 
 def _section_enrichment_coverage(db: Session) -> str:
-    total = db.query(func.count(models.RawEntity.id)).scalar() or 0
-    completed = db.query(func.count(models.RawEntity.id))\
-        .filter(models.RawEntity.enrichment_status == "completed").scalar() or 0
-    avg_cit = db.query(func.avg(models.RawEntity.enrichment_citation_count))\
-        .filter(models.RawEntity.enrichment_status == "completed").scalar() or 0
-    top = db.query(models.RawEntity.primary_label, models.RawEntity.enrichment_citation_count,
-                   models.RawEntity.enrichment_source)\
-        .filter(models.RawEntity.enrichment_status == "completed")\
-        .order_by(models.RawEntity.enrichment_citation_count.desc()).limit(8).all()
+    t = _entities(["primary_label", "enrichment_citation_count", "enrichment_source", "enrichment_status"])
+    total = t.num_rows
+    done = t.filter(pc.equal(t["enrichment_status"], "completed"))
+    completed = done.num_rows
+    avg_cit = pc.mean(done["enrichment_citation_count"]).as_py() or 0
+    order = pc.sort_indices(
+        done, sort_keys=[("enrichment_citation_count", "descending")], null_placement="at_end",
+    )
+    top = [
+        (r["primary_label"], r["enrichment_citation_count"], r["enrichment_source"])
+        for r in done.take(order[:8]).to_pylist()
+    ]
 
     pct = round(completed / total * 100) if total else 0
     rows = "".join(f"""
@@ -140,10 +154,7 @@ def _section_enrichment_coverage(db: Session) -> str:
 
 
 def _section_top_brands(db: Session) -> str:
-    rows_q = db.query(models.RawEntity.secondary_label, func.count(models.RawEntity.id).label("n"))\
-        .filter(models.RawEntity.secondary_label.isnot(None))\
-        .group_by(models.RawEntity.secondary_label)\
-        .order_by(func.count(models.RawEntity.id).desc()).limit(15).all()
+    rows_q = value_counts(_entities(["secondary_label"])["secondary_label"])[:15]
     max_n = rows_q[0][1] if rows_q else 1
     rows = "".join(f"""
         <tr><td>{r[0]}</td>
@@ -213,6 +213,7 @@ def rag_query(
 
     # Phase 11 / 69A: inject context into the system prompt (memory recall takes priority)
     extra_system = None
+    context_version = None
 
     if payload.session_id is not None:
         # Priority 1: recalled memory session
@@ -231,8 +232,8 @@ def rag_query(
         # Priority 2: live domain context
         try:
             from backend.context_engine import ContextEngine
-            ctx = ContextEngine().build_domain_context(payload.domain_id, db)
-            extra_system = ContextEngine().format_for_llm(ctx)
+            snap = ContextEngine().snapshot(payload.domain_id, db)
+            extra_system, context_version = snap.text, snap.version
         except Exception:
             pass
 
@@ -254,6 +255,7 @@ def rag_query(
 
     result["context_injected"]    = extra_system is not None
     result["memory_session_id"]   = payload.session_id
+    result["context_version"]     = context_version
     return result
 
 
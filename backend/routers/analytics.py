@@ -11,12 +11,18 @@ Analytics, stats, and lookup endpoints.
   GET  /product-types
   GET  /classifications
   GET  /health
+
+The /analyzers/* endpoints also answer Accept: application/vnd.apache.arrow.stream
+(or application/vnd.apache.parquet) — see backend/exporters/arrow_exporter.py.
 """
 import logging
 import re
 from collections import defaultdict
+from typing import Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+import pyarrow as pa
+import pyarrow.compute as pc
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
 from pydantic import BaseModel, Field
 from sqlalchemy import func, text
 from sqlalchemy.orm import Session
@@ -27,6 +33,9 @@ from backend.analyzers.roi_calculator import ROIParams, simulate as _roi_simulat
 from backend.analyzers.topic_modeling import TopicAnalyzer
 from backend.auth import get_current_user, require_role
 from backend.database import get_db
+from backend.exporters import arrow_exporter
+from backend.olap_snapshot import count_if, strings, value_counts
+from backend.olap_store import olap_store
 import time
 from threading import Lock
 
@@ -128,21 +137,52 @@ def run_roi_simulation(
 
 # ── Topic Modeling & Correlation ──────────────────────────────────────────────
 
+# Main list of each analyzer result → table columns (fixed, so empty results keep a schema)
+_ANALYZER_COLUMNS = {
+    "topics":       ["concept", "count", "pct"],
+    "pairs":        ["concept_a", "concept_b", "count", "pmi", "npmi"],
+    "clusters":     ["cluster_id", "seed", "concept", "count"],
+    "correlations": ["field_a", "field_b", "cramers_v", "strength", "ci_low", "ci_high"],
+}
+
+
+def _analyzer_rows(result: dict, key: str) -> list[dict]:
+    if key == "clusters":   # nested members → one row per (cluster, concept)
+        return [
+            {"cluster_id": c["id"], "seed": c["seed"], **m}
+            for c in result["clusters"] for m in c["members"]
+        ]
+    return result[key]
+
+
+def _analyzer_response(result: dict, key: str, fmt: Optional[str]):
+    """JSON as-is, or the result's main list as an Arrow / Parquet table."""
+    if not fmt:
+        return result
+    meta = {k: v for k, v in result.items() if k != key}
+    return arrow_exporter.table_response(
+        arrow_exporter.records_table(_analyzer_rows(result, key), _ANALYZER_COLUMNS[key]),
+        fmt, meta,
+    )
+
+
 @router.get("/analyzers/topics/{domain_id}")
 def analyzer_topics(
     domain_id: str,
     top_n: int = Query(default=30, ge=1, le=100),
+    accept: Optional[str] = Header(None),
     _: models.User = Depends(get_current_user),
 ):
     """Top concepts by frequency across enriched entities in a domain."""
     _key = f"topics_{domain_id}_{top_n}"
+    fmt = arrow_exporter.negotiate(accept)
     cached = _analytics_cache.get(_key)
     if cached is not None:
-        return cached
+        return _analyzer_response(cached, "topics", fmt)
     try:
         result = _topic_analyzer.top_topics(domain_id, top_n=top_n)
         _analytics_cache.set(_key, result)
-        return result
+        return _analyzer_response(result, "topics", fmt)
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
     except Exception:
@@ -154,17 +194,19 @@ def analyzer_topics(
 def analyzer_cooccurrence(
     domain_id: str,
     top_n: int = Query(default=20, ge=1, le=100),
+    accept: Optional[str] = Header(None),
     _: models.User = Depends(get_current_user),
 ):
     """Concept co-occurrence pairs with PMI score."""
     _key = f"cooccurrence_{domain_id}_{top_n}"
+    fmt = arrow_exporter.negotiate(accept)
     cached = _analytics_cache.get(_key)
     if cached is not None:
-        return cached
+        return _analyzer_response(cached, "pairs", fmt)
     try:
         result = _topic_analyzer.cooccurrence(domain_id, top_n=top_n)
         _analytics_cache.set(_key, result)
-        return result
+        return _analyzer_response(result, "pairs", fmt)
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
     except Exception:
@@ -176,17 +218,19 @@ def analyzer_cooccurrence(
 def analyzer_clusters(
     domain_id: str,
     n_clusters: int = Query(default=6, ge=2, le=20),
+    accept: Optional[str] = Header(None),
     _: models.User = Depends(get_current_user),
 ):
     """Greedy concept clusters seeded by top concepts."""
     _key = f"clusters_{domain_id}_{n_clusters}"
+    fmt = arrow_exporter.negotiate(accept)
     cached = _analytics_cache.get(_key)
     if cached is not None:
-        return cached
+        return _analyzer_response(cached, "clusters", fmt)
     try:
         result = _topic_analyzer.topic_clusters(domain_id, n_clusters=n_clusters)
         _analytics_cache.set(_key, result)
-        return result
+        return _analyzer_response(result, "clusters", fmt)
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
     except Exception:
@@ -198,17 +242,19 @@ def analyzer_clusters(
 def analyzer_correlation(
     domain_id: str,
     top_n: int = Query(default=20, ge=1, le=50),
+    accept: Optional[str] = Header(None),
     _: models.User = Depends(get_current_user),
 ):
     """Cramér's V pairwise field correlations for categorical columns in a domain."""
     _key = f"correlation_{domain_id}_{top_n}"
+    fmt = arrow_exporter.negotiate(accept)
     cached = _analytics_cache.get(_key)
     if cached is not None:
-        return cached
+        return _analyzer_response(cached, "correlations", fmt)
     try:
         result = _correlation_analyzer.top_correlations(domain_id, top_n=top_n)
         _analytics_cache.set(_key, result)
-        return result
+        return _analyzer_response(result, "correlations", fmt)
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
     except Exception:
@@ -226,7 +272,6 @@ _TOP_YEARS_N  = 6
 @router.get("/dashboard/summary", tags=["analytics"])
 def dashboard_summary(
     domain_id: str = Query(default="default", min_length=1, max_length=64),
-    db: Session = Depends(get_db),
     _: models.User = Depends(get_current_user),
 ):
     """Aggregated KPIs + timeline + heatmap + concepts for the Executive Dashboard."""
@@ -234,53 +279,55 @@ def dashboard_summary(
     cached = _dashboard_cache.get(_key)
     if cached is not None:
         return cached
-    result = _domain_snapshot(db, domain_id, top_n_concepts=30, top_n_entities=10)
+    result = _domain_snapshot(domain_id, top_n_concepts=30, top_n_entities=10)
     _dashboard_cache.set(_key, result)
     return result
 
 
-def _domain_snapshot(db: Session, domain_id: str, top_n_concepts: int = 10,
+_SNAPSHOT_COLUMNS = [
+    "id", "domain", "entity_type", "primary_label", "secondary_label",
+    "enrichment_status", "enrichment_citation_count", "enrichment_source", "quality_score",
+]
+
+
+def _snapshot_rows(domain_id: str) -> pa.Table:
+    """
+    The dashboard's rows of the shared Arrow snapshot (olap_store.snapshot()).
+    "all" takes every row; "default" also matches rows with NULL domain
+    (legacy records pre-Phase 8).
+    """
+    snap = olap_store.snapshot()
+    if not domain_id or domain_id == "all":
+        return snap.table.select(_SNAPSHOT_COLUMNS)
+    if domain_id != "default":
+        return snap.domain(domain_id, _SNAPSHOT_COLUMNS)
+    domain = snap.table["domain"]
+    return snap.table.select(_SNAPSHOT_COLUMNS).filter(
+        pc.or_kleene(pc.equal(domain, domain_id), pc.is_null(domain))
+    )
+
+
+def _domain_snapshot(domain_id: str, top_n_concepts: int = 10,
                      top_n_entities: int = 5) -> dict:
-    """Reusable per-domain KPI snapshot — used by dashboard/summary and compare."""
-    # Filter by domain when not "all".
-    # "default" also matches rows with NULL domain (legacy records pre-Phase 8).
-    def _q():
-        q = db.query(models.RawEntity)
-        if domain_id and domain_id != "all":
-            if domain_id == "default":
-                q = q.filter(
-                    (models.RawEntity.domain == domain_id)
-                    | (models.RawEntity.domain == None)  # noqa: E711
-                )
-            else:
-                q = q.filter(models.RawEntity.domain == domain_id)
-        return q
+    """
+    Reusable per-domain KPI snapshot — used by dashboard/summary and compare.
+    Every KPI is a pyarrow.compute kernel over the shared Arrow snapshot.
+    """
+    t = _snapshot_rows(domain_id)
 
     # ── Hero KPIs ─────────────────────────────────────────────────────────────
-    total_entities = _q().with_entities(func.count(models.RawEntity.id)).scalar() or 0
-    enriched_count = (
-        _q().with_entities(func.count(models.RawEntity.id))
-        .filter(models.RawEntity.enrichment_status == "completed")
-        .scalar() or 0
-    )
+    total_entities = t.num_rows
+    completed = pc.equal(t["enrichment_status"], "completed")
+    enriched_count = count_if(completed)
     enrichment_pct = round(enriched_count / total_entities * 100, 1) if total_entities else 0.0
-    avg_citations_raw = (
-        _q().with_entities(func.avg(models.RawEntity.enrichment_citation_count))
-        .filter(models.RawEntity.enrichment_status == "completed")
-        .scalar()
-    )
+    enriched = t.filter(completed)
+    avg_citations_raw = pc.mean(enriched["enrichment_citation_count"]).as_py()
     avg_citations = round(float(avg_citations_raw), 1) if avg_citations_raw else 0.0
 
     # ── Entity types distribution ──────────────────────────────────────────────
-    type_rows = (
-        _q().with_entities(models.RawEntity.entity_type,
-                           func.count(models.RawEntity.id).label("cnt"))
-        .filter(models.RawEntity.entity_type != None)
-        .group_by(models.RawEntity.entity_type)
-        .order_by(func.count(models.RawEntity.id).desc())
-        .limit(8).all()
-    )
-    type_distribution = [{"type": r[0], "count": r[1]} for r in type_rows]
+    type_distribution = [
+        {"type": v, "count": n} for v, n in value_counts(t["entity_type"])[:8]
+    ]
 
     # ── Timeline: entities by domain (grouped)
     year_counts: dict[int, int] = defaultdict(int)
@@ -297,35 +344,31 @@ def _domain_snapshot(db: Session, domain_id: str, top_n_concepts: int = 10,
     total_concepts = len(top_concepts)
 
     # ── Top entities by citation count ────────────────────────────────────────
-    top_entity_rows = (
-        _q()
-        .with_entities(models.RawEntity.id, models.RawEntity.primary_label,
-                       models.RawEntity.enrichment_citation_count,
-                       models.RawEntity.enrichment_source)
-        .filter(models.RawEntity.enrichment_status == "completed")
-        .order_by(models.RawEntity.enrichment_citation_count.desc())
-        .limit(top_n_entities)
-        .all()
+    order = pc.sort_indices(
+        enriched, sort_keys=[("enrichment_citation_count", "descending")], null_placement="at_end",
     )
+    top_entity_rows = enriched.take(order[:top_n_entities]).select(
+        ["id", "primary_label", "enrichment_citation_count", "enrichment_source"]
+    ).to_pylist()
     top_entities = [
-        {"id": r.id, "primary_label": r.primary_label,
-         "citation_count": r.enrichment_citation_count or 0, "source": r.enrichment_source}
+        {"id": r["id"], "primary_label": r["primary_label"],
+         "citation_count": r["enrichment_citation_count"] or 0, "source": r["enrichment_source"]}
         for r in top_entity_rows
     ]
 
     # ── Heatmap: secondary_label × domain ─────────────────────────────────────
-    label_domain_rows = (
-        _q().with_entities(models.RawEntity.secondary_label, models.RawEntity.domain)
-        .filter(models.RawEntity.secondary_label != None, models.RawEntity.secondary_label != "")
-        .all()
-    )
+    labels = strings(t["secondary_label"])
+    labelled = pc.and_kleene(pc.is_valid(labels), pc.not_equal(labels, ""))
+    pairs = pa.table({
+        "label": labels, "domain": pc.fill_null(strings(t["domain"]), "default"),
+    }).filter(labelled).group_by(["label", "domain"]).aggregate([("label", "count")])
     label_totals: dict[str, int] = defaultdict(int)
     label_domain_raw: dict[str, dict[str, int]] = defaultdict(lambda: defaultdict(int))
     all_domains_set: set[str] = set()
-    for (label, dom) in label_domain_rows:
-        label_totals[label] += 1
-        dom_key = dom or "default"
-        label_domain_raw[label][dom_key] += 1
+    for label, dom_key, n in zip(pairs["label"].to_pylist(), pairs["domain"].to_pylist(),
+                                 pairs["label_count"].to_pylist()):
+        label_totals[label] += n
+        label_domain_raw[label][dom_key] += n
         all_domains_set.add(dom_key)
     top_labels = sorted(label_totals, key=lambda b: label_totals[b], reverse=True)[:_TOP_BRANDS_N]
     heatmap_domains = sorted(all_domains_set)[:_TOP_YEARS_N]
@@ -335,18 +378,13 @@ def _domain_snapshot(db: Session, domain_id: str, top_n_concepts: int = 10,
     }
 
     # ── Quality KPI ──────────────────────────────────────────────────────────
-    quality_rows = (
-        _q()
-        .with_entities(models.RawEntity.quality_score)
-        .filter(models.RawEntity.quality_score != None)
-        .all()
-    )
-    quality_values = [r[0] for r in quality_rows if r[0] is not None]
-    avg_quality = round(sum(quality_values) / len(quality_values), 3) if quality_values else None
+    quality = t["quality_score"]
+    avg_quality_raw = pc.mean(quality).as_py()
+    avg_quality = round(avg_quality_raw, 3) if avg_quality_raw is not None else None
     quality_dist = {
-        "high":   sum(1 for v in quality_values if v >= 0.7),
-        "medium": sum(1 for v in quality_values if 0.3 <= v < 0.7),
-        "low":    sum(1 for v in quality_values if v < 0.3),
+        "high":   count_if(pc.greater_equal(quality, 0.7)),
+        "medium": count_if(pc.and_kleene(pc.greater_equal(quality, 0.3), pc.less(quality, 0.7))),
+        "low":    count_if(pc.less(quality, 0.3)),
     }
 
     return {
@@ -373,7 +411,6 @@ def dashboard_compare(
         default="default,science",
         description="Comma-separated list of domain IDs to compare (2–4 domains)",
     ),
-    db: Session = Depends(get_db),
     _: models.User = Depends(get_current_user),
 ):
     """
@@ -389,7 +426,7 @@ def dashboard_compare(
 
     return {
         "domains": [
-            _domain_snapshot(db, did, top_n_concepts=10, top_n_entities=5)
+            _domain_snapshot(did, top_n_concepts=10, top_n_entities=5)
             for did in domain_ids
         ]
     }
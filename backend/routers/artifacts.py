@@ -18,7 +18,7 @@ from backend import models
 from backend.auth import get_current_user, require_role
 from backend.database import get_db
 from backend.analyzers.gap_detector import GapAnalyzer
-from backend.schema_registry import SchemaRegistry
+from backend.schema_registry import registry
 from backend.schemas import (
     GapItemResponse,
     GapReportResponse,
@@ -29,7 +29,6 @@ from backend.schemas import (
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/artifacts", tags=["artifacts"])
-_registry = SchemaRegistry()
 _analyzer = GapAnalyzer()
 
 
@@ -41,7 +40,7 @@ def detect_gaps(
     db: Session = Depends(get_db),
     _current_user=Depends(get_current_user),
 ):
-    domain = _registry.get_domain(domain_id)
+    domain = registry.get_domain(domain_id)
     if domain is None:
         raise HTTPException(status_code=404, detail=f"Domain '{domain_id}' not found")
 
@@ -18,7 +18,7 @@ from backend.auth import get_current_user, require_role
 from backend.context_engine import ContextEngine
 from backend.database import get_db
 from backend.routers.deps import _get_active_integration
-from backend.schema_registry import SchemaRegistry
+from backend.schema_registry import registry
 
 logger = logging.getLogger(__name__)
 
@@ -30,7 +30,7 @@ _engine = ContextEngine()
 # ── Helper ─────────────────────────────────────────────────────────────────────
 
 def _validate_domain(domain_id: str) -> None:
-    if SchemaRegistry().get_domain(domain_id) is None:
+    if registry.get_domain(domain_id) is None:
         raise HTTPException(status_code=404, detail=f"Domain '{domain_id}' not found")
 
 
@@ -16,7 +16,12 @@ from thefuzz import fuzz, process
 
 from backend import database, models
 from backend.adapters import get_adapter
+from backend.analyzers.concept_index import concept_index
+from backend.analyzers.gap_detector import invalidate_gap_cache
+from backend.context_engine import invalidate_context_cache
+from backend.graph_analytics import invalidate_graph_cache
 from backend.encryption import decrypt
+from backend.olap_store import olap_store
 
 logger = logging.getLogger(__name__)
 
@@ -45,6 +50,24 @@ def _audit(
     db.add(entry)
 
 
+# ── Derived-data invalidation ─────────────────────────────────────────────────
+
+def _invalidate_entity_caches(domain_id: str | None = None) -> None:
+    """
+    Drop data derived from raw_entities (pre-aggregated OLAP cubes, gap
+    metrics, domain context snapshots, the relationship graph — merges
+    repoint edges) after a committed write, and start background refreshes of
+    the OLAP replica (with its dimension sketches) and the concept index so
+    reads never pay for the write. domain_id=None invalidates every domain.
+    """
+    olap_store.cubes.invalidate(domain_id)
+    olap_store.schedule_refresh()
+    concept_index.schedule_sync()
+    invalidate_gap_cache()
+    invalidate_context_cache()
+    invalidate_graph_cache()
+
+
 # ── Disambiguation helper ─────────────────────────────────────────────────────
 
 def _build_disambig_groups(field: str, threshold: int, db: Session, algorithm: str = "token_sort"):
@@ -21,7 +21,7 @@ from backend import models, schemas
 from backend.auth import get_current_user, require_role
 from backend.database import get_db
 from backend.llm_agent import resolve_canonical_name
-from backend.routers.deps import _build_disambig_groups
+from backend.routers.deps import _build_disambig_groups, _invalidate_entity_caches
 
 logger = logging.getLogger(__name__)
 
@@ -198,6 +198,7 @@ def apply_rules(
                     continue
 
     db.commit()
+    _invalidate_entity_caches()
     return {
         "message": f"Applied {len(rules)} rules",
         "rules_applied": len(rules),
@@ -5,12 +5,16 @@ Domain registry and OLAP cube endpoints.
   GET /olap/{domain_id}
   GET /cube/dimensions/{domain_id}
   POST /cube/query
+  POST /cube/drilldown
   GET /cube/export/{domain_id}
+
+Cube endpoints honour Accept: application/vnd.apache.arrow.stream (or
+application/vnd.apache.parquet) — see backend/exporters/arrow_exporter.py.
 """
 import logging
-from typing import List
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
 from sqlalchemy.orm import Session
@@ -18,7 +22,8 @@ from sqlalchemy.orm import Session
 from backend import models
 from backend.auth import get_current_user, require_role
 from backend.database import get_db
-from backend.olap import olap_engine
+from backend.exporters import arrow_exporter
+from backend.olap import MAX_DRILLDOWN_DIMENSIONS, olap_engine
 from backend.schema_registry import DomainSchema, registry
 
 logger = logging.getLogger(__name__)
@@ -96,6 +101,23 @@ class _CubeQueryPayload(BaseModel):
     filters: dict = {}
 
 
+class _CubeDrilldownPayload(BaseModel):
+    domain_id: str = Field(min_length=1, max_length=64)
+    group_by: List[str] = Field(min_length=1, max_length=MAX_DRILLDOWN_DIMENSIONS)
+    measures: List[str] = Field(default_factory=list, max_length=8)
+    filters: dict = {}
+    rollup: bool = False
+    top_k: Optional[int] = Field(None, ge=1, le=1000)
+
+
+def _cube_table(result: dict):
+    """query_cube() rows as a columnar table: one column per dimension + count + pct."""
+    return arrow_exporter.records_table(
+        [{**r["values"], "count": r["count"], "pct": r["pct"]} for r in result["rows"]],
+        columns=[*result["group_by"], "count", "pct"],
+    )
+
+
 @router.get("/cube/dimensions/{domain_id}")
 def cube_dimensions(domain_id: str, _: models.User = Depends(get_current_user)):
     """
@@ -114,16 +136,22 @@ def cube_dimensions(domain_id: str, _: models.User = Depends(get_current_user)):
 @router.post("/cube/query")
 def cube_query(
     payload: _CubeQueryPayload,
+    accept: Optional[str] = Header(None),
     _: models.User = Depends(get_current_user),
 ):
     """
     GROUP BY query against the domain data cube.
     Accepts 1 or 2 dimensions and optional equality filters.
     """
+    fmt = arrow_exporter.negotiate(accept)
     try:
-        return olap_engine.query_cube(
+        result = olap_engine.query_cube(
             payload.domain_id, payload.group_by, payload.filters or None
         )
+        if fmt:
+            meta = {k: result[k] for k in ("domain_id", "group_by", "filters", "total")}
+            return arrow_exporter.table_response(_cube_table(result), fmt, meta)
+        return result
     except ValueError as e:
         raise HTTPException(status_code=422, detail=str(e))
     except Exception:
@@ -131,14 +159,57 @@ def cube_query(
         raise HTTPException(status_code=500, detail="OLAP query error")
 
 
+@router.post("/cube/drilldown")
+def cube_drilldown(
+    payload: _CubeDrilldownPayload,
+    accept: Optional[str] = Header(None),
+    _: models.User = Depends(get_current_user),
+):
+    """
+    N-dimensional GROUP BY with measures, optional ROLLUP subtotals and
+    per-group top-k, computed in one DuckDB statement. Returns a columnar
+    payload: {"columns": [...], "data": {column: [values...]}}.
+    """
+    fmt = arrow_exporter.negotiate(accept)
+    try:
+        if fmt:
+            table = olap_engine.drilldown_table(
+                payload.domain_id, payload.group_by, payload.measures,
+                payload.filters or None, payload.rollup, payload.top_k,
+            )
+            meta = payload.model_dump(include={"domain_id", "group_by", "filters", "rollup", "top_k"})
+            return arrow_exporter.table_response(table, fmt, meta)
+        return olap_engine.drilldown(
+            payload.domain_id, payload.group_by, payload.measures,
+            payload.filters or None, payload.rollup, payload.top_k,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except Exception:
+        logger.exception("cube_drilldown error")
+        raise HTTPException(status_code=500, detail="OLAP query error")
+
+
 @router.get("/cube/export/{domain_id}")
 def cube_export(
     domain_id: str,
     dimension: str = Query(min_length=1, max_length=64),
+    accept: Optional[str] = Header(None),
     _: models.User = Depends(get_current_user),
 ):
-    """Export a single-dimension GROUP BY as an Excel (.xlsx) file."""
+    """
+    Export a single-dimension GROUP BY as an Excel (.xlsx) file, or as an
+    Arrow stream / Parquet file when the Accept header asks for one.
+    """
+    fmt = arrow_exporter.negotiate(accept)
     try:
+        if fmt:
+            result = olap_engine.query_cube(domain_id, [dimension])
+            return arrow_exporter.table_response(
+                _cube_table(result), fmt,
+                meta={"domain_id": domain_id, "total": result["total"]},
+                filename=f"cube_{domain_id}_{dimension}",
+            )
         xlsx_bytes = olap_engine.export_to_excel(domain_id, dimension)
     except ValueError as e:
         raise HTTPException(status_code=422, detail=str(e))
@@ -5,6 +5,7 @@ Entity CRUD, enrichment, and entity-linker endpoints.
   GET  /entities/{entity_id}
   POST /entities/link/find
   POST /entities/link/merge
+  POST /entities/link/merge-bulk
   POST /entities/link/dismiss
   PUT  /entities/{entity_id}
   DELETE /entities/bulk
@@ -30,7 +31,7 @@ from backend.auth import get_current_user, require_role
 from backend.database import get_db
 from backend import enrichment_worker
 from backend import entity_linker as _entity_linker
-from backend.routers.deps import _audit, _dispatch_webhook
+from backend.routers.deps import _audit, _dispatch_webhook, _invalidate_entity_caches
 
 router = APIRouter(tags=["entities"])
 
@@ -211,6 +212,10 @@ class _LinkMergeRequest(BaseModel):
     strategy:      str       = Field("keep_non_empty")
 
 
+class _LinkBulkMergeRequest(BaseModel):
+    groups: List[_LinkMergeRequest] = Field(..., min_length=1, max_length=10_000)
+
+
 class _LinkDismissRequest(BaseModel):
     entity_a_id: int = Field(..., ge=1)
     entity_b_id: int = Field(..., ge=1)
@@ -272,6 +277,7 @@ def link_merge(
         },
     )
     db.commit()
+    _invalidate_entity_caches()
     _dispatch_webhook(
         "entity.merge",
         {"primary_id": payload.primary_id, "deleted": len(payload.secondary_ids)},
@@ -290,6 +296,50 @@ def link_merge(
     }
 
 
+@router.post("/entities/link/merge-bulk", tags=["entity-linker"])
+def link_merge_bulk(
+    payload: _LinkBulkMergeRequest,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(require_role("super_admin", "admin", "editor")),
+):
+    """
+    Collapse many duplicate clusters in a single transaction.
+    Each group is merged exactly like /entities/link/merge; relationships,
+    annotations and store mappings are repointed to the surviving primary.
+    """
+    for g in payload.groups:
+        if g.strategy not in _entity_linker.MERGE_STRATEGIES:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unknown strategy '{g.strategy}'. "
+                       f"Allowed: {', '.join(_entity_linker.MERGE_STRATEGIES)}",
+            )
+    try:
+        result = _entity_linker.bulk_merge_entities(db, [g.model_dump() for g in payload.groups])
+    except ValueError as exc:
+        status = 404 if "not found" in str(exc) else 400
+        raise HTTPException(status_code=status, detail=str(exc))
+
+    _audit(
+        db, "entity.merge_bulk",
+        user_id=current_user.id,
+        entity_type="entity",
+        details={
+            "groups":        len(payload.groups),
+            "primary_ids":   [g.primary_id for g in payload.groups[:20]],
+            "deleted":       result["deleted_count"],
+        },
+    )
+    db.commit()
+    _invalidate_entity_caches()
+    _dispatch_webhook(
+        "entity.merge",
+        {"groups": result["groups_merged"], "deleted": result["deleted_count"]},
+        database.SessionLocal,
+    )
+    return result
+
+
 @router.post("/entities/link/dismiss", tags=["entity-linker"])
 def link_dismiss(
     payload: _LinkDismissRequest,
@@ -2,6 +2,8 @@
 Entity Linker — detect and resolve potential duplicate entities.
 
 GET    /linker/candidates              → List[LinkCandidateResponse]
+GET    /linker/model                   → learned Fellegi–Sunter weights for a domain
+POST   /linker/model/train             → fit EM weights for a domain and persist them
 POST   /linker/merge                   → merged RawEntity
 POST   /linker/dismiss                 → {"ok": True, "id": <dismissal_id>}
 GET    /linker/dismissals              → List[DismissalResponse]
@@ -17,9 +19,11 @@ from sqlalchemy.orm import Session
 from thefuzz import fuzz
 
 from backend import models
+from backend import entity_linker as _entity_linker
+from backend import record_linkage
 from backend.auth import get_current_user, require_role
 from backend.database import get_db
-from backend.routers.deps import _audit
+from backend.routers.deps import _audit, _invalidate_entity_caches
 
 logger = logging.getLogger(__name__)
 
@@ -63,6 +67,16 @@ class DismissalResponse(BaseModel):
     entity_b_id: int
 
 
+class LinkageModelResponse(BaseModel):
+    domain:        str
+    prior:         float
+    pairs_trained: int
+    iterations:    int
+    converged:     bool
+    trained_at:    Optional[str] = None
+    weights:       dict           # field → [log2(m/u) per level, lowest agreement first]
+
+
 # ── Helpers ───────────────────────────────────────────────────────────────────
 
 def _snap(e: models.RawEntity) -> EntitySnap:
@@ -108,6 +122,22 @@ def _pair_score(a: models.RawEntity, b: models.RawEntity):
     return round(score, 3), matched
 
 
+def _model_response(row: models.LinkageModel) -> LinkageModelResponse:
+    params = record_linkage.LinkageParams.from_row(row)
+    return LinkageModelResponse(
+        domain=row.domain,
+        prior=round(row.prior, 6),
+        pairs_trained=row.pairs_trained or 0,
+        iterations=row.iterations or 0,
+        converged=bool(row.converged),
+        trained_at=row.trained_at.isoformat() if row.trained_at else None,
+        weights={
+            f: [round(float(w), 4) for w in ws]
+            for f, ws in zip(params.fields, params.weights())
+        },
+    )
+
+
 def _dismissed_set(db: Session) -> set:
     rows = db.query(
         models.LinkDismissal.entity_a_id,
@@ -122,10 +152,21 @@ def _dismissed_set(db: Session) -> set:
 def get_candidates(
     threshold: float   = Query(default=0.75, ge=0.0, le=1.0),
     limit:     int     = Query(default=20, ge=1, le=_MAX_PAIRS),
+    method:    str     = Query(default="fuzzy", pattern="^(fuzzy|probabilistic)$"),
+    domain:    Optional[str] = Query(default=None, max_length=64),
     db:        Session = Depends(get_db),
     _:         models.User = Depends(get_current_user),
 ):
-    """Return entity pairs that are likely duplicates (score ≥ threshold)."""
+    """
+    Return entity pairs that are likely duplicates (score ≥ threshold).
+
+    method=fuzzy          — thefuzz weighted ratios within secondary_label buckets.
+    method=probabilistic  — Fellegi–Sunter match probability using the domain's
+                            EM-trained weights (see POST /linker/model/train).
+    """
+    if method == "probabilistic":
+        return _probabilistic_candidates(db, domain, threshold, limit)
+
     entities = (
         db.query(models.RawEntity)
         .filter(models.RawEntity.primary_label != None)  # noqa: E711
@@ -172,6 +213,52 @@ def get_candidates(
     return candidates[:limit]
 
 
+def _probabilistic_candidates(db: Session, domain, threshold: float, limit: int):
+    scored = record_linkage.score_candidates(
+        db, domain, threshold=threshold, limit=limit, dismissed=_dismissed_set(db)
+    )
+    ids = {p.entity_a_id for p in scored} | {p.entity_b_id for p in scored}
+    by_id = {
+        e.id: e for e in db.query(models.RawEntity).filter(models.RawEntity.id.in_(ids)).all()
+    } if ids else {}
+    return [
+        LinkCandidateResponse(
+            entity_a=_snap(by_id[p.entity_a_id]),
+            entity_b=_snap(by_id[p.entity_b_id]),
+            score=p.probability,
+            matched_fields=p.matched_fields,
+        )
+        for p in scored
+    ]
+
+
+@router.get("/model", response_model=LinkageModelResponse)
+def get_linkage_model(
+    domain: Optional[str] = Query(default=None, max_length=64),
+    db:     Session = Depends(get_db),
+    _:      models.User = Depends(get_current_user),
+):
+    """Return the persisted linkage weights for a domain (omit domain for the global model)."""
+    row = record_linkage.model_row(db, domain)
+    if not row:
+        raise HTTPException(status_code=404, detail="No linkage model trained for this domain")
+    return _model_response(row)
+
+
+@router.post("/model/train", response_model=LinkageModelResponse)
+def train_linkage_model(
+    domain:       Optional[str] = Query(default=None, max_length=64),
+    db:           Session = Depends(get_db),
+    current_user: models.User = Depends(require_role("super_admin", "admin", "editor")),
+):
+    """Estimate m/u probabilities by EM on the domain's blocked candidate pairs."""
+    row = record_linkage.train_domain(db, domain)
+    _audit(db, "linker.train", user_id=current_user.id, entity_type="linkage_model",
+           entity_id=row.id, details={"domain": row.domain, "pairs": row.pairs_trained})
+    db.commit()
+    return _model_response(row)
+
+
 @router.post("/merge")
 def merge_entities(
     payload:      MergeRequest,
@@ -207,8 +294,10 @@ def merge_entities(
     _audit(db, "MERGE", user_id=current_user.id, entity_type="entity",
            entity_id=winner.id, details={"absorbed": loser.id})
 
+    _entity_linker.repoint_references(db, {loser.id: winner.id})
     db.delete(loser)
     db.commit()
+    _invalidate_entity_caches()
     db.refresh(winner)
     return winner
 
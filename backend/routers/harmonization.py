@@ -10,7 +10,6 @@ Harmonization pipeline endpoints.
 """
 import json
 import logging
-import re
 from datetime import datetime, timezone
 
 from fastapi import APIRouter, Depends, HTTPException, Path
@@ -20,7 +19,9 @@ from sqlalchemy.orm import Session
 from backend import database, models
 from backend.auth import get_current_user, require_role
 from backend.database import get_db
-from backend.routers.deps import _audit, _dispatch_webhook
+from backend.harmonization import engine as _engine
+from backend.harmonization import pipeline as _pipeline
+from backend.routers.deps import _audit, _dispatch_webhook, _invalidate_entity_caches
 
 logger = logging.getLogger(__name__)
 
@@ -28,8 +29,6 @@ router = APIRouter(tags=["harmonization"])
 
 # ── Harmonization pipeline metadata ──────────────────────────────────────────
 
-from sqlalchemy import or_
-
 HARMONIZATION_STEPS = [
     {
         "step_id":    "normalize_labels",
@@ -61,115 +60,31 @@ HARMONIZATION_STEPS = [
     },
 ]
 
-_PREVIEW_ROW_CAP = 10_000  # Max rows examined during preview to avoid OOM
+# ── Step implementations (set-based, see backend/harmonization/engine.py) ────
 
+STEP_FUNCTIONS = _engine.SQL_STEPS
 
-# ── Step functions ────────────────────────────────────────────────────────────
 
-def _step_normalize_labels(db: Session, preview_only: bool):
-    entities = db.query(models.RawEntity).filter(
-        or_(
-            models.RawEntity.primary_label != None,
-            models.RawEntity.secondary_label != None,
-        )
-    ).all()
-    changes = []
-    for p in entities:
-        for field in ("primary_label", "secondary_label"):
-            val = getattr(p, field)
-            if val is None:
-                continue
-            cleaned = re.sub(r"\s+", " ", val).strip()
-            if cleaned != val:
-                changes.append({
-                    "record_id": p.id,
-                    "field":     field,
-                    "old_value": val,
-                    "new_value": cleaned,
-                })
-                if not preview_only:
-                    setattr(p, field, cleaned)
-    if not preview_only:
-        db.commit()
-    return changes
-
-
-def _step_normalize_canonical_ids(db: Session, preview_only: bool):
-    entities = db.query(models.RawEntity).filter(
-        models.RawEntity.canonical_id != None
-    ).all()
-    changes = []
-    for p in entities:
-        val = p.canonical_id
-        if val is None:
-            continue
-        cleaned = val.strip() or None
-        if cleaned != val:
-            changes.append({
-                "record_id": p.id,
-                "field":     "canonical_id",
-                "old_value": val,
-                "new_value": cleaned,
-            })
-            if not preview_only:
-                p.canonical_id = cleaned
-    if not preview_only:
-        db.commit()
-    return changes
-
-
-def _step_normalize_entity_types(db: Session, preview_only: bool):
-    entities = db.query(models.RawEntity).filter(
-        models.RawEntity.entity_type != None
-    ).all()
-    changes = []
-    for p in entities:
-        val = p.entity_type
-        if val is None:
-            continue
-        cleaned = val.strip().lower()
-        if cleaned != val:
-            changes.append({
-                "record_id": p.id,
-                "field":     "entity_type",
-                "old_value": val,
-                "new_value": cleaned,
-            })
-            if not preview_only:
-                p.entity_type = cleaned
-    if not preview_only:
-        db.commit()
-    return changes
-
-
-def _step_set_default_validation(db: Session, preview_only: bool):
-    entities = db.query(models.RawEntity).filter(
-        or_(
-            models.RawEntity.validation_status == None,
-            models.RawEntity.validation_status == "",
-        )
-    ).all()
-    changes = []
-    for p in entities:
-        changes.append({
-            "record_id": p.id,
-            "field":     "validation_status",
-            "old_value": p.validation_status,
-            "new_value": "pending",
-        })
-        if not preview_only:
-            p.validation_status = "pending"
-    if not preview_only:
-        db.commit()
-    return changes
+def _record_step(db: Session, step_def: dict) -> tuple:
+    """Apply one step set-wise and log it. Returns (log_entry, records_updated, fields_modified)."""
+    log_entry = models.HarmonizationLog(
+        step_id=step_def["step_id"],
+        step_name=step_def["name"],
+        records_updated=0,
+        executed_at=datetime.now(timezone.utc),
+        reverted=False,
+    )
+    db.add(log_entry)
+    db.flush()
 
+    per_field = _engine.apply_step(db, STEP_FUNCTIONS[step_def["step_id"]], log_entry.id)
+    records_updated = sum(per_field.values())
+    fields_modified = [f for f, n in per_field.items() if n]
 
-STEP_FUNCTIONS = {
-    "normalize_labels":        _step_normalize_labels,
-    "normalize_canonical_ids": _step_normalize_canonical_ids,
-    "normalize_entity_types":  _step_normalize_entity_types,
-    "set_default_validation":  _step_set_default_validation,
-}
+    log_entry.records_updated = records_updated
+    log_entry.fields_modified = json.dumps(fields_modified)
+    log_entry.details = json.dumps({"sample": _engine.change_sample(db, log_entry.id)})
+    return log_entry, records_updated, fields_modified
 
 
 # ── Endpoints ─────────────────────────────────────────────────────────────────
@@ -206,13 +121,15 @@ def preview_harmonization_step(
     if step_id not in STEP_FUNCTIONS:
         raise HTTPException(status_code=400, detail=f"Unknown step: {step_id}")
     step_def = next(s for s in HARMONIZATION_STEPS if s["step_id"] == step_id)
-    changes = STEP_FUNCTIONS[step_id](db, preview_only=True)
+    step = STEP_FUNCTIONS[step_id]
+    changes = _engine.preview_changes(db, step, limit=200)
     return {
         "step_id":       step_id,
         "step_name":     step_def["name"],
         "description":   step_def["description"],
-        "total_affected": len(changes),
-        "changes":       changes[:200],
+        "total_affected": _engine.count_changes(db, step),
+        "affected_estimated": False,
+        "changes":       changes,
         "sample_changes": changes[:50],
     }
 
@@ -226,29 +143,7 @@ def apply_harmonization_step(
     if step_id not in STEP_FUNCTIONS:
         raise HTTPException(status_code=400, detail=f"Unknown step: {step_id}")
     step_def = next(s for s in HARMONIZATION_STEPS if s["step_id"] == step_id)
-    changes = STEP_FUNCTIONS[step_id](db, preview_only=False)
-
-    fields_modified = list({c["field"] for c in changes})
-    log_entry = models.HarmonizationLog(
-        step_id=step_id,
-        step_name=step_def["name"],
-        records_updated=len(changes),
-        fields_modified=json.dumps(fields_modified),
-        executed_at=datetime.now(timezone.utc),
-        details=json.dumps({"sample": changes[:20]}),
-        reverted=False,
-    )
-    db.add(log_entry)
-    db.flush()
-
-    for c in changes:
-        db.add(models.HarmonizationChangeRecord(
-            log_id=log_entry.id,
-            record_id=c["record_id"],
-            field=c["field"],
-            old_value=c["old_value"],
-            new_value=c["new_value"],
-        ))
+    log_entry, records_updated, fields_modified = _record_step(db, step_def)
 
     _audit(
         db, "harmonization.apply",
@@ -256,19 +151,20 @@ def apply_harmonization_step(
         details={
             "step_id":         step_id,
             "step_name":       step_def["name"],
-            "records_updated": len(changes),
+            "records_updated": records_updated,
         },
     )
     db.commit()
+    _invalidate_entity_caches()
     _dispatch_webhook(
         "harmonization.apply",
-        {"step_id": step_id, "records_updated": len(changes)},
+        {"step_id": step_id, "records_updated": records_updated},
         database.SessionLocal,
     )
     return {
         "step_id":          step_id,
         "step_name":        step_def["name"],
-        "records_updated":  len(changes),
+        "records_updated":  records_updated,
         "fields_modified":  fields_modified,
         "log_id":           log_entry.id,
     }
@@ -279,41 +175,42 @@ def apply_all_harmonization_steps(
     db: Session = Depends(get_db),
     _: models.User = Depends(require_role("super_admin", "admin", "editor")),
 ):
-    results = []
+    now = datetime.now(timezone.utc)
+    logs = {}
     for step in HARMONIZATION_STEPS:
-        step_id = step["step_id"]
-        changes = STEP_FUNCTIONS[step_id](db, preview_only=False)
-        fields_modified = list({c["field"] for c in changes})
-
-        log_entry = models.HarmonizationLog(
-            step_id=step_id,
+        logs[step["step_id"]] = models.HarmonizationLog(
+            step_id=step["step_id"],
             step_name=step["name"],
-            records_updated=len(changes),
-            fields_modified=json.dumps(fields_modified),
-            executed_at=datetime.now(timezone.utc),
+            records_updated=0,
+            executed_at=now,
             reverted=False,
         )
-        db.add(log_entry)
-        db.flush()
-
-        for c in changes:
-            db.add(models.HarmonizationChangeRecord(
-                log_id=log_entry.id,
-                record_id=c["record_id"],
-                field=c["field"],
-                old_value=c["old_value"],
-                new_value=c["new_value"],
-            ))
+        db.add(logs[step["step_id"]])
+    db.flush()
 
+    counts = _pipeline.run_pipeline(
+        db,
+        [STEP_FUNCTIONS[s["step_id"]] for s in HARMONIZATION_STEPS],
+        {step_id: log.id for step_id, log in logs.items()},
+    )
+
+    results = []
+    for step in HARMONIZATION_STEPS:
+        log_entry = logs[step["step_id"]]
+        per_field = counts[step["step_id"]]
+        fields_modified = [f for f, n in per_field.items() if n]
+        log_entry.records_updated = sum(per_field.values())
+        log_entry.fields_modified = json.dumps(fields_modified)
         results.append({
-            "step_id":         step_id,
+            "step_id":         step["step_id"],
             "step_name":       step["name"],
-            "records_updated": len(changes),
+            "records_updated": log_entry.records_updated,
             "fields_modified": fields_modified,
             "log_id":          log_entry.id,
         })
 
     db.commit()
+    _invalidate_entity_caches()
     return {"results": results, "total_steps": len(results)}
 
 
@@ -356,25 +253,17 @@ def undo_harmonization(
     if log_entry.reverted:
         raise HTTPException(status_code=400, detail="This operation has already been reverted")
 
-    change_records = db.query(models.HarmonizationChangeRecord).filter(
-        models.HarmonizationChangeRecord.log_id == log_id
-    ).all()
-
-    if not change_records and log_entry.records_updated > 0:
+    if log_entry.records_updated > 0 and not _engine.has_change_records(db, log_id):
         raise HTTPException(
             status_code=400,
             detail="No change records found for this log entry (pre-undo data not available)",
         )
 
-    restored = 0
-    for cr in change_records:
-        entity = db.query(models.RawEntity).filter(models.RawEntity.id == cr.record_id).first()
-        if entity:
-            setattr(entity, cr.field, cr.old_value)
-            restored += 1
+    restored = _engine.revert_log(db, log_id, "undo")
 
     log_entry.reverted = True
     db.commit()
+    _invalidate_entity_caches()
     return {
         "log_id":           log_id,
         "action":           "undo",
@@ -400,19 +289,11 @@ def redo_harmonization(
             status_code=400, detail="This operation has not been reverted, cannot redo"
         )
 
-    change_records = db.query(models.HarmonizationChangeRecord).filter(
-        models.HarmonizationChangeRecord.log_id == log_id
-    ).all()
-
-    reapplied = 0
-    for cr in change_records:
-        entity = db.query(models.RawEntity).filter(models.RawEntity.id == cr.record_id).first()
-        if entity:
-            setattr(entity, cr.field, cr.new_value)
-            reapplied += 1
+    reapplied = _engine.revert_log(db, log_id, "redo")
 
     log_entry.reverted = False
     db.commit()
+    _invalidate_entity_caches()
     return {
         "log_id":           log_id,
         "action":           "redo",
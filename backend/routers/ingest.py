@@ -32,7 +32,9 @@ from backend.parsers.bibtex_parser import parse_bibtex
 from backend.parsers.ris_parser import parse_ris
 from backend.parsers.science_mapper import science_record_to_entity
 from backend.routers.column_maps import COLUMN_MAPPING, EXPORT_COLUMN_MAPPING
-from backend.routers.deps import _audit, _dispatch_webhook, _get_active_integration
+from backend.routers.deps import (
+    _audit, _dispatch_webhook, _get_active_integration, _invalidate_entity_caches,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -428,6 +430,7 @@ async def upload_file(
         _audit(db, "upload", user_id=current_user.id,
                details={"filename": file.filename, "rows": len(objects), "format": fmt})
         db.commit()
+        _invalidate_entity_caches(effective_domain)
         _dispatch_webhook("upload", {"filename": file.filename, "rows": len(objects)},
                           database.SessionLocal)
         return {
@@ -534,6 +537,7 @@ async def upload_file(
         details={"filename": file.filename, "rows": len(objects)},
     )
     db.commit()
+    _invalidate_entity_caches(domain)
     _dispatch_webhook(
         "upload",
         {"filename": file.filename, "rows": len(objects)},
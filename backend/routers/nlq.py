@@ -41,10 +41,14 @@ def _get_active_integration(db: Session):
 
 
 def _build_system_prompt(dimensions: list[dict]) -> str:
-    dims_block = "\n".join(
-        f'  - "{d["name"]}" ({d["type"]}, {d["distinct_count"]} distinct values): {d["label"]}'
-        for d in dimensions
-    )
+    def _line(d: dict) -> str:
+        line = f'  - "{d["name"]}" ({d["type"]}, {d["distinct_count"]} distinct values): {d["label"]}'
+        top = [t["value"] for t in d.get("top_values", [])]
+        if top:
+            line += "; most common values: " + ", ".join(f'"{v}"' for v in top)
+        return line
+
+    dims_block = "\n".join(_line(d) for d in dimensions)
     return f"""You are a data analyst assistant that translates natural language questions into OLAP cube queries.
 
 Available dimensions (use ONLY these exact names):
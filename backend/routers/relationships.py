@@ -10,6 +10,9 @@ Sprint 73 — Graph Analytics
   GET  /graph/stats                    — global graph statistics
   GET  /graph/path                     — BFS shortest path
   GET  /graph/components               — list connected components
+
+Sprint 115 — analytics read the cached CSR graph (graph_analytics.graph_cache);
+relationship writes invalidate it.
 """
 import logging
 from collections import defaultdict, deque
@@ -40,32 +43,20 @@ def get_graph_stats(
     _: models.User = Depends(get_current_user),
 ):
     """Sprint 73 — Global graph statistics: nodes, edges, components, top PageRank."""
-    edges = graph_analytics.fetch_edges(db)
+    graph = graph_analytics.graph_cache.get(db)
 
-    if not edges:
+    if not graph.n_edges:
         return {
             "total_nodes": 0, "total_edges": 0,
             "total_components": 0, "largest_component_size": 0,
             "top_pagerank": [], "top_degree": [],
         }
 
-    nodes: set[int] = set()
-    for src, dst, _, _ in edges:
-        nodes.add(src)
-        nodes.add(dst)
-
-    components = graph_analytics.connected_components(edges)
-    sizes = graph_analytics.component_sizes(components)
-
-    pr = graph_analytics.pagerank(edges)
-    top_pr = sorted(pr.items(), key=lambda x: x[1], reverse=True)[:10]
+    sizes = graph.sizes
+    top_pr = [(nid, graph.ranks[nid]) for nid in graph.rank_order[:10]]
 
     # Top by total degree
-    degree_map: dict[int, int] = {}
-    for node in nodes:
-        d = graph_analytics.degree_centrality(node, edges)
-        degree_map[node] = d["total_degree"]
-    top_degree = sorted(degree_map.items(), key=lambda x: x[1], reverse=True)[:10]
+    top_degree = graph.top_degree(10)
 
     # Resolve labels for top nodes
     top_ids = {nid for nid, _ in top_pr + top_degree}
@@ -75,8 +66,8 @@ def get_graph_stats(
     }
 
     return {
-        "total_nodes":            len(nodes),
-        "total_edges":            len(edges),
+        "total_nodes":            graph.n_nodes,
+        "total_edges":            graph.n_edges,
         "total_components":       len(sizes),
         "largest_component_size": max(sizes.values()) if sizes else 0,
         "top_pagerank": [
@@ -106,7 +97,7 @@ def get_shortest_path(
         if not db.query(models.RawEntity).filter(models.RawEntity.id == eid).first():
             raise HTTPException(status_code=404, detail=f"Entity {eid} not found")
 
-    edges = graph_analytics.fetch_edges(db)
+    edges = graph_analytics.graph_cache.get(db).edges
     result = graph_analytics.shortest_path(from_id, to_id, edges)
 
     if result is None:
@@ -139,13 +130,13 @@ def get_graph_components(
     _: models.User = Depends(get_current_user),
 ):
     """Sprint 73 — List all weakly connected components with sizes and member IDs."""
-    edges = graph_analytics.fetch_edges(db)
+    graph = graph_analytics.graph_cache.get(db)
 
-    if not edges:
+    if not graph.n_edges:
         return {"total_components": 0, "components": []}
 
-    node_to_comp = graph_analytics.connected_components(edges)
-    sizes = graph_analytics.component_sizes(node_to_comp)
+    node_to_comp = graph.components
+    sizes = graph.sizes
 
     # Group nodes by component
     comp_members: dict[int, list[int]] = defaultdict(list)
@@ -182,21 +173,20 @@ def get_entity_graph_metrics(
     if not entity:
         raise HTTPException(status_code=404, detail="Entity not found")
 
-    edges = graph_analytics.fetch_edges(db)
+    graph = graph_analytics.graph_cache.get(db)
 
     # Degree
-    degree = graph_analytics.degree_centrality(entity_id, edges)
+    degree = graph.degree(entity_id)
 
     # PageRank
-    pr = graph_analytics.pagerank(edges)
+    pr = graph.ranks
     pr_score = pr.get(entity_id, 0.0)
     # Rank position
-    sorted_pr = sorted(pr.items(), key=lambda x: x[1], reverse=True)
-    pr_rank = next((i + 1 for i, (nid, _) in enumerate(sorted_pr) if nid == entity_id), None)
+    pr_rank = graph.rank_of(entity_id)
 
     # Components
-    components = graph_analytics.connected_components(edges)
-    sizes = graph_analytics.component_sizes(components)
+    components = graph.components
+    sizes = graph.sizes
     comp_id = components.get(entity_id)
     comp_size = sizes.get(comp_id, 0) if comp_id is not None else 0
 
@@ -362,6 +352,7 @@ def create_relationship(
     )
     db.add(rel)
     db.commit()
+    graph_analytics.invalidate_graph_cache()
     db.refresh(rel)
     return rel
 
@@ -378,3 +369,4 @@ def delete_relationship(
         raise HTTPException(status_code=404, detail="Relationship not found")
     db.delete(rel)
     db.commit()
+    graph_analytics.invalidate_graph_cache()
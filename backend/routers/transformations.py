@@ -2,6 +2,7 @@
 Transformation engine endpoints.
   POST /transformations/preview   — preview expression on sample rows
   POST /transformations/apply     — apply to all entities in domain
+  POST /transformations/apply-batch — apply several field expressions in one pass
   GET  /transformations/history   — list applied transformations
 """
 import json
@@ -17,10 +18,13 @@ from sqlalchemy.orm import Session
 from backend import models
 from backend.auth import get_current_user, require_role
 from backend.database import get_db
-from backend.routers.deps import _audit
+from backend.harmonization.engine import change_sample
+from backend.routers.deps import _audit, _invalidate_entity_caches
 from backend.transformations.engine import (
-    apply_expression, validate_expression,
-    TransformError, TRANSFORMABLE_FIELDS,
+    compile_expression, TransformError, TRANSFORMABLE_FIELDS,
+)
+from backend.transformations.executor import (
+    apply_transformations as _run_transformations, count_affected,
 )
 
 logger = logging.getLogger(__name__)
@@ -39,6 +43,16 @@ class TransformPayload(BaseModel):
     domain_id: Optional[str] = Field(default=None)
 
 
+class TransformStep(BaseModel):
+    field: str = Field(..., min_length=1, max_length=64)
+    expression: str = Field(..., min_length=1, max_length=500)
+
+
+class TransformBatchPayload(BaseModel):
+    steps: List[TransformStep] = Field(..., min_length=1, max_length=20)
+    domain_id: Optional[str] = Field(default=None)
+
+
 class TransformPreviewResponse(BaseModel):
     original: List[Optional[str]]
     transformed: List[Optional[str]]
@@ -46,6 +60,9 @@ class TransformPreviewResponse(BaseModel):
     sample_size: int
     expression: str
     field: str
+    total_candidates: int = 0
+    total_affected: int = 0
+    affected_estimated: bool = False
 
 
 @router.post("/transformations/preview", response_model=TransformPreviewResponse)
@@ -54,7 +71,11 @@ def preview_transformation(
     db: Session = Depends(get_db),
     _: models.User = Depends(get_current_user),
 ):
-    """Apply expression to a sample of 20 values — no DB writes."""
+    """
+    Apply expression to a sample of 20 values — no DB writes. total_affected
+    comes from a SQL COUNT (or a flagged sample-based estimate), so preview
+    latency does not grow with the number of rows transformed.
+    """
     if payload.field not in TRANSFORMABLE_FIELDS:
         raise HTTPException(
             status_code=422,
@@ -62,7 +83,7 @@ def preview_transformation(
                    f"Allowed: {sorted(TRANSFORMABLE_FIELDS)}",
         )
     try:
-        validate_expression(payload.expression)
+        compiled = compile_expression(payload.expression)
     except TransformError as e:
         raise HTTPException(status_code=422, detail=str(e))
 
@@ -77,12 +98,14 @@ def preview_transformation(
     for (val,) in rows:
         originals.append(val)
         try:
-            transformed_vals.append(apply_expression(payload.expression, val))
+            transformed_vals.append(compiled(val))
             errors.append(None)
         except TransformError as e:
             transformed_vals.append(None)
             errors.append(str(e))
 
+    counts = count_affected(db, compiled, payload.field, payload.domain_id)
+
     return TransformPreviewResponse(
         original=originals,
         transformed=transformed_vals,
@@ -90,97 +113,120 @@ def preview_transformation(
         sample_size=len(originals),
         expression=payload.expression,
         field=payload.field,
+        total_candidates=counts.candidates,
+        total_affected=counts.affected,
+        affected_estimated=counts.estimated,
     )
 
 
-@router.post("/transformations/apply")
-def apply_transformation(
-    payload: TransformPayload,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(require_role("super_admin", "admin", "editor")),
-):
-    """Apply expression to ALL matching entities and record in harmonization_logs."""
-    if payload.field not in TRANSFORMABLE_FIELDS:
-        raise HTTPException(
-            status_code=422,
-            detail=f"Field '{payload.field}' is not transformable. "
-                   f"Allowed: {sorted(TRANSFORMABLE_FIELDS)}",
-        )
-    try:
-        validate_expression(payload.expression)
-    except TransformError as e:
-        raise HTTPException(status_code=422, detail=str(e))
-
-    col = getattr(models.RawEntity, payload.field)
-    query = db.query(models.RawEntity).filter(col != None, col != "")
-    if payload.domain_id:
-        query = query.filter(models.RawEntity.domain == payload.domain_id)
+def _compile_steps(steps: List[TransformStep]) -> list:
+    compiled = []
+    for step in steps:
+        if step.field not in TRANSFORMABLE_FIELDS:
+            raise HTTPException(
+                status_code=422,
+                detail=f"Field '{step.field}' is not transformable. "
+                       f"Allowed: {sorted(TRANSFORMABLE_FIELDS)}",
+            )
+        try:
+            compiled.append((step.field, compile_expression(step.expression)))
+        except TransformError as e:
+            raise HTTPException(status_code=422, detail=str(e))
+    return compiled
 
-    entities = query.all()
 
-    # Build params dict for storing in fields_modified
-    params = {
-        "field": payload.field,
-        "expression": payload.expression,
-        "domain_id": payload.domain_id,
-    }
-
-    # Take snapshot for undo (stored in details)
-    snapshot = [
-        {"id": e.id, "value": getattr(e, payload.field)}
-        for e in entities
-    ]
+def _run_and_log(
+    db: Session,
+    steps: List[TransformStep],
+    domain_id: Optional[str],
+    params: dict,
+    user_id: int,
+):
+    """Apply compiled steps in one scan and record a single harmonization log."""
+    compiled = _compile_steps(steps)
 
-    affected = 0
-    errors = 0
-    for entity in entities:
-        original = getattr(entity, payload.field)
-        try:
-            new_val = apply_expression(payload.expression, original)
-            if new_val != original:
-                setattr(entity, payload.field, new_val)
-                affected += 1
-        except TransformError:
-            errors += 1
-
-    # Record in harmonization_logs for history/undo
-    # step_id encodes params as JSON for retrieval; fields_modified holds the field name;
-    # records_updated holds affected count; details holds the snapshot JSON.
-    step_id = _TRANSFORM_PREFIX + str(uuid.uuid4())
+    # Record in harmonization_logs for history/undo: step_id is unique per run,
+    # fields_modified holds the params JSON and the changed values go to
+    # harmonization_change_records (diff-only), so /harmonization/undo works.
     log = models.HarmonizationLog(
-        step_id=step_id,
+        step_id=_TRANSFORM_PREFIX + str(uuid.uuid4()),
         step_name="transformation",
-        records_updated=affected,
+        records_updated=0,
         fields_modified=json.dumps(params),
         executed_at=datetime.now(timezone.utc),
-        details=json.dumps(snapshot),
         reverted=False,
     )
     db.add(log)
+    db.flush()
+
+    result = _run_transformations(db, compiled, log.id, domain_id)
+    log.records_updated = result.affected
+    log.details = json.dumps({"sample": change_sample(db, log.id)})
 
     _audit(
         db, "transformation.apply",
-        user_id=current_user.id,
-        details={
-            "field": payload.field,
-            "expression": payload.expression,
-            "domain_id": payload.domain_id,
-            "affected": affected,
-            "errors": errors,
-        },
+        user_id=user_id,
+        details={**params, "affected": result.affected, "errors": 0},
     )
     db.commit()
+    _invalidate_entity_caches(domain_id)
+    return result, log
+
+
+@router.post("/transformations/apply")
+def apply_transformation(
+    payload: TransformPayload,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(require_role("super_admin", "admin", "editor")),
+):
+    """Apply expression to ALL matching entities and record in harmonization_logs."""
+    params = {
+        "field": payload.field,
+        "expression": payload.expression,
+        "domain_id": payload.domain_id,
+    }
+    step = TransformStep(field=payload.field, expression=payload.expression)
+    result, log = _run_and_log(db, [step], payload.domain_id, params, current_user.id)
 
     return {
-        "affected": affected,
-        "errors": errors,
-        "total_scanned": len(entities),
+        "affected": result.affected,
+        "errors": 0,
+        "total_scanned": result.scanned,
         "field": payload.field,
         "expression": payload.expression,
         "log_id": log.id,
     }
 
 
+@router.post("/transformations/apply-batch")
+def apply_transformation_batch(
+    payload: TransformBatchPayload,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(require_role("super_admin", "admin", "editor")),
+):
+    """
+    Apply several (field, expression) steps in a single scan, recorded as one
+    harmonization log entry. Steps on the same field are chained in order.
+    """
+    fields = list(dict.fromkeys(s.field for s in payload.steps))
+    params = {
+        "field": ", ".join(fields),
+        "expression": "; ".join(f"{s.field}: {s.expression}" for s in payload.steps),
+        "domain_id": payload.domain_id,
+        "steps": [s.model_dump() for s in payload.steps],
+    }
+    result, log = _run_and_log(db, payload.steps, payload.domain_id, params, current_user.id)
+
+    return {
+        "affected": result.affected,
+        "errors": 0,
+        "total_scanned": result.scanned,
+        "per_field": result.per_field,
+        "steps": len(payload.steps),
+        "log_id": log.id,
+    }
+
+
 @router.get("/transformations/history")
 def get_transformation_history(
     skip: int = Query(default=0, ge=0),
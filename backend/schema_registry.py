@@ -1,12 +1,66 @@
-import os
+"""
+Domain schema registry.
+
+Sprint 113: one process-wide registry (`registry`) shared by every module.
+  - hot reload: backend/domains/ is re-scanned at most every
+    SCHEMA_RELOAD_INTERVAL seconds; only YAML files whose mtime / size
+    changed are re-read and re-validated, so unchanged domains keep their
+    DomainSchema object (and everything cached against it). A file that
+    fails to parse keeps the previously loaded schema.
+  - `generation` moves whenever a domain is added, changed or removed.
+  - copy-on-write: `domains` is never mutated in place; a reload, save or
+    delete builds a new mapping and swaps the reference in one assignment,
+    so lock-free readers never see a dict change size mid-iteration.
+  - attribute plans: DomainSchema.plan precomputes, once per schema object,
+    the attribute partitions that OLAP, correlation and gap analysis used
+    to re-derive on every request (core vs JSON attributes, safe SQL
+    identifiers, dimension / correlation skip sets).
+
+Public API
+----------
+registry.get_domain(domain_id)  → DomainSchema | None
+registry.get_all_domains()      → list[DomainSchema]
+registry.generation             → int
+DomainSchema.plan               → AttributePlan
+"""
 import logging
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
 import yaml
-from typing import List, Dict, Optional
-from pydantic import BaseModel
+from pydantic import BaseModel, PrivateAttr
 
 logger = logging.getLogger(__name__)
 
 DOMAINS_DIR = os.path.join(os.path.dirname(__file__), "domains")
+SCHEMA_RELOAD_INTERVAL = float(os.environ.get("SCHEMA_RELOAD_INTERVAL", "2"))
+
+# Attribute names usable as quoted SQL identifiers
+SAFE_IDENTIFIER_RE = re.compile(r'^[a-zA-Z_][a-zA-Z0-9_]*$')
+
+# Identifier-like / free-text attributes that make poor OLAP dimensions
+DIMENSION_SKIP_FIELDS = frozenset({"primary_label", "title", "canonical_id", "doi", "nct_id"})
+
+# Fields that carry too many unique values or are free text — never correlated
+CORRELATION_SKIP_FIELDS = frozenset({
+    "entity_name", "title", "sku", "gtin", "doi", "nct_id",
+    "enrichment_concepts", "normalized_json", "enrichment_doi",
+    "id", "enrichment_citation_count", "enrichment_status", "enrichment_source",
+    "validation_status", "creation_date", "barcode", "branches",
+    "gtin_reason", "gtin_empty_reason_1", "gtin_empty_reason_2",
+    "gtin_empty_reason_3", "gtin_entity_reason", "gtin_reason_lower",
+    "gtin_empty_reason_typo", "equipment", "measure", "union_type",
+    "entity_code_universal_1", "entity_code_universal_2",
+    "entity_code_universal_3", "entity_code_universal_4",
+    "brand_lower", "model", "unit_of_measure", "entity_key",
+    "variant_status", "variant", "taxes",
+    "allow_sales_without_stock", "control_stock", "is_decimal_sellable",
+})
+
 
 class AttributeSchema(BaseModel):
     name: str             # db field name or arbitrary json key
@@ -15,6 +69,36 @@ class AttributeSchema(BaseModel):
     required: bool = False
     is_core: bool = False # whether it matches standard RawEntity columns or goes into normalized_json
 
+
+@dataclass(frozen=True)
+class AttributePlan:
+    by_name: Dict[str, AttributeSchema]
+    core: tuple          # is_core attributes (RawEntity columns)
+    json: tuple          # non-core attributes with safe names (normalized_json keys)
+    safe: tuple          # attributes whose name is a safe SQL identifier
+    dimensions: tuple    # safe attributes outside DIMENSION_SKIP_FIELDS
+    correlation_fields: tuple   # safe attribute names outside CORRELATION_SKIP_FIELDS
+    core_strings: tuple  # core attributes of type string
+
+    @classmethod
+    def build(cls, domain_id: str, attributes: List[AttributeSchema]) -> "AttributePlan":
+        safe = []
+        for a in attributes:
+            if SAFE_IDENTIFIER_RE.match(a.name):
+                safe.append(a)
+            else:
+                logger.warning("Domain '%s': attribute '%s' is not a safe identifier", domain_id, a.name)
+        return cls(
+            by_name={a.name: a for a in attributes},
+            core=tuple(a for a in attributes if a.is_core),
+            json=tuple(a for a in safe if not a.is_core),
+            safe=tuple(safe),
+            dimensions=tuple(a for a in safe if a.name not in DIMENSION_SKIP_FIELDS),
+            correlation_fields=tuple(a.name for a in safe if a.name not in CORRELATION_SKIP_FIELDS),
+            core_strings=tuple(a for a in attributes if a.is_core and a.type == "string"),
+        )
+
+
 class DomainSchema(BaseModel):
     id: str
     name: str
@@ -23,52 +107,132 @@ class DomainSchema(BaseModel):
     icon: Optional[str] = "Database"
     attributes: List[AttributeSchema]
 
+    _plan: Optional[AttributePlan] = PrivateAttr(default=None)
+
+    @property
+    def plan(self) -> AttributePlan:
+        """Attribute partitions, computed once per schema object."""
+        if self._plan is None:
+            self._plan = AttributePlan.build(self.id, self.attributes)
+        return self._plan
+
+
 class SchemaRegistry:
-    def __init__(self):
+    def __init__(self, domains_dir: Optional[str] = None):
         self.domains: Dict[str, DomainSchema] = {}
+        self.generation = 0
+        self._dir = domains_dir or DOMAINS_DIR
+        self._files: Dict[str, tuple] = {}   # filename → (mtime_ns, size, domain id)
+        self._lock = threading.RLock()
+        self._checked_at = 0.0
         self._load_registry()
 
     def _load_registry(self):
-        self.domains.clear()
-        if not os.path.exists(DOMAINS_DIR):
-            os.makedirs(DOMAINS_DIR, exist_ok=True)
-            
-        for filename in os.listdir(DOMAINS_DIR):
-            if filename.endswith(".yaml") or filename.endswith(".yml"):
-                filepath = os.path.join(DOMAINS_DIR, filename)
-                try:
-                    with open(filepath, "r", encoding="utf-8") as f:
-                        data = yaml.safe_load(f)
-                        if data:
-                            schema = DomainSchema(**data)
-                            self.domains[schema.id] = schema
-                except Exception as e:
-                    logger.error("Error loading domain schema %s: %s", filename, e)
+        with self._lock:
+            self.domains = {}
+            self._files.clear()
+            self._scan()
+
+    # ── Hot reload ────────────────────────────────────────────────────────
+
+    def _refresh(self) -> None:
+        """Re-scan the domains directory if the reload interval has elapsed."""
+        now = time.monotonic()
+        if now - self._checked_at < SCHEMA_RELOAD_INTERVAL:
+            return
+        with self._lock:
+            self._scan()
+
+    def _scan(self) -> None:
+        self._checked_at = time.monotonic()
+        if not os.path.exists(self._dir):
+            os.makedirs(self._dir, exist_ok=True)
+
+        seen: Dict[str, tuple] = {}
+        with os.scandir(self._dir) as it:
+            for entry in it:
+                if entry.name.endswith((".yaml", ".yml")) and entry.is_file():
+                    try:
+                        st = entry.stat()
+                    except FileNotFoundError:   # removed while scanning
+                        continue
+                    seen[entry.name] = (st.st_mtime_ns, st.st_size)
+
+        domains = dict(self.domains)
+        changed = False
+        for filename in set(self._files) - set(seen):
+            domain_id = self._files.pop(filename)[2]
+            if domain_id is not None:
+                domains.pop(domain_id, None)
+                changed = True
+        for filename, stat in sorted(seen.items()):
+            known = self._files.get(filename)
+            if known is not None and known[:2] == stat:
+                continue
+            schema = self._read(filename)
+            old_id = known[2] if known else None
+            if schema is None:
+                # Keep whatever was loaded before; retried when the file changes again
+                self._files[filename] = (*stat, old_id)
+                continue
+            if old_id is not None and old_id != schema.id:
+                domains.pop(old_id, None)
+            domains[schema.id] = schema
+            self._files[filename] = (*stat, schema.id)
+            changed = True
+        if changed:
+            self.domains = domains
+            self.generation += 1
+
+    def _read(self, filename: str) -> Optional[DomainSchema]:
+        filepath = os.path.join(self._dir, filename)
+        try:
+            with open(filepath, "r", encoding="utf-8") as f:
+                data = yaml.safe_load(f)
+            return DomainSchema(**data) if data else None
+        except Exception as e:
+            logger.error("Error loading domain schema %s: %s", filename, e)
+            return None
+
+    def _record(self, filename: str, domain_id: Optional[str]) -> None:
+        st = os.stat(os.path.join(self._dir, filename))
+        self._files[filename] = (st.st_mtime_ns, st.st_size, domain_id)
+
+    # ── Lookup ────────────────────────────────────────────────────────────
 
     def get_all_domains(self) -> List[DomainSchema]:
+        self._refresh()
         # Return default first if available
-        domains_list = list(self.domains.values())
+        domains_list = list(self.domains.values())   # a snapshot: never mutated in place
         return sorted(domains_list, key=lambda d: 0 if d.id == "default" else 1)
 
     def get_domain(self, domain_id: str) -> Optional[DomainSchema]:
+        self._refresh()
         return self.domains.get(domain_id)
 
     def save_domain(self, schema: DomainSchema) -> None:
         """Write schema to YAML and register it in memory."""
-        filepath = os.path.join(DOMAINS_DIR, f"{schema.id}.yaml")
-        with open(filepath, "w", encoding="utf-8") as f:
-            yaml.dump(schema.model_dump(), f, allow_unicode=True,
-                      default_flow_style=False, sort_keys=False)
-        self.domains[schema.id] = schema
+        filename = f"{schema.id}.yaml"
+        with self._lock:
+            with open(os.path.join(self._dir, filename), "w", encoding="utf-8") as f:
+                yaml.dump(schema.model_dump(), f, allow_unicode=True,
+                          default_flow_style=False, sort_keys=False)
+            self._record(filename, schema.id)
+            self.domains = {**self.domains, schema.id: schema}
+            self.generation += 1
 
     def delete_domain(self, domain_id: str) -> bool:
         """Delete the YAML file and unregister. Returns False if not found."""
-        filepath = os.path.join(DOMAINS_DIR, f"{domain_id}.yaml")
-        if not os.path.exists(filepath):
-            return False
-        os.remove(filepath)
-        self.domains.pop(domain_id, None)
-        return True
+        filename = f"{domain_id}.yaml"
+        filepath = os.path.join(self._dir, filename)
+        with self._lock:
+            if not os.path.exists(filepath):
+                return False
+            os.remove(filepath)
+            self._files.pop(filename, None)
+            self.domains = {k: v for k, v in self.domains.items() if k != domain_id}
+            self.generation += 1
+            return True
 
     def is_builtin(self, domain_id: str) -> bool:
         return domain_id in _BUILTIN_DOMAIN_IDS
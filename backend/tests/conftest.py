@@ -3,6 +3,7 @@ Shared pytest fixtures for UKIP backend tests.
 Uses an isolated in-memory SQLite database so tests never touch sql_app.db.
 """
 import os
+import tempfile
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
@@ -19,6 +20,12 @@ TEST_DATABASE_URL = "sqlite:///:memory:"
 os.environ.setdefault("JWT_SECRET_KEY", "test-secret-key-not-for-production")
 os.environ.setdefault("ADMIN_USERNAME", "testadmin")
 os.environ.setdefault("ADMIN_PASSWORD", "testpassword")
+os.environ.setdefault("OLAP_STORE_PATH", ":memory:")
+# backend.main runs `alembic upgrade head` on import and its lifespan bootstraps
+# through database.SessionLocal: keep both off the default ./sql_app.db.
+os.environ.setdefault(
+    "DATABASE_URL", "sqlite:///" + os.path.join(tempfile.gettempdir(), "ukip_pytest.db")
+)
 
 
 from sqlalchemy import text  # noqa: E402
@@ -68,6 +75,15 @@ app.dependency_overrides[get_db] = override_get_db
 import backend.audit as _audit_module  # noqa: E402
 _audit_module.SessionLocal = TestingSessionLocal
 
+# Point the OLAP replica at the same in-memory DB. Write-path refreshes run
+# inline: a background thread would share the single StaticPool connection.
+from backend.olap_store import olap_store as _olap_store  # noqa: E402
+_olap_store._source = test_engine
+_olap_store.schedule_refresh = _olap_store.refresh
+from backend.analyzers.concept_index import concept_index as _concept_index  # noqa: E402
+_concept_index._source = test_engine
+_concept_index.schedule_sync = _concept_index.sync
+
 # Seed the super_admin in the in-memory test DB so the login fixture works.
 # (The lifespan bootstrap uses database.SessionLocal which hits the real DB;
 #  this seeds the in-memory DB that test requests use via override_get_db.)
@@ -174,6 +190,9 @@ _TABLES_TO_CLEAN = [
     "webhooks",
     "scheduled_imports",
     "entity_relationships",
+    "linkage_models",
+    "entity_concepts",
+    "concepts",
     # Note: "users" is intentionally excluded — the super_admin/editor/viewer
     # test accounts must persist across the entire test session.
 ]
@@ -78,9 +78,9 @@ def test_valid_column_query_succeeds():
 
 # ── Integration: generate_cube_metrics skips unknown/unsafe columns ──────────
 
-def test_generate_cube_metrics_skips_columns_not_in_df(monkeypatch):
+def test_generate_cube_metrics_skips_columns_not_in_df(monkeypatch, session_factory):
     """
-    Columns in the domain schema that don't exist in the DataFrame should be
+    Columns in the domain schema that don't exist in the OLAP replica should be
     silently skipped — no KeyError, no SQL injection.
     """
     from backend.schema_registry import DomainSchema, AttributeSchema
@@ -91,7 +91,7 @@ def test_generate_cube_metrics_skips_columns_not_in_df(monkeypatch):
         description="test",
         primary_entity="Entity",
         attributes=[
-            AttributeSchema(name="status", type="string", label="Status", is_core=True),
+            AttributeSchema(name="validation_status", type="string", label="Status", is_core=True),
             AttributeSchema(name="nonexistent_col", type="string", label="Ghost", is_core=True),
             AttributeSchema(
                 name="evil'; DROP TABLE df--",
@@ -103,24 +103,30 @@ def test_generate_cube_metrics_skips_columns_not_in_df(monkeypatch):
     )
 
     import backend.olap as olap_mod
-    import pandas as pd
-    from sqlalchemy import text
+    from sqlalchemy import create_engine
+    from sqlalchemy.pool import StaticPool
+    from backend import models
+    from backend.olap_store import OLAPStore
+
+    # Controlled source table behind a private replica
+    source = create_engine("sqlite://", poolclass=StaticPool,
+                           connect_args={"check_same_thread": False})
+    models.Base.metadata.create_all(bind=source, tables=[models.RawEntity.__table__])
+    with source.begin() as conn:
+        conn.execute(models.RawEntity.__table__.insert(), [
+            {"primary_label": "a", "validation_status": "active"},
+            {"primary_label": "b", "validation_status": "inactive"},
+            {"primary_label": "c", "validation_status": "active"},
+        ])
 
-    # Patch registry to return our fake domain
     monkeypatch.setattr(olap_mod.registry, "get_domain", lambda _: fake_domain)
-
-    # Patch pd.read_sql_table to return a controlled DataFrame
-    controlled_df = pd.DataFrame({
-        "status": ["active", "inactive", "active"],
-        "normalized_json": [None, None, None],
-    })
-    monkeypatch.setattr(pd, "read_sql_table", lambda *a, **kw: controlled_df)
+    monkeypatch.setattr(olap_mod, "olap_store", OLAPStore(":memory:", source_engine=source))
 
     # Should not raise
     metrics = olap_mod.DuckDBOLAPEngine.generate_cube_metrics("test")
 
     assert metrics["total_records"] == 3
-    # "status" is valid and should appear
+    # "validation_status" is valid and should appear
     assert "Status" in metrics["distributions"]
     # "nonexistent_col" and "evil" must NOT appear
     assert "Ghost" not in metrics["distributions"]
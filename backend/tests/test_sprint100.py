@@ -0,0 +1,136 @@
+"""
+Sprint 100 — Persistent columnar OLAP store.
+
+  - full load projects domain attributes into typed columns
+  - incremental sync picks up inserts (id watermark), updates (updated_at) and deletes
+  - unchanged source → sync is a no-op
+  - rows committed out of id order are reconciled from the source id list
+  - the DuckDB file is opened on first use; a file locked by another process
+    falls back to an in-memory replica
+"""
+from __future__ import annotations
+
+import json
+import subprocess
+import sys
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine, delete, update
+from sqlalchemy.pool import StaticPool
+
+from backend import models
+from backend.olap_store import OLAPStore, projected_attributes
+
+_t = models.RawEntity.__table__
+
+
+@pytest.fixture()
+def source():
+    eng = create_engine("sqlite://", poolclass=StaticPool,
+                        connect_args={"check_same_thread": False})
+    models.Base.metadata.create_all(bind=eng, tables=[_t])
+    return eng
+
+
+def _insert(eng, rows):
+    with eng.begin() as conn:
+        conn.execute(_t.insert(), rows)
+
+
+def test_projected_attribute_types():
+    spec = projected_attributes()
+    assert spec["keywords"] == "VARCHAR"
+    assert "primary_label" not in spec
+    assert "year" not in spec    # is_core in the science schema
+
+
+def test_full_load_projects_typed_attributes(source):
+    _insert(source, [
+        {"primary_label": "P1", "domain": "science",
+         "normalized_json": json.dumps({"keywords": ["ml", "nlp"], "language": "en"})},
+        {"primary_label": "P2", "domain": "science", "normalized_json": "not json"},
+    ])
+    store = OLAPStore(":memory:", source_engine=source)
+    assert store.sync() == 2
+    with store.cursor() as cur:
+        rows = cur.execute(
+            "SELECT primary_label, keywords, language FROM entities ORDER BY id"
+        ).fetchall()
+    assert rows == [("P1", '["ml","nlp"]', "en"), ("P2", None, None)]
+
+
+def test_incremental_sync(source):
+    _insert(source, [{"primary_label": f"e{i}", "entity_type": "paper"} for i in range(5)])
+    store = OLAPStore(":memory:", source_engine=source)
+    store.sync()
+    v = store.version
+    assert store.sync() == 0 and store.version == v
+
+    _insert(source, [{"primary_label": "new"}])
+    assert store.sync() >= 1
+    with store.cursor() as cur:
+        assert cur.execute("SELECT COUNT(*) FROM entities").fetchone()[0] == 6
+
+    with source.begin() as conn:
+        conn.execute(update(_t).where(_t.c.primary_label == "e2").values(entity_type="book"))
+        conn.execute(delete(_t).where(_t.c.primary_label == "e4"))
+    store.sync()
+    with store.cursor() as cur:
+        assert cur.execute("SELECT COUNT(*) FROM entities").fetchone()[0] == 5
+        assert cur.execute(
+            "SELECT entity_type FROM entities WHERE primary_label = 'e2'"
+        ).fetchone()[0] == "book"
+    assert store.version > v
+
+
+def test_rows_committed_out_of_id_order(source):
+    new, old = datetime(2030, 1, 2), datetime(2030, 1, 1)
+    _insert(source, [{"id": i, "primary_label": f"e{i}", "updated_at": new} for i in (1, 3, 5)])
+    store = OLAPStore(":memory:", source_engine=source)
+    store.sync()
+    # id 2 commits after id 5, with an older updated_at: outside both watermarks
+    _insert(source, [{"id": 2, "primary_label": "late", "updated_at": old}])
+    store.sync()
+    with store.cursor() as cur:
+        assert cur.execute("SELECT primary_label FROM entities WHERE id = 2").fetchone() == ("late",)
+    # Same row count, different ids: a delete and a late commit in one sync
+    with source.begin() as conn:
+        conn.execute(delete(_t).where(_t.c.id == 3))
+    _insert(source, [{"id": 4, "primary_label": "later", "updated_at": old}])
+    store.sync()
+    with store.cursor() as cur:
+        ids = [i for (i,) in cur.execute("SELECT id FROM entities ORDER BY id").fetchall()]
+    assert ids == [1, 2, 4, 5]
+
+
+def test_connection_is_lazy_and_survives_a_held_lock(source, tmp_path):
+    path = str(tmp_path / "data" / "olap.duckdb")
+    store = OLAPStore(path, source_engine=source)
+    assert not (tmp_path / "data").exists()
+    store.sync()
+    store.close()
+    assert (tmp_path / "data" / "olap.duckdb").exists()
+
+    holder = subprocess.Popen(
+        [sys.executable, "-c",
+         "import duckdb, sys, time; c = duckdb.connect(sys.argv[1]); "
+         "print('locked', flush=True); time.sleep(60)", path],
+        stdout=subprocess.PIPE, text=True,
+    )
+    try:
+        assert holder.stdout.readline().strip() == "locked"
+        _insert(source, [{"primary_label": "x"}])
+        second = OLAPStore(path, source_engine=source)
+        assert second.sync() == 1
+        with second.cursor() as cur:
+            assert cur.execute("SELECT COUNT(*) FROM entities").fetchone()[0] == 1
+    finally:
+        holder.kill()
+        holder.wait()
+
+
+def test_cube_endpoints_read_replica(client, auth_headers):
+    r = client.get("/cube/dimensions/default", headers=auth_headers)
+    assert r.status_code == 200
+    assert all(isinstance(d["distinct_count"], int) for d in r.json())
@@ -0,0 +1,110 @@
+"""
+Sprint 101 — Cube query pushdown.
+
+  - query_cube runs as one DuckDB aggregate on the replica (no DataFrame of rows)
+  - results are restricted to the requested domain
+  - filters on replica columns are pushed into WHERE; unknown / unsafe ones ignored
+"""
+from __future__ import annotations
+
+import json
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.pool import StaticPool
+
+import backend.olap as olap_mod
+from backend import models
+from backend.olap_store import OLAPStore
+
+_t = models.RawEntity.__table__
+
+
+def _trial(phase, category, domain="healthcare"):
+    return {
+        "primary_label": f"{phase}-{category}",
+        "domain": domain,
+        "normalized_json": json.dumps({"phase": phase, "category": category}),
+    }
+
+
+@pytest.fixture()
+def store(monkeypatch):
+    source = create_engine("sqlite://", poolclass=StaticPool,
+                           connect_args={"check_same_thread": False})
+    models.Base.metadata.create_all(bind=source, tables=[_t])
+    with source.begin() as conn:
+        conn.execute(_t.insert(), [
+            _trial("I", "oncology"),
+            _trial("I", "oncology"),
+            _trial("II", "oncology"),
+            _trial("II", "cardiology"),
+            _trial("III", "cardiology"),
+            # Same attribute values in another domain must not be counted
+            _trial("I", "oncology", domain="default"),
+            _trial("I", "oncology", domain="default"),
+        ])
+    s = OLAPStore(":memory:", source_engine=source)
+    monkeypatch.setattr(olap_mod, "olap_store", s)
+    return s
+
+
+def test_group_by_is_restricted_to_domain(store):
+    res = olap_mod.olap_engine.query_cube("healthcare", ["phase"])
+    assert res["total"] == 5
+    assert res["rows"][0] == {"values": {"phase": "I"}, "count": 2, "pct": 40.0}
+    assert {r["values"]["phase"]: r["count"] for r in res["rows"]} == {"I": 2, "II": 2, "III": 1}
+
+
+def test_filters_are_pushed_down(store):
+    res = olap_mod.olap_engine.query_cube(
+        "healthcare", ["phase"], filters={"category": "oncology"}
+    )
+    assert res["total"] == 3
+    assert {r["values"]["phase"]: r["count"] for r in res["rows"]} == {"I": 2, "II": 1}
+
+
+def test_two_dimensions(store):
+    res = olap_mod.olap_engine.query_cube("healthcare", ["phase", "category"])
+    pairs = {(r["values"]["phase"], r["values"]["category"]): r["count"] for r in res["rows"]}
+    assert pairs == {("I", "oncology"): 2, ("II", "oncology"): 1,
+                     ("II", "cardiology"): 1, ("III", "cardiology"): 1}
+
+
+def test_unknown_and_unsafe_filters_are_ignored(store):
+    res = olap_mod.olap_engine.query_cube(
+        "healthcare", ["phase"],
+        filters={"no_such_column": "x", "phase'; DROP TABLE entities--": "I"},
+    )
+    assert res["total"] == 5
+
+
+def test_filter_without_match_returns_empty(store):
+    res = olap_mod.olap_engine.query_cube("healthcare", ["phase"], filters={"phase": "IV"})
+    assert res["total"] == 0 and res["rows"] == []
+
+
+def test_no_full_table_materialization(store, monkeypatch):
+    """Only aggregates are computed; entity rows are never fetched."""
+    fetched = []
+    real_cursor = store.cursor
+
+    class _Spy:
+        def __init__(self, cur):
+            self._cur = cur
+
+        def execute(self, sql, *args):
+            fetched.append(sql)
+            return self._cur.execute(sql, *args)
+
+    from contextlib import contextmanager
+
+    @contextmanager
+    def spy_cursor():
+        with real_cursor() as cur:
+            yield _Spy(cur)
+
+    monkeypatch.setattr(store, "cursor", spy_cursor)
+    olap_mod.olap_engine.query_cube("healthcare", ["phase"], filters={"category": "oncology"})
+    assert fetched
+    assert all("SELECT *" not in sql for sql in fetched)
@@ -0,0 +1,71 @@
+"""
+Sprint 102 — Vectorized JSON attribute projection.
+
+  - attributes are projected inside DuckDB (json_extract_string), typed per spec
+  - malformed / missing / non-object JSON projects to NULL
+  - no per-row Python JSON parsing during sync
+"""
+from __future__ import annotations
+
+import json
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.pool import StaticPool
+
+import backend.olap_store as store_mod
+from backend import models
+from backend.olap_store import OLAPStore, _projection_sql
+
+_t = models.RawEntity.__table__
+
+_SPEC = {"n_int": "BIGINT", "n_float": "DOUBLE", "tag": "VARCHAR"}
+
+
+@pytest.fixture()
+def source(monkeypatch):
+    monkeypatch.setattr(store_mod, "projected_attributes", lambda: dict(_SPEC))
+    eng = create_engine("sqlite://", poolclass=StaticPool,
+                        connect_args={"check_same_thread": False})
+    models.Base.metadata.create_all(bind=eng, tables=[_t])
+    return eng
+
+
+def _load(eng, docs):
+    with eng.begin() as conn:
+        conn.execute(_t.insert(), [
+            {"primary_label": f"e{i}", "normalized_json": d} for i, d in enumerate(docs)
+        ])
+    store = OLAPStore(":memory:", source_engine=eng)
+    with store.cursor() as cur:
+        return cur.execute("SELECT n_int, n_float, tag FROM entities ORDER BY id").fetchall()
+
+
+def test_projection_sql_is_typed():
+    sql = _projection_sql(_SPEC)
+    assert "json_extract_string" in sql
+    assert 'AS BIGINT) AS "n_int"' in sql
+    assert 'AS DOUBLE) AS "n_float"' in sql
+    assert _projection_sql({}) == ""
+
+
+def test_typed_values(source):
+    rows = _load(source, [
+        json.dumps({"n_int": "2.6", "n_float": 1.5, "tag": "x"}),
+        json.dumps({"n_int": 7, "n_float": "abc", "tag": {"k": [1, 2]}}),
+    ])
+    assert rows == [(3, 1.5, "x"), (7, None, '{"k":[1,2]}')]
+
+
+def test_bad_json_projects_null(source):
+    rows = _load(source, ["not json", None, "", "[1, 2]", json.dumps({"other": 1})])
+    assert rows == [(None, None, None)] * 5
+
+
+def test_sync_does_not_parse_json_in_python(source, monkeypatch):
+    def boom(*a, **k):
+        raise AssertionError("json.loads called during sync")
+
+    monkeypatch.setattr(json, "loads", boom)
+    rows = _load(source, ['{"n_int": 1, "n_float": 2.0, "tag": "t"}'])
+    assert rows == [(1, 2.0, "t")]
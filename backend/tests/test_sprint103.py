@@ -0,0 +1,128 @@
+"""
+Sprint 103 — Pre-aggregated cube materializations.
+
+  - 1-D / 2-D group-bys (with filters on dimensions) are answered from the cube
+  - answers match the live aggregate
+  - queries the cube cannot cover fall back to the live path
+  - replica changes and explicit invalidation rebuild the cube
+"""
+from __future__ import annotations
+
+import json
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.pool import StaticPool
+
+import backend.olap as olap_mod
+from backend import models
+from backend.olap_store import OLAPStore
+from backend.schema_registry import registry
+
+_t = models.RawEntity.__table__
+
+
+def _trial(phase, category, entity_type="trial", domain="healthcare"):
+    return {
+        "primary_label": f"{phase}-{category}",
+        "domain": domain,
+        "entity_type": entity_type,
+        "normalized_json": json.dumps({"phase": phase, "category": category}),
+    }
+
+
+@pytest.fixture()
+def source():
+    eng = create_engine("sqlite://", poolclass=StaticPool,
+                        connect_args={"check_same_thread": False})
+    models.Base.metadata.create_all(bind=eng, tables=[_t])
+    with eng.begin() as conn:
+        conn.execute(_t.insert(), [
+            _trial("I", "oncology"),
+            _trial("I", "oncology", entity_type="study"),
+            _trial("II", "oncology"),
+            _trial("II", "cardiology"),
+            _trial("III", "cardiology", entity_type="study"),
+            _trial(None, "cardiology"),
+            _trial("I", "oncology", domain="default"),
+        ])
+    return eng
+
+
+@pytest.fixture()
+def store(monkeypatch, source):
+    s = OLAPStore(":memory:", source_engine=source)
+    monkeypatch.setattr(olap_mod, "olap_store", s)
+    return s
+
+
+def _live(store, group_by, filters=None):
+    with store.cursor() as con:
+        return olap_mod.DuckDBOLAPEngine._query_live(con, "healthcare", group_by, filters or {})
+
+
+def _as_map(rows):
+    return {tuple(r["values"].values()): r["count"] for r in rows}
+
+
+@pytest.mark.parametrize("group_by,filters", [
+    (["phase"], {}),
+    (["category"], {}),
+    (["phase", "category"], {}),
+    (["phase"], {"category": "oncology"}),
+    (["category"], {"category": "cardiology"}),
+])
+def test_cube_answers_match_live(store, group_by, filters):
+    domain = registry.get_domain("healthcare")
+    with store.cursor() as con:
+        cube_rows = store.cubes.lookup(con, store.version, domain, store.columns, group_by, filters)
+    assert cube_rows is not None
+    assert _as_map(cube_rows) == _as_map(_live(store, group_by, filters))
+
+
+def test_null_values_are_not_rollup_rows(store):
+    res = olap_mod.olap_engine.query_cube("healthcare", ["phase"])
+    assert _as_map(res["rows"]) == {("I",): 2, ("II",): 2, ("III",): 1, (None,): 1}
+    assert res["total"] == 6
+
+
+def test_uncovered_queries_fall_back_to_live(store):
+    """entity_type is a replica column but not a healthcare dimension."""
+    domain = registry.get_domain("healthcare")
+    with store.cursor() as con:
+        assert store.cubes.lookup(
+            con, store.version, domain, store.columns,
+            ["phase", "category"], {"entity_type": "study"},
+        ) is None
+    res = olap_mod.olap_engine.query_cube(
+        "healthcare", ["phase", "category"], filters={"entity_type": "study"}
+    )
+    assert _as_map(res["rows"]) == {("I", "oncology"): 1, ("III", "cardiology"): 1}
+
+
+def test_replica_change_rebuilds_cube(store, source):
+    assert olap_mod.olap_engine.query_cube("healthcare", ["phase"])["total"] == 6
+    with source.begin() as conn:
+        conn.execute(_t.insert(), [_trial("IV", "oncology")])
+    res = olap_mod.olap_engine.query_cube("healthcare", ["phase"])
+    assert res["total"] == 7 and _as_map(res["rows"])[("IV",)] == 1
+
+
+def test_invalidate(store):
+    olap_mod.olap_engine.query_cube("healthcare", ["phase"])
+    olap_mod.olap_engine.query_cube("default", ["entity_type"])
+    assert store.cubes.invalidate("healthcare") == 1
+    assert store.cubes.invalidate("healthcare") == 0
+    assert store.cubes.invalidate() == 1
+
+
+def test_writers_invalidate_cubes(client, editor_headers, monkeypatch):
+    from backend.routers import deps
+
+    calls = []
+    monkeypatch.setattr(deps.olap_store.cubes, "invalidate", lambda d=None: calls.append(d))
+    r = client.post("/harmonization/apply/normalize_labels", headers=editor_headers)
+    assert r.status_code == 200
+    r = client.post("/rules/apply", headers=editor_headers)
+    assert r.status_code == 200
+    assert calls == [None, None]
@@ -0,0 +1,137 @@
+"""
+Sprint 104 — N-dimensional cube drill-down.
+
+  - N group-by dimensions with sum/avg measures in one statement
+  - ROLLUP subtotals flagged by `level`
+  - per-group top-k, pruning subtrees of dropped subtotals
+  - columnar payload and POST /cube/drilldown validation
+"""
+from __future__ import annotations
+
+import json
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.pool import StaticPool
+
+import backend.olap as olap_mod
+from backend import models
+from backend.olap_store import OLAPStore
+
+_t = models.RawEntity.__table__
+
+_ROWS = [
+    # phase, category, citations, quality
+    ("I",   "oncology",   10, 0.5),
+    ("I",   "oncology",    5, 0.7),
+    ("I",   "cardiology",  1, 0.1),
+    ("II",  "oncology",    3, None),
+    ("II",  "cardiology",  2, 0.9),
+    ("III", "cardiology",  0, 0.2),
+    ("III", "neurology",   0, 0.2),
+    ("III", "dermatology", 0, 0.2),
+]
+
+
+@pytest.fixture()
+def store(monkeypatch):
+    source = create_engine("sqlite://", poolclass=StaticPool,
+                           connect_args={"check_same_thread": False})
+    models.Base.metadata.create_all(bind=source, tables=[_t])
+    with source.begin() as conn:
+        conn.execute(_t.insert(), [
+            {
+                "primary_label": f"t{i}",
+                "domain": "healthcare",
+                "enrichment_citation_count": cites,
+                "quality_score": quality,
+                "normalized_json": json.dumps({"phase": phase, "category": cat}),
+            }
+            for i, (phase, cat, cites, quality) in enumerate(_ROWS)
+        ])
+    s = OLAPStore(":memory:", source_engine=source)
+    monkeypatch.setattr(olap_mod, "olap_store", s)
+    return s
+
+
+def _records(payload):
+    cols = payload["columns"]
+    return [dict(zip(cols, vals)) for vals in zip(*(payload["data"][c] for c in cols))]
+
+
+def test_measures_per_group(store):
+    res = olap_mod.olap_engine.drilldown(
+        "healthcare", ["phase"], measures=["citations_sum", "citations_avg", "quality_avg"]
+    )
+    assert res["columns"] == ["phase", "level", "count", "citations_sum", "citations_avg", "quality_avg"]
+    by_phase = {r["phase"]: r for r in _records(res)}
+    assert by_phase["I"]["count"] == 3
+    assert by_phase["I"]["citations_sum"] == 16
+    assert by_phase["I"]["citations_avg"] == pytest.approx(5.3333)
+    assert by_phase["II"]["quality_avg"] == pytest.approx(0.9)   # NULL ignored
+
+
+def test_rollup_subtotals(store):
+    res = olap_mod.olap_engine.drilldown(
+        "healthcare", ["phase", "category"], measures=["citations_sum"], rollup=True
+    )
+    recs = _records(res)
+    grand = [r for r in recs if r["level"] == 0]
+    assert grand == [{"phase": None, "category": None, "level": 0,
+                      "count": 8, "citations_sum": 21}]
+    subtotals = {r["phase"]: r["count"] for r in recs if r["level"] == 1}
+    assert subtotals == {"I": 3, "II": 2, "III": 3}
+    assert sum(r["count"] for r in recs if r["level"] == 2) == 8
+
+
+def test_top_k_per_group(store):
+    res = olap_mod.olap_engine.drilldown("healthcare", ["phase", "category"], top_k=1)
+    recs = _records(res)
+    assert {r["phase"]: r["category"] for r in recs} == {
+        "I": "oncology", "II": "cardiology", "III": "cardiology",
+    }
+
+
+def test_top_k_prunes_rollup_subtrees(store):
+    res = olap_mod.olap_engine.drilldown(
+        "healthcare", ["phase", "category"], rollup=True, top_k=2
+    )
+    recs = _records(res)
+    assert {r["phase"] for r in recs if r["level"] == 1} == {"I", "III"}
+    assert all(r["phase"] != "II" for r in recs if r["level"] == 2)
+    assert len([r for r in recs if r["level"] == 2 and r["phase"] == "III"]) == 2
+
+
+def test_filters_and_unknown_measure(store):
+    res = olap_mod.olap_engine.drilldown(
+        "healthcare", ["phase"], filters={"category": "oncology"}
+    )
+    assert dict(zip(res["data"]["phase"], res["data"]["count"])) == {"I": 2, "II": 1}
+    with pytest.raises(ValueError):
+        olap_mod.olap_engine.drilldown("healthcare", ["phase"], measures=["median_x"])
+
+
+class TestDrilldownEndpoint:
+    def test_requires_auth(self, client):
+        r = client.post("/cube/drilldown", json={"domain_id": "default", "group_by": ["entity_type"]})
+        assert r.status_code == 401
+
+    def test_three_dimensions_allowed(self, client, auth_headers):
+        r = client.post("/cube/drilldown", headers=auth_headers, json={
+            "domain_id": "default",
+            "group_by": ["entity_type", "validation_status", "domain"],
+            "rollup": True,
+        })
+        assert r.status_code == 200
+        body = r.json()
+        assert body["columns"][:4] == ["entity_type", "validation_status", "domain", "level"]
+        assert set(body["data"]) == set(body["columns"])
+
+    def test_validation(self, client, auth_headers):
+        base = {"domain_id": "default", "group_by": ["entity_type"]}
+        assert client.post("/cube/drilldown", headers=auth_headers,
+                           json={**base, "measures": ["bogus"]}).status_code == 422
+        assert client.post("/cube/drilldown", headers=auth_headers,
+                           json={**base, "group_by": ["nope"]}).status_code == 422
+        assert client.post("/cube/drilldown", headers=auth_headers,
+                           json={**base, "top_k": 0}).status_code == 422
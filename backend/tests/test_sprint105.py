@@ -0,0 +1,166 @@
+"""
+Sprint 105 — Dimension sketches (HyperLogLog + Space-Saving).
+
+  - HLL estimates within a few percent; small cardinalities are exact
+  - Space-Saving keeps true heavy hitters
+  - the replica folds new rows in incrementally; updates / deletes rebuild
+  - sketches are maintained on the write path; reads never scan the source
+  - get_dimensions serves distinct counts and top values per domain
+"""
+from __future__ import annotations
+
+import json
+from datetime import datetime
+
+import pandas as pd
+import pytest
+from sqlalchemy import create_engine, delete, update
+from sqlalchemy.pool import StaticPool
+
+import backend.olap as olap_mod
+from backend import models
+from backend.olap_sketches import ColumnSketch, HyperLogLog, SpaceSaving
+from backend.olap_store import OLAPStore
+
+_t = models.RawEntity.__table__
+
+
+class TestSketches:
+    def test_hll_accuracy(self):
+        hll = HyperLogLog()
+        values = pd.Series([f"v{i}" for i in range(50_000)], dtype=object)
+        hll.add_hashes(pd.util.hash_array(values.to_numpy()))
+        assert hll.estimate() == pytest.approx(50_000, rel=0.05)
+
+    def test_hll_small_range(self):
+        hll = HyperLogLog()
+        hll.add_hashes(pd.util.hash_array(pd.Series(["a", "b", "c"] * 10, dtype=object).to_numpy()))
+        assert hll.estimate() == 3
+
+    def test_space_saving_keeps_heavy_hitters(self):
+        ss = SpaceSaving(capacity=8)
+        ss.add_counts([(f"rare{i}", 1) for i in range(500)])
+        ss.add_counts([("hot", 300), ("warm", 200)])   # both > n / capacity
+        ss.add_counts([(f"rare{i}", 1) for i in range(500, 900)])
+        assert [v for v, _ in ss.top(2)] == ["hot", "warm"]
+        assert ss.top(1)[0][1] >= 300   # counts are upper bounds
+
+    def test_column_sketch_exact_then_estimated(self):
+        sk = ColumnSketch()
+        sk.add(pd.Series(["x", "y", None, "x"], dtype=object))
+        assert sk.distinct() == 2 and sk.top(1) == [("x", 2)]
+        sk.add(pd.Series([f"v{i}" for i in range(1000)], dtype=object))
+        assert sk.exact is None
+        assert sk.distinct() == pytest.approx(1002, rel=0.05)
+
+
+@pytest.fixture()
+def source():
+    eng = create_engine("sqlite://", poolclass=StaticPool,
+                        connect_args={"check_same_thread": False})
+    models.Base.metadata.create_all(bind=eng, tables=[_t])
+    return eng
+
+
+def _insert(eng, rows):
+    with eng.begin() as conn:
+        conn.execute(_t.insert(), rows)
+
+
+def _trial(phase, domain="healthcare"):
+    return {"primary_label": phase, "domain": domain,
+            "normalized_json": json.dumps({"phase": phase})}
+
+
+class TestReplicaSketches:
+    def test_incremental_ingest(self, source):
+        _insert(source, [_trial("I"), _trial("I"), _trial("II")])
+        store = OLAPStore(":memory:", source_engine=source)
+        assert store.dimension_sketches("healthcare")["phase"].distinct() == 2
+
+        _insert(source, [_trial("III"), _trial("I")])
+        store.refresh()   # write path
+        sk = store.dimension_sketches("healthcare")["phase"]
+        assert sk.distinct() == 3
+        assert sk.top(1) == [("I", 3)]
+        assert not store.sketches.is_dirty("healthcare")
+
+    def test_reads_do_not_sync(self, source, monkeypatch):
+        _insert(source, [_trial("I")])
+        store = OLAPStore(":memory:", source_engine=source)
+        store.dimension_sketches("healthcare")
+        monkeypatch.setattr(store, "sync", lambda: pytest.fail("read path synced"))
+        _insert(source, [_trial("II")])
+        assert store.dimension_sketches("healthcare")["phase"].distinct() == 1
+
+    def test_late_commit_below_watermark_is_folded(self, source):
+        _insert(source, [{**_trial("I"), "id": 5, "updated_at": datetime(2030, 1, 2)}])
+        store = OLAPStore(":memory:", source_engine=source)
+        store.dimension_sketches("healthcare")
+        _insert(source, [{**_trial("II"), "id": 2, "updated_at": datetime(2030, 1, 1)}])
+        store.refresh()
+        assert store.dimension_sketches("healthcare")["phase"].distinct() == 2
+
+    def test_update_and_delete_rebuild(self, source, monkeypatch):
+        _insert(source, [_trial("I"), _trial("II"), _trial("III"), _trial("x", domain="default")])
+        store = OLAPStore(":memory:", source_engine=source)
+        before = store.dimension_sketches("healthcare")
+
+        with source.begin() as conn:
+            conn.execute(update(_t).where(_t.c.primary_label == "II").values(
+                normalized_json=json.dumps({"phase": "I"})))
+            conn.execute(delete(_t).where(_t.c.primary_label == "III"))
+        store.sync()
+        assert store.sketches.is_dirty("healthcare")
+        assert not store.sketches.is_dirty("default")
+
+        # A dirty domain serves its previous sketches and schedules a refresh
+        scheduled = []
+        monkeypatch.setattr(store, "schedule_refresh", lambda: scheduled.append(1))
+        assert store.dimension_sketches("healthcare") is before and scheduled
+
+        store.refresh()
+        sk = store.dimension_sketches("healthcare")["phase"]
+        assert sk.distinct() == 1 and sk.top(1) == [("I", 2)]
+        assert before["phase"].distinct() == 3   # published sketches are not mutated
+
+
+def test_get_dimensions_uses_domain_sketches(source, monkeypatch):
+    _insert(source, [_trial("I"), _trial("I"), _trial("II"), _trial("IV", domain="default")])
+    monkeypatch.setattr(olap_mod, "olap_store", OLAPStore(":memory:", source_engine=source))
+    dims = {d["name"]: d for d in olap_mod.olap_engine.get_dimensions("healthcare")}
+    assert dims["phase"]["distinct_count"] == 2
+    assert dims["phase"]["top_values"] == [{"value": "I", "count": 2}, {"value": "II", "count": 1}]
+    assert dims["category"]["distinct_count"] == 0 and dims["category"]["top_values"] == []
+
+
+def test_committed_writes_schedule_a_refresh(monkeypatch):
+    from backend.olap_store import olap_store
+    from backend.routers.deps import _invalidate_entity_caches
+
+    scheduled = []
+    monkeypatch.setattr(olap_store, "schedule_refresh", lambda: scheduled.append(1))
+    _invalidate_entity_caches("healthcare")
+    assert scheduled == [1]
+
+
+def test_scheduled_refreshes_coalesce(source, monkeypatch):
+    store = OLAPStore(":memory:", source_engine=source)
+    started = []
+    monkeypatch.setattr("threading.Thread.start", lambda self: started.append(self))
+    store.schedule_refresh()
+    store.schedule_refresh()
+    assert len(started) == 1
+    started[0].run()   # the worker clears the pending flag before refreshing
+    store.schedule_refresh()
+    assert len(started) == 2
+
+
+def test_nlq_prompt_lists_top_values():
+    from backend.routers.nlq import _build_system_prompt
+
+    prompt = _build_system_prompt([{
+        "name": "phase", "label": "Phase", "type": "string", "distinct_count": 2,
+        "top_values": [{"value": "I", "count": 2}, {"value": "II", "count": 1}],
+    }])
+    assert 'most common values: "I", "II"' in prompt
@@ -0,0 +1,104 @@
+"""
+Sprint 106 — Arrow IPC / Parquet content negotiation.
+
+  - Accept header parsing
+  - cube query / drilldown / export stream Arrow (or Parquet) tables
+  - analyzer endpoints return their main list as a table, context in metadata
+  - JSON stays the default
+"""
+from __future__ import annotations
+
+import io
+import json
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from backend.exporters.arrow_exporter import ARROW_STREAM, PARQUET, negotiate
+
+_ARROW = {"Accept": ARROW_STREAM}
+
+
+def _read_stream(resp) -> pa.Table:
+    assert resp.headers["content-type"] == ARROW_STREAM
+    return pa.ipc.open_stream(resp.content).read_all()
+
+
+def _meta(table: pa.Table) -> dict:
+    return json.loads(table.schema.metadata[b"ukip"])
+
+
+def test_negotiate():
+    assert negotiate(None) is None
+    assert negotiate("application/json") is None
+    assert negotiate(f"application/json;q=0.5, {ARROW_STREAM}") == "arrow"
+    assert negotiate(PARQUET) == "parquet"
+
+
+class TestCubeArrow:
+    def test_cube_query_arrow(self, client, auth_headers):
+        r = client.post("/cube/query", headers={**auth_headers, **_ARROW},
+                        json={"domain_id": "default", "group_by": ["entity_type"]})
+        assert r.status_code == 200
+        table = _read_stream(r)
+        assert table.column_names == ["entity_type", "count", "pct"]
+        assert _meta(table)["domain_id"] == "default"
+
+    def test_cube_query_json_by_default(self, client, auth_headers):
+        r = client.post("/cube/query", headers=auth_headers,
+                        json={"domain_id": "default", "group_by": ["entity_type"]})
+        assert r.headers["content-type"].startswith("application/json")
+
+    def test_drilldown_arrow(self, client, auth_headers):
+        r = client.post("/cube/drilldown", headers={**auth_headers, **_ARROW}, json={
+            "domain_id": "default", "group_by": ["entity_type"],
+            "measures": ["quality_avg"], "rollup": True,
+        })
+        assert r.status_code == 200
+        table = _read_stream(r)
+        assert table.column_names == ["entity_type", "level", "count", "quality_avg"]
+        assert _meta(table)["rollup"] is True
+
+    def test_export_parquet(self, client, auth_headers):
+        r = client.get("/cube/export/default?dimension=entity_type",
+                       headers={**auth_headers, "Accept": PARQUET})
+        assert r.status_code == 200
+        assert r.headers["content-type"] == PARQUET
+        assert 'filename="cube_default_entity_type.parquet"' in r.headers["content-disposition"]
+        table = pq.read_table(io.BytesIO(r.content))
+        assert table.column_names == ["entity_type", "count", "pct"]
+
+    def test_export_arrow_validates_dimension(self, client, auth_headers):
+        r = client.get("/cube/export/default?dimension=bad%3Bname",
+                       headers={**auth_headers, **_ARROW})
+        assert r.status_code == 422
+
+
+class TestAnalyzersArrow:
+    def test_topics(self, client, auth_headers):
+        r = client.get("/analyzers/topics/default", headers={**auth_headers, **_ARROW})
+        assert r.status_code == 200
+        table = _read_stream(r)
+        assert table.column_names == ["concept", "count", "pct"]
+        assert "total_enriched" in _meta(table)
+        # The cached result is still served as JSON without the header
+        again = client.get("/analyzers/topics/default", headers=auth_headers)
+        assert again.headers["content-type"].startswith("application/json")
+        assert [t["concept"] for t in again.json()["topics"]] == table.column("concept").to_pylist()
+
+    def test_clusters_are_flattened(self):
+        from backend.routers.analytics import _analyzer_rows
+
+        result = {"clusters": [{"id": 0, "seed": "AI", "size": 2, "members": [
+            {"concept": "AI", "count": 3}, {"concept": "ML", "count": 1},
+        ]}]}
+        assert _analyzer_rows(result, "clusters") == [
+            {"cluster_id": 0, "seed": "AI", "concept": "AI", "count": 3},
+            {"cluster_id": 0, "seed": "AI", "concept": "ML", "count": 1},
+        ]
+
+    def test_parquet_correlation(self, client, auth_headers):
+        r = client.get("/analyzers/correlation/default", headers={**auth_headers, "Accept": PARQUET})
+        assert r.status_code == 200
+        table = pq.read_table(io.BytesIO(r.content))
+        assert table.column_names == ["field_a", "field_b", "cramers_v", "strength", "ci_low", "ci_high"]
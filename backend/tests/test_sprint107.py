@@ -0,0 +1,180 @@
+"""
+Sprint 107 — Normalized concept index.
+
+  - enrichment_concepts parsed into concepts / entity_concepts
+  - sync() catches up inserts, edits and deletes incrementally; reads never sync
+  - concurrent writers can add the same dictionary label
+  - the enrichment worker indexes in its own transaction
+  - TopicAnalyzer aggregates are domain-scoped and match the old semantics
+"""
+from __future__ import annotations
+
+import math
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import create_engine, delete, func, select, update
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from backend import models
+from backend.analyzers.concept_index import ConceptIndex, parse_concepts
+from backend.analyzers.topic_modeling import TopicAnalyzer
+
+_t = models.RawEntity.__table__
+_ec = models.EntityConcept.__table__
+
+
+@pytest.fixture()
+def source():
+    eng = create_engine("sqlite://", poolclass=StaticPool,
+                        connect_args={"check_same_thread": False})
+    models.Base.metadata.create_all(bind=eng, tables=[
+        _t, models.Concept.__table__, _ec,
+    ])
+    return eng
+
+
+def _insert(eng, *concept_strings, domain="default"):
+    with eng.begin() as conn:
+        conn.execute(_t.insert(), [
+            {"primary_label": f"e{i}", "domain": domain, "enrichment_concepts": c}
+            for i, c in enumerate(concept_strings)
+        ])
+
+
+def _pairs(eng) -> set[tuple[int, str]]:
+    with eng.connect() as conn:
+        return set(conn.execute(
+            select(_ec.c.entity_id, models.Concept.__table__.c.label)
+            .join(models.Concept.__table__, models.Concept.__table__.c.id == _ec.c.concept_id)
+        ).all())
+
+
+def test_parse_concepts():
+    assert parse_concepts(" AI, ML ,, ") == ["AI", "ML"]
+    assert parse_concepts(None) == []
+
+
+class TestSync:
+    def test_initial_index_and_dictionary(self, source):
+        _insert(source, "AI, ML", "ML, NLP, ML", None, "")
+        index = ConceptIndex(source)
+        assert index.sync() == 2
+        assert _pairs(source) == {(1, "AI"), (1, "ML"), (2, "ML"), (2, "NLP")}
+        with source.connect() as conn:
+            assert conn.execute(select(func.count()).select_from(models.Concept.__table__)).scalar() == 3
+        assert index.sync() == 0   # unchanged source
+
+    def test_incremental_edit_insert_delete(self, source):
+        _insert(source, "AI, ML", "ML", "NLP")
+        index = ConceptIndex(source)
+        index.sync()
+        with source.begin() as conn:
+            conn.execute(update(_t).where(_t.c.id == 1).values(enrichment_concepts="Robotics"))
+            conn.execute(update(_t).where(_t.c.id == 2).values(enrichment_concepts=None))
+            conn.execute(delete(_t).where(_t.c.id == 3))
+            conn.execute(_t.insert().values(primary_label="new", enrichment_concepts="AI"))
+        assert index.sync() == 3   # both edits and the new entity
+        # SQLite reuses the deleted max rowid: id 3 now holds the new entity
+        assert _pairs(source) == {(1, "Robotics"), (3, "AI")}
+
+    def test_rebuild(self, source):
+        _insert(source, "AI", "ML")
+        index = ConceptIndex(source)
+        index.sync()
+        assert index.rebuild() == 2
+        assert _pairs(source) == {(1, "AI"), (2, "ML")}
+
+
+def test_enrichment_worker_indexes_in_transaction(source):
+    from backend.enrichment_worker import enrich_single_record
+    from backend.schemas_enrichment import EnrichedRecord
+
+    db = sessionmaker(bind=source)()
+    try:
+        entity = models.RawEntity(primary_label="paper", enrichment_status="processing")
+        db.add(entity)
+        db.commit()
+        with (
+            patch("backend.enrichment_worker.adapter_wos") as mock_wos,
+            patch("backend.enrichment_worker.adapter_openalex") as mock_openalex,
+        ):
+            mock_wos.is_active = False
+            mock_openalex.search_by_title.return_value = [
+                EnrichedRecord(doi="10.1/x", citation_count=3, concepts=["AI", "Robotics"])
+            ]
+            enrich_single_record(db, entity)
+    finally:
+        db.close()
+
+    assert _pairs(source) == {(1, "AI"), (1, "Robotics")}
+    index = ConceptIndex(source)
+    assert index.sync() == 0   # already current: nothing re-indexed
+
+
+class TestTopicAnalyzer:
+    @pytest.fixture()
+    def analyzer(self, source):
+        _insert(source,
+                "Machine Learning, Neural Network, Deep Learning",
+                "Machine Learning, Data Science, Statistics",
+                "Neural Network, Computer Vision",
+                "Machine Learning, Neural Network, Statistics")
+        _insert(source, "Oncology, Machine Learning", domain="healthcare")
+        index = ConceptIndex(source)
+        index.sync()   # write side
+        return TopicAnalyzer(index=index)
+
+    def test_top_topics_domain_scoped(self, analyzer):
+        res = analyzer.top_topics("default", top_n=2)
+        assert res["total_enriched"] == 4
+        assert res["topics"] == [
+            {"concept": "Machine Learning", "count": 3, "pct": 75.0},
+            {"concept": "Neural Network", "count": 3, "pct": 75.0},
+        ]
+        health = analyzer.top_topics("healthcare")
+        assert health["total_enriched"] == 1
+        assert {t["concept"] for t in health["topics"]} == {"Oncology", "Machine Learning"}
+
+    def test_cooccurrence_pmi(self, analyzer):
+        pair = analyzer.cooccurrence("default", top_n=1)["pairs"][0]
+        assert (pair["concept_a"], pair["concept_b"], pair["count"]) == (
+            "Machine Learning", "Neural Network", 2,
+        )
+        assert pair["pmi"] == round(math.log2(2 * 4 / (3 * 3)), 3)
+
+    def test_clusters(self, analyzer):
+        res = analyzer.topic_clusters("default", n_clusters=2)
+        members = {c["seed"]: {m["concept"] for m in c["members"]} for c in res["clusters"]}
+        assert members == {
+            "Machine Learning": {"Machine Learning", "Data Science", "Statistics", "Deep Learning"},
+            "Neural Network": {"Neural Network", "Computer Vision"},
+        }
+        assert sum(c["size"] for c in res["clusters"]) == 6
+
+    def test_unknown_domain(self, analyzer):
+        with pytest.raises(ValueError):
+            analyzer.top_topics("nonexistent_xyz")
+
+    def test_reads_do_not_sync(self, analyzer, monkeypatch):
+        monkeypatch.setattr(analyzer.index, "sync", lambda: pytest.fail("read path synced"))
+        analyzer.top_topics("default")
+        analyzer.cooccurrence("default")
+
+
+def test_label_added_concurrently_is_reused(source):
+    from backend.analyzers import concept_index as ci
+
+    db = sessionmaker(bind=source)()
+    try:
+        # Another writer inserts "AI" between our SELECT and INSERT
+        db.execute(ci._insert_labels(db), [{"label": "AI"}])
+        db.execute(ci._insert_labels(db), [{"label": "AI"}, {"label": "ML"}])
+        ids = ci.concept_ids(db, ["AI", "ML"])
+        db.commit()
+    finally:
+        db.close()
+    with source.connect() as conn:
+        rows = dict(conn.execute(select(models.Concept.__table__.c.label, models.Concept.__table__.c.id)).all())
+    assert rows == ids
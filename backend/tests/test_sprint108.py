@@ -0,0 +1,113 @@
+"""
+Sprint 108 — Sparse concept co-occurrence (XᵀX).
+
+  - XᵀX pair counts / diagonal match a brute-force itertools count
+  - PMI / NPMI vectorized from the diagonal
+  - matrices cached per domain; a write only rebuilds its own domain
+  - /analyzers/cooccurrence exposes npmi
+"""
+from __future__ import annotations
+
+import math
+import random
+from collections import Counter
+from itertools import combinations
+
+import pandas as pd
+import pytest
+from sqlalchemy import create_engine, update
+from sqlalchemy.pool import StaticPool
+
+from backend import models
+from backend.analyzers.concept_index import ConceptIndex
+from backend.analyzers.concept_matrix import ConceptMatrix
+from backend.analyzers.topic_modeling import TopicAnalyzer
+
+_t = models.RawEntity.__table__
+
+
+def test_gram_matches_brute_force():
+    rng = random.Random(7)
+    docs = [rng.sample(range(30), rng.randint(1, 6)) for _ in range(400)]
+    incidence = pd.DataFrame(
+        [(e, c) for e, cs in enumerate(docs) for c in cs], columns=["entity_id", "concept_id"]
+    )
+    m = ConceptMatrix.from_incidence(incidence, {c: f"c{c:02d}" for c in range(30)})
+
+    singles = Counter(c for cs in docs for c in cs)
+    pairs = Counter(p for cs in docs for p in combinations(sorted(cs), 2))
+    col = {label: i for i, label in enumerate(m.labels)}
+    for c, n in singles.items():
+        assert m.counts[col[f"c{c:02d}"]] == n
+    for (a, b), n in pairs.items():
+        assert m.gram[col[f"c{a:02d}"], col[f"c{b:02d}"]] == n
+    assert m.upper.nnz == len(pairs)
+    assert list(m.counts) == sorted(m.counts, reverse=True)
+
+    top = m.top_pairs(5)
+    assert top["count"].tolist() == sorted(pairs.values(), reverse=True)[:5]
+    a, b, co = top["a"][0], top["b"][0], top["count"][0]
+    expected = math.log2(co * 400 / (m.counts[a] * m.counts[b]))
+    assert top["pmi"][0] == pytest.approx(expected, abs=1e-3)
+    assert top["npmi"][0] == pytest.approx(expected / -math.log2(co / 400), abs=1e-3)
+
+
+def test_npmi_of_always_together_pair_is_one():
+    incidence = pd.DataFrame({"entity_id": [1, 1, 2, 2], "concept_id": [10, 11, 10, 11]})
+    top = ConceptMatrix.from_incidence(incidence, {10: "a", 11: "b"}).top_pairs(1)
+    assert top["pmi"].tolist() == [0.0] and top["npmi"].tolist() == [1.0]
+
+
+def test_empty_domain():
+    m = ConceptMatrix.from_incidence(pd.DataFrame(columns=["entity_id", "concept_id"]), {})
+    assert m.n_entities == 0 and m.top_pairs(5)["count"].tolist() == []
+
+
+@pytest.fixture()
+def index():
+    eng = create_engine("sqlite://", poolclass=StaticPool,
+                        connect_args={"check_same_thread": False})
+    models.Base.metadata.create_all(bind=eng, tables=[
+        _t, models.Concept.__table__, models.EntityConcept.__table__,
+    ])
+    with eng.begin() as conn:
+        conn.execute(_t.insert(), [
+            {"primary_label": "a", "domain": "default", "enrichment_concepts": "AI, ML"},
+            {"primary_label": "b", "domain": "default", "enrichment_concepts": "AI, ML, NLP"},
+            {"primary_label": "c", "domain": "healthcare", "enrichment_concepts": "Oncology, AI"},
+        ])
+    index = ConceptIndex(eng)
+    index.sync()
+    return index
+
+
+def test_matrix_cached_per_domain(index):
+    default, health = index.matrix("default"), index.matrix("healthcare")
+    assert index.matrix("default") is default
+
+    with index.source.begin() as conn:
+        conn.execute(update(_t).where(_t.c.id == 3).values(enrichment_concepts="Oncology"))
+    index.sync()
+    assert index.matrix("default") is default          # other domain untouched
+    rebuilt = index.matrix("healthcare")
+    assert rebuilt is not health and list(rebuilt.labels) == ["Oncology"]
+
+
+def test_analyzer_pairs_and_clusters(index):
+    analyzer = TopicAnalyzer(index=index)
+    res = analyzer.cooccurrence("default", top_n=5)
+    assert res["total_enriched"] == 2
+    assert res["pairs"][0] == {
+        "concept_a": "AI", "concept_b": "ML", "count": 2, "pmi": 0.0, "npmi": 1.0,
+    }
+    clusters = analyzer.topic_clusters("default", n_clusters=1)["clusters"]
+    assert clusters == [{"id": 0, "seed": "AI", "size": 3, "members": [
+        {"concept": "AI", "count": 2}, {"concept": "ML", "count": 2}, {"concept": "NLP", "count": 1},
+    ]}]
+
+
+def test_cooccurrence_endpoint_has_npmi(client, auth_headers):
+    r = client.get("/analyzers/cooccurrence/default", headers=auth_headers)
+    assert r.status_code == 200
+    for p in r.json()["pairs"]:
+        assert -1.0 <= p["npmi"] <= 1.0
@@ -0,0 +1,101 @@
+"""
+Sprint 109 — Vectorized Cramér's V.
+
+  - bincount contingency tables match pd.crosstab
+  - V matches the textbook chi-squared formula
+  - correlations are domain-scoped and read from the OLAP replica
+  - large domains are sampled and carry bootstrap confidence bounds
+"""
+from __future__ import annotations
+
+import json
+import math
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.pool import StaticPool
+
+import backend.analyzers.correlation as corr
+from backend import models
+from backend.olap_store import OLAPStore
+
+_t = models.RawEntity.__table__
+
+
+def _codes(series: pd.Series):
+    return corr._arrow_codes(pa.chunked_array([pa.array(series, pa.string(), from_pandas=True)]))
+
+
+def test_contingency_matches_crosstab():
+    rng = np.random.default_rng(0)
+    a = pd.Series(rng.choice(["x", "y", "z", None], 500))
+    b = pd.Series(rng.choice(["p", "q", None], 500))
+    ct = corr._contingency(*_codes(a), *_codes(b))
+    expected = pd.crosstab(a, b).to_numpy()
+    assert sorted(ct.ravel()) == sorted(expected.ravel())
+    assert ct.sum() == expected.sum()
+
+
+def test_v_matches_chi_squared_formula():
+    ct = np.array([[30, 10], [5, 55]])
+    n = ct.sum()
+    exp = ct.sum(1, keepdims=True) * ct.sum(0, keepdims=True) / n
+    chi2 = ((ct - exp) ** 2 / exp).sum()
+    assert corr._cramers_v_table(ct) == round(math.sqrt(chi2 / n), 4)
+    assert corr._cramers_v_table(np.array([[10, 0], [0, 10]])) == 1.0
+    assert corr._cramers_v_table(np.array([[7, 3]])) == 0.0
+
+
+def test_interval_brackets_estimate():
+    ct = np.array([[300, 100], [50, 550]])
+    lo, hi = corr._v_interval(ct, seed=1)
+    assert lo <= corr._cramers_v_table(ct) <= hi
+    assert hi - lo < 0.15
+
+
+@pytest.fixture()
+def analyzer(monkeypatch):
+    source = create_engine("sqlite://", poolclass=StaticPool,
+                           connect_args={"check_same_thread": False})
+    models.Base.metadata.create_all(bind=source, tables=[_t])
+    rng = np.random.default_rng(3)
+    rows = []
+    for i in range(400):
+        phase = rng.choice(["I", "II", "III"])
+        # category follows phase 80% of the time
+        status = {"I": "recruiting", "II": "active", "III": "completed"}[phase] \
+            if rng.random() < 0.8 else rng.choice(["recruiting", "active", "completed"])
+        rows.append({"primary_label": f"t{i}", "domain": "healthcare", "entity_type": "trial",
+                     "normalized_json": json.dumps({"phase": phase, "category": status})})
+    rows.append({"primary_label": "other", "domain": "default", "entity_type": "x",
+                 "normalized_json": json.dumps({"phase": "I"})})
+    with source.begin() as conn:
+        conn.execute(_t.insert(), rows)
+    monkeypatch.setattr(corr, "olap_store", OLAPStore(":memory:", source_engine=source))
+    return corr.CorrelationAnalyzer(workers=2)
+
+
+def _pair(result, a, b):
+    return next(c for c in result["correlations"] if {c["field_a"], c["field_b"]} == {a, b})
+
+
+def test_domain_scoped_exact(analyzer):
+    res = analyzer.top_correlations("healthcare")
+    assert res["n_entities"] == 400 and res["rows_analyzed"] == 400
+    assert res["sampled"] is False
+    c = _pair(res, "phase", "category")
+    assert c["cramers_v"] > 0.6 and c["strength"] == "strong"
+    assert c["ci_low"] is None and c["ci_high"] is None
+
+
+def test_sampled_with_confidence_bounds(analyzer):
+    exact = _pair(analyzer.top_correlations("healthcare"), "phase", "category")["cramers_v"]
+    analyzer.sample_rows = 200
+    res = analyzer.top_correlations("healthcare")
+    assert res["sampled"] is True and res["rows_analyzed"] == 200
+    c = _pair(res, "phase", "category")
+    assert c["ci_low"] <= c["cramers_v"] <= c["ci_high"]
+    assert abs(c["cramers_v"] - exact) < 0.15
@@ -0,0 +1,118 @@
+"""
+Sprint 110 — Space-Saving top-k concepts.
+
+  - top topics come from the per-domain sketch, counts are exact
+  - index writes fold into the sketch without a rebuild
+  - writes that remove concept rows mark only their domain for rebuild
+  - the enrichment worker's writes reach the sketch directly
+"""
+from __future__ import annotations
+
+import pytest
+from sqlalchemy import create_engine, delete, update
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from backend import models
+from backend.analyzers import concept_index as ci
+from backend.analyzers.topic_modeling import TopicAnalyzer
+
+_t = models.RawEntity.__table__
+
+
+@pytest.fixture()
+def index():
+    eng = create_engine("sqlite://", poolclass=StaticPool,
+                        connect_args={"check_same_thread": False})
+    models.Base.metadata.create_all(bind=eng, tables=[
+        _t, models.Concept.__table__, models.EntityConcept.__table__,
+    ])
+    with eng.begin() as conn:
+        conn.execute(_t.insert(), [
+            {"primary_label": "a", "domain": "default", "enrichment_concepts": "AI, ML"},
+            {"primary_label": "b", "domain": "default", "enrichment_concepts": "AI, NLP"},
+            {"primary_label": "c", "domain": "default", "enrichment_concepts": "AI"},
+            {"primary_label": "d", "domain": "healthcare", "enrichment_concepts": "Oncology"},
+        ])
+    index = ci.ConceptIndex(eng)
+    index.sync()
+    return index
+
+
+def _add(index, concepts, domain="default"):
+    with index.source.begin() as conn:
+        conn.execute(_t.insert().values(primary_label="x", domain=domain,
+                                        enrichment_concepts=concepts))
+    index.sync()   # write side
+
+
+def test_top_topics_exact_counts(index):
+    res = TopicAnalyzer(index=index).top_topics("default", top_n=2)
+    assert res["total_enriched"] == 3 and res["error_bound"] == 0
+    assert res["topics"][0] == {"concept": "AI", "count": 3, "pct": 100.0}
+    assert len(res["topics"]) == 2
+
+
+def test_inserts_fold_into_sketch(index, monkeypatch):
+    index.top_concepts("default", 5)
+    sketch = index._topk["default"]
+    monkeypatch.setattr(index, "_build_topk", lambda d: pytest.fail("rebuilt"))
+    _add(index, "NLP, Robotics")
+    top, entities = index.top_concepts("default", 5)
+    assert index._topk["default"] is sketch and entities == 4
+    counts = {cid: c for cid, c, _ in top}
+    res = TopicAnalyzer(index=index).top_topics("default", top_n=5)
+    assert {t["concept"]: t["count"] for t in res["topics"]} == {
+        "AI": 3, "NLP": 2, "ML": 1, "Robotics": 1,
+    }
+    assert sorted(counts.values(), reverse=True) == [3, 2, 1, 1]
+
+
+def test_removal_marks_only_its_domain_dirty(index):
+    index.top_concepts("default", 5)
+    index.top_concepts("healthcare", 5)
+    with index.source.begin() as conn:
+        conn.execute(update(_t).where(_t.c.primary_label == "a").values(enrichment_concepts="ML"))
+    index.sync()
+    assert "default" in index._topk_dirty and "healthcare" not in index._topk_dirty
+    res = TopicAnalyzer(index=index).top_topics("default")
+    assert {t["concept"]: t["count"] for t in res["topics"]} == {"AI": 2, "ML": 1, "NLP": 1}
+    assert "default" not in index._topk_dirty
+
+    with index.source.begin() as conn:
+        conn.execute(delete(_t).where(_t.c.domain == "healthcare"))
+    index.sync()
+    top, entities = index.top_concepts("healthcare", 5)
+    assert top == [] and entities == 0
+
+
+def test_unchanged_concepts_keep_sketch(index):
+    index.top_concepts("default", 5)
+    with index.source.begin() as conn:
+        conn.execute(update(_t).where(_t.c.primary_label == "a").values(secondary_label="edit"))
+    index.sync()
+    assert "default" not in index._topk_dirty
+
+
+def test_eviction_keeps_heavy_hitters(index, monkeypatch):
+    monkeypatch.setattr(ci, "TOPK_CAPACITY", 4)
+    index.top_concepts("default", 3)
+    for i in range(10):
+        _add(index, f"rare{i}, AI")
+    res = TopicAnalyzer(index=index).top_topics("default", top_n=1)
+    assert res["topics"][0] == {"concept": "AI", "count": 13, "pct": 100.0}
+
+
+def test_worker_write_reaches_sketch(index):
+    index.top_concepts("default", 5)
+    db = sessionmaker(bind=index.source)()
+    try:
+        entity = db.get(models.RawEntity, 3)
+        entity.enrichment_concepts = "AI, Robotics"
+        index.index_entity(db, entity)
+        db.commit()
+    finally:
+        db.close()
+    assert "default" not in index._topk_dirty
+    res = TopicAnalyzer(index=index).top_topics("default")
+    assert {t["concept"]: t["count"] for t in res["topics"]}["Robotics"] == 1
@@ -0,0 +1,91 @@
+"""
+Sprint 111 — Single-statement gap detection.
+
+  - every gap metric comes from one pass (Sprint 114: over the shared Arrow
+    snapshot of the OLAP replica)
+  - metrics match the per-check semantics (empty markers, concept density)
+  - results are cached per domain until a write moves the stamp or an
+    entity-write hook invalidates them
+"""
+from __future__ import annotations
+
+from sqlalchemy import event
+
+from backend import models
+from backend.analyzers import gap_detector
+from backend.analyzers.gap_detector import GapAnalyzer, invalidate_gap_cache
+
+
+def _seed(db):
+    db.add_all([
+        models.RawEntity(primary_label="A", entity_type="N/A", enrichment_status="done",
+                         enrichment_concepts="AI, ML", quality_score=0.9),
+        models.RawEntity(primary_label="B", entity_type=" unknown ", enrichment_status="done",
+                         enrichment_concepts="AI", quality_score=0.1),
+        models.RawEntity(primary_label="C", entity_type=None, enrichment_status="pending"),
+        models.RawEntity(primary_label="D", entity_type="paper", enrichment_status="done"),
+        models.AuthorityRecord(field_name="x", original_value="y", status="pending"),
+        models.AuthorityRecord(field_name="x", original_value="z", status="confirmed"),
+    ])
+    db.commit()
+
+
+class _Counter:
+    def __init__(self):
+        self.selects = 0
+
+    def __call__(self, conn, cursor, statement, *args):
+        if statement.lstrip().upper().startswith("SELECT") and "raw_entities" in statement:
+            self.selects += 1
+
+
+def test_metrics_from_shared_snapshot(db_session):
+    _seed(db_session)
+    invalidate_gap_cache()
+    m = GapAnalyzer().metrics("default", db_session)
+    assert (m.total, m.not_enriched, m.enriched, m.sparse_concepts) == (4, 1, 3, 2)
+    assert (m.scored, m.low_quality) == (2, 1)
+    assert (m.authority_total, m.authority_pending) == (2, 1)
+    assert m.missing["entity_type"] == 3
+
+    # Recomputing reads the replica snapshot: the source only sees the sync check
+    invalidate_gap_cache()
+    counter = _Counter()
+    engine = db_session.get_bind()
+    event.listen(engine, "before_cursor_execute", counter)
+    try:
+        assert GapAnalyzer().metrics("default", db_session) == m
+    finally:
+        event.remove(engine, "before_cursor_execute", counter)
+    assert counter.selects == 1
+
+
+def test_cached_until_write(db_session, monkeypatch):
+    _seed(db_session)
+    invalidate_gap_cache()
+    calls = []
+    real = gap_detector.compute_gap_metrics
+    monkeypatch.setattr(gap_detector, "compute_gap_metrics",
+                        lambda *args: calls.append(1) or real(*args))
+    analyzer = GapAnalyzer()
+    analyzer.analyze("default", db_session)
+    analyzer.analyze("default", db_session)
+    assert len(calls) == 1
+
+    db_session.add(models.RawEntity(primary_label="E", enrichment_status="pending"))
+    db_session.commit()
+    assert analyzer.metrics("default", db_session).total == 5
+    assert len(calls) == 2
+
+    invalidate_gap_cache()
+    analyzer.metrics("default", db_session)
+    assert len(calls) == 3
+
+
+def test_dimension_gap_reported(db_session):
+    _seed(db_session)
+    gaps = GapAnalyzer().analyze("default", db_session)
+    dim = next(g for g in gaps if g.category == "dimensions" and "Type" in g.title)
+    assert dim.affected_count == 3 and dim.severity == "critical"
+    concepts = next(g for g in gaps if g.category == "concepts")
+    assert concepts.affected_count == 2 and concepts.total_count == 3
@@ -0,0 +1,97 @@
+"""
+Sprint 112 — Cached, versioned domain context snapshots.
+
+  - repeated snapshots reuse the assembled context and LLM text
+  - entity writes (write stamp) and explicit invalidation trigger rebuilds
+  - the version moves only when the content changes
+  - the RAG path reports the version of the context it injected
+"""
+from __future__ import annotations
+
+from unittest.mock import patch
+
+import pytest
+
+from backend import models
+from backend.context_engine import ContextEngine, invalidate_context_cache
+
+
+@pytest.fixture(autouse=True)
+def _fresh_cache():
+    invalidate_context_cache()
+    yield
+    invalidate_context_cache()
+
+
+def _assemble_calls():
+    return patch.object(ContextEngine, "_assemble", autospec=True, side_effect=ContextEngine._assemble)
+
+
+class TestSnapshotCache:
+    def test_reused_while_unchanged(self, db_session):
+        engine = ContextEngine()
+        with _assemble_calls() as assemble:
+            a = engine.snapshot("default", db_session)
+            b = ContextEngine().snapshot("default", db_session)
+        assert assemble.call_count == 1
+        assert b is a
+        assert a.text == engine.format_for_llm(a.context)
+        assert a.context["version"] == a.version
+        assert engine.build_domain_context("default", db_session) is a.context
+
+    def test_entity_write_rebuilds_and_bumps_version(self, db_session):
+        engine = ContextEngine()
+        before = engine.snapshot("default", db_session)
+        db_session.add(models.RawEntity(primary_label="ctx-cache-probe", domain="default"))
+        db_session.commit()
+        after = engine.snapshot("default", db_session)
+        assert after.version == before.version + 1
+        assert after.context["entity_stats"]["total"] == before.context["entity_stats"]["total"] + 1
+
+    def test_unchanged_rebuild_keeps_version(self, db_session):
+        engine = ContextEngine()
+        first = engine.snapshot("default", db_session)
+        invalidate_context_cache()
+        with _assemble_calls() as assemble:
+            again = engine.snapshot("default", db_session)
+        assert assemble.call_count == 1
+        assert again.version == first.version
+        assert again.context["generated_at"] == first.context["generated_at"]
+
+    def test_domains_cached_separately(self, db_session):
+        engine = ContextEngine()
+        default = engine.snapshot("default", db_session)
+        science = engine.snapshot("science", db_session)
+        assert science.context["domain_id"] == "science"
+        invalidate_context_cache("science")
+        with _assemble_calls() as assemble:
+            assert engine.snapshot("default", db_session) is default
+        assert assemble.call_count == 0
+
+
+def test_entity_cache_invalidation_hook(db_session):
+    from backend.routers.deps import _invalidate_entity_caches
+
+    engine = ContextEngine()
+    engine.snapshot("default", db_session)
+    _invalidate_entity_caches()
+    with _assemble_calls() as assemble:
+        engine.snapshot("default", db_session)
+    assert assemble.call_count == 1
+
+
+def test_snapshot_endpoint_has_version(client, auth_headers):
+    data = client.get("/context/snapshot/default", headers=auth_headers).json()
+    again = client.get("/context/snapshot/default", headers=auth_headers).json()
+    assert data["version"] >= 1
+    assert again == data
+
+
+def test_rag_reports_context_version(client, auth_headers):
+    r = client.post("/rag/query", headers=auth_headers, json={
+        "question": "What is in the catalog?", "use_context": True, "domain_id": "default",
+    })
+    assert r.status_code == 200
+    data = r.json()
+    assert data["context_injected"] is True
+    assert isinstance(data["context_version"], int)
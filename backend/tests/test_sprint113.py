@@ -0,0 +1,177 @@
+"""
+Sprint 113 — Shared schema registry with hot reload and attribute plans.
+
+  - domain YAML files are re-read only when their mtime / size changes
+  - unchanged domains keep their schema object; broken edits keep the old one
+  - save / delete / reload move the registry generation and swap the mapping
+    (copy-on-write) instead of mutating it under concurrent readers
+  - DomainSchema.plan partitions attributes once per schema object
+"""
+from __future__ import annotations
+
+import os
+import threading
+
+import pytest
+import yaml
+
+import backend.schema_registry as sr_mod
+from backend.schema_registry import AttributeSchema, DomainSchema, SchemaRegistry, registry
+
+
+def _domain(domain_id: str, *attrs: tuple) -> dict:
+    return {
+        "id": domain_id, "name": domain_id.title(), "description": "d",
+        "primary_entity": "Thing",
+        "attributes": [
+            {"name": n, "type": t, "label": n, "is_core": core} for n, t, core in attrs
+        ],
+    }
+
+
+def _write(path, data, mtime_ns=None):
+    with open(path, "w", encoding="utf-8") as f:
+        if isinstance(data, dict):
+            yaml.safe_dump(data, f)
+        else:
+            f.write(data)
+    if mtime_ns is not None:
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+@pytest.fixture()
+def domains_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(sr_mod, "SCHEMA_RELOAD_INTERVAL", 0)
+    d = tmp_path / "domains"
+    d.mkdir()
+    _write(d / "alpha.yaml", _domain("alpha", ("phase", "string", False)), 1_000)
+    _write(d / "beta.yaml", _domain("beta", ("status", "string", True)), 1_000)
+    return d
+
+
+class TestHotReload:
+    def test_picks_up_added_changed_and_removed_files(self, domains_dir):
+        reg = SchemaRegistry(str(domains_dir))
+        alpha, beta = reg.get_domain("alpha"), reg.get_domain("beta")
+        gen = reg.generation
+
+        _write(domains_dir / "gamma.yaml", _domain("gamma", ("x", "integer", False)))
+        _write(domains_dir / "beta.yaml", _domain("beta", ("status", "string", True),
+                                                  ("region", "string", False)), 2_000)
+        os.remove(domains_dir / "alpha.yaml")
+
+        assert reg.get_domain("alpha") is None
+        assert reg.get_domain("gamma") is not None
+        assert [a.name for a in reg.get_domain("beta").attributes] == ["status", "region"]
+        assert reg.get_domain("beta") is not beta
+        assert reg.generation == gen + 1
+        assert alpha.id == "alpha"   # old objects stay usable
+
+    def test_unchanged_files_keep_their_objects(self, domains_dir):
+        reg = SchemaRegistry(str(domains_dir))
+        alpha = reg.get_domain("alpha")
+        gen = reg.generation
+        _write(domains_dir / "beta.yaml", _domain("beta", ("status", "string", False)), 3_000)
+        assert reg.get_domain("alpha") is alpha
+        assert reg.generation == gen + 1
+
+    def test_broken_edit_keeps_previous_schema(self, domains_dir):
+        reg = SchemaRegistry(str(domains_dir))
+        alpha = reg.get_domain("alpha")
+        _write(domains_dir / "alpha.yaml", "id: alpha\nattributes: [", 4_000)
+        assert reg.get_domain("alpha") is alpha
+
+    def test_reload_interval_throttles_scans(self, domains_dir, monkeypatch):
+        monkeypatch.setattr(sr_mod, "SCHEMA_RELOAD_INTERVAL", 3600)
+        reg = SchemaRegistry(str(domains_dir))
+        _write(domains_dir / "gamma.yaml", _domain("gamma"))
+        assert reg.get_domain("gamma") is None
+
+    def test_save_and_delete(self, domains_dir):
+        reg = SchemaRegistry(str(domains_dir))
+        gen = reg.generation
+        schema = DomainSchema(**_domain("delta", ("phase", "string", False)))
+        reg.save_domain(schema)
+        assert reg.get_domain("delta") is schema   # its own write is not re-read
+        assert reg.delete_domain("delta") is True
+        assert reg.get_domain("delta") is None
+        assert reg.generation == gen + 2
+
+    def test_reload_swaps_the_mapping(self, domains_dir):
+        reg = SchemaRegistry(str(domains_dir))
+        before = reg.domains
+        _write(domains_dir / "gamma.yaml", _domain("gamma"))
+        reg.get_domain("gamma")
+        reg.save_domain(DomainSchema(**_domain("delta")))
+        reg.delete_domain("beta")
+        assert set(before) == {"alpha", "beta"}   # readers' mapping is never mutated
+        assert set(reg.domains) == {"alpha", "gamma", "delta"}
+
+    def test_concurrent_reload_and_iteration(self, domains_dir):
+        reg = SchemaRegistry(str(domains_dir))
+        stop, errors = threading.Event(), []
+
+        def churn():
+            i = 0
+            while not stop.is_set():
+                i += 1
+                _write(domains_dir / f"tmp{i % 20}.yaml", _domain(f"tmp{i % 20}"), 5_000 + i)
+                reg.get_domain("alpha")
+                if i % 3 == 0:
+                    os.remove(domains_dir / f"tmp{i % 20}.yaml")
+
+        t = threading.Thread(target=churn)
+        t.start()
+        try:
+            for _ in range(2_000):
+                try:
+                    [d.id for d in reg.get_all_domains()]
+                except RuntimeError as e:   # dictionary changed size during iteration
+                    errors.append(e)
+        finally:
+            stop.set()
+            t.join()
+        assert errors == []
+
+
+class TestAttributePlan:
+    def test_partitions(self):
+        schema = DomainSchema(**_domain(
+            "plan",
+            ("title", "string", False),
+            ("status", "string", True),
+            ("quality_score", "float", True),
+            ("phase", "string", False),
+            ("bad name", "string", False),
+        ))
+        plan = schema.plan
+        assert plan is schema.plan   # computed once
+        assert [a.name for a in plan.core] == ["status", "quality_score"]
+        assert [a.name for a in plan.json] == ["title", "phase"]
+        assert [a.name for a in plan.dimensions] == ["status", "quality_score", "phase"]
+        assert plan.correlation_fields == ("status", "quality_score", "phase")
+        assert [a.name for a in plan.core_strings] == ["status"]
+        assert set(plan.by_name) == {"title", "status", "quality_score", "phase", "bad name"}
+
+    def test_builtin_domain_plans(self):
+        health = registry.get_domain("healthcare")
+        assert "phase" in {a.name for a in health.plan.json}
+        assert "nct_id" not in health.plan.correlation_fields
+        assert "title" not in {a.name for a in health.plan.dimensions}
+
+
+def test_projected_attributes_follow_generation(monkeypatch):
+    import backend.olap_store as store_mod
+    from backend.olap_store import projected_attributes
+
+    monkeypatch.setattr(store_mod, "_projected", (-1, None))
+    spec = projected_attributes()
+    assert spec["phase"] == "VARCHAR"
+    extra = DomainSchema(
+        id="sprint113_extra", name="x", description="x", primary_entity="x",
+        attributes=[AttributeSchema(name="sprint113_score", type="float", label="s")],
+    )
+    monkeypatch.setitem(registry.domains, extra.id, extra)
+    assert "sprint113_score" not in projected_attributes()   # same generation: cached
+    monkeypatch.setattr(registry, "generation", registry.generation + 1)
+    assert projected_attributes()["sprint113_score"] == "DOUBLE"
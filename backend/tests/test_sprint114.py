@@ -0,0 +1,177 @@
+"""
+Sprint 114 — Shared Arrow snapshot of the OLAP replica.
+
+  - analytic columns as one Arrow table, categoricals dictionary-encoded
+  - inserts are appended past the id watermark; updates / deletes and rows
+    committed below the watermark rebuild
+  - published snapshots are immutable
+  - correlation analysis, gap metrics, the executive dashboard and the
+    report builder's entity KPIs read the shared snapshot
+"""
+from __future__ import annotations
+
+import json
+from datetime import datetime
+
+import pyarrow as pa
+import pytest
+from sqlalchemy import create_engine, delete, update
+from sqlalchemy.pool import StaticPool
+
+import backend.analyzers.correlation as corr
+import backend.olap_snapshot as snap_mod
+from backend import models
+from backend.olap_store import OLAPStore
+
+_t = models.RawEntity.__table__
+
+
+def _row(i, phase, domain="healthcare"):
+    return {"primary_label": f"t{i}", "domain": domain, "entity_type": "trial",
+            "normalized_json": json.dumps({"phase": phase, "category": f"c{i % 2}"})}
+
+
+@pytest.fixture()
+def source():
+    eng = create_engine("sqlite://", poolclass=StaticPool,
+                        connect_args={"check_same_thread": False})
+    models.Base.metadata.create_all(bind=eng, tables=[_t])
+    with eng.begin() as conn:
+        conn.execute(_t.insert(), [_row(i, ["I", "II"][i % 2]) for i in range(6)])
+        conn.execute(_t.insert(), [_row(9, "III", domain="default")])
+    return eng
+
+
+@pytest.fixture()
+def store(source):
+    return OLAPStore(":memory:", source_engine=source)
+
+
+def _insert(source, *rows):
+    with source.begin() as conn:
+        conn.execute(_t.insert(), list(rows))
+
+
+def test_columns_and_encoding(store):
+    snap = store.snapshot()
+    table = snap.table
+    assert table.num_rows == 7 and snap.watermark == 7
+    assert "normalized_json" not in table.column_names
+    assert pa.types.is_dictionary(table.schema.field("domain").type)
+    assert pa.types.is_dictionary(table.schema.field("phase").type)
+    assert pa.types.is_string(table.schema.field("primary_label").type)
+    assert store.snapshot() is snap   # unchanged replica: same object
+
+
+def test_domain_slice(store):
+    health = store.snapshot().domain("healthcare", ["phase", "domain"])
+    assert health.column_names == ["phase", "domain"]
+    assert sorted(health["phase"].to_pylist()) == ["I", "I", "I", "II", "II", "II"]
+
+
+def test_inserts_are_appended(store, source):
+    first = store.snapshot()
+    _insert(source, _row(10, "IV"), _row(11, "IV"))
+    second = store.snapshot()
+    assert second.version > first.version
+    assert second.watermark == 9
+    assert second.table.num_rows == 9
+    assert second.table["phase"].num_chunks == 2        # appended, not re-read
+    assert first.table.num_rows == 7                      # published snapshot untouched
+    assert second.domain("healthcare", ["phase"])["phase"].to_pylist()[-2:] == ["IV", "IV"]
+
+
+def test_update_and_delete_rebuild(store, source):
+    store.snapshot()
+    with source.begin() as conn:
+        conn.execute(update(_t).where(_t.c.id == 1).values(
+            normalized_json=json.dumps({"phase": "III"}), updated_at=datetime(2030, 1, 1),
+        ))
+    updated = store.snapshot()
+    assert updated.table["phase"].num_chunks == 1
+    assert updated.domain("healthcare", ["id", "phase"]).to_pylist()[0] == {"id": 1, "phase": "III"}
+
+    with source.begin() as conn:
+        conn.execute(delete(_t).where(_t.c.id == 2))
+    after_delete = store.snapshot()
+    assert after_delete.table.num_rows == 6
+    assert 2 not in after_delete.table["id"].to_pylist()
+
+
+def test_late_commit_below_watermark_rebuilds(store, source):
+    first = store.snapshot()
+    # Committed after id 7 with a lower id (concurrent writers on PostgreSQL)
+    with source.begin() as conn:
+        conn.execute(delete(_t).where(_t.c.id == 3))
+    store.snapshot()
+    _insert(source, {**_row(3, "late"), "id": 3, "updated_at": datetime(2000, 1, 1)})
+    late = store.snapshot()
+    assert late.version > first.version
+    assert "late" in late.domain("healthcare", ["phase"])["phase"].to_pylist()
+
+
+def test_compaction_unifies_dictionaries(store, source, monkeypatch):
+    monkeypatch.setattr(snap_mod, "COMPACT_CHUNKS", 1)
+    store.snapshot()
+    _insert(source, _row(20, "V"))
+    table = store.snapshot().table
+    assert table["phase"].num_chunks == 1
+    assert set(table["phase"].chunk(0).dictionary.to_pylist()) == {"I", "II", "III", "V"}
+
+
+def test_correlation_reads_shared_snapshot(store, monkeypatch):
+    monkeypatch.setattr(corr, "olap_store", store)
+    res = corr.CorrelationAnalyzer(workers=1).top_correlations("healthcare")
+    assert res["n_entities"] == 6
+    pair = next(c for c in res["correlations"] if {c["field_a"], c["field_b"]} == {"phase", "category"})
+    assert pair["cramers_v"] == 1.0
+    assert store.snapshot().version == store.version
+
+
+def test_gap_metrics_from_snapshot(store):
+    from backend.analyzers.gap_detector import compute_gap_metrics
+
+    m = compute_gap_metrics(store.snapshot().table, (2, 1), ["entity_type", "domain"])
+    assert (m.total, m.not_enriched, m.enriched, m.scored) == (7, 7, 0, 0)
+    assert (m.authority_total, m.authority_pending) == (2, 1)
+    assert m.missing == {"entity_type": 0, "domain": 0}
+
+
+def _kpi_rows():
+    keys = ("primary_label", "domain", "entity_type", "enrichment_status", "enrichment_citation_count",
+            "secondary_label", "quality_score", "validation_status")
+    return [dict(zip(keys, r), enrichment_source="openalex") for r in [
+        ("a", None, "paper", "completed", 10, "X", 0.9, "valid"),
+        ("b", "default", "paper", "completed", None, "", 0.2, "pending"),
+        ("c", "default", None, "pending", 5, "X", None, "pending"),
+    ]]
+
+
+def test_dashboard_kpis_from_snapshot(store, source, monkeypatch):
+    import backend.routers.analytics as analytics
+
+    monkeypatch.setattr(analytics, "olap_store", store)
+    _insert(source, *_kpi_rows())
+    res = analytics._domain_snapshot("default")
+    assert res["kpis"] | {"total_concepts": 0} == {
+        "total_entities": 4, "enriched_count": 2, "enrichment_pct": 50.0,
+        "avg_citations": 10.0, "total_concepts": 0,
+    }
+    assert res["type_distribution"] == [{"type": "paper", "count": 2}, {"type": "trial", "count": 1}]
+    assert [(e["primary_label"], e["citation_count"]) for e in res["top_entities"]] == [("a", 10), ("b", 0)]
+    assert res["brand_year_matrix"] == {"brands": ["X"], "years": ["default"], "matrix": [[2]]}
+    assert res["quality"] == {"average": 0.55, "distribution": {"high": 1, "medium": 0, "low": 1}}
+    assert analytics._domain_snapshot("all")["kpis"]["total_entities"] == 10
+    assert analytics._domain_snapshot("healthcare")["kpis"]["total_entities"] == 6
+
+
+def test_report_sections_from_snapshot(store, source, monkeypatch):
+    import backend.report_builder as rb
+
+    monkeypatch.setattr(rb, "olap_store", store)
+    _insert(source, *_kpi_rows())
+    stats = rb._section_entity_stats(None)
+    assert ">10<" in stats and "20% coverage" in stats and "10% of total" in stats
+    coverage = rb._section_enrichment_coverage(None)
+    assert "2 of 10 entities" in coverage and coverage.index("<td>a</td>") < coverage.index("<td>b</td>")
+    assert "<td>X</td>\n            <td>2</td>" in rb._section_top_brands(None)
@@ -0,0 +1,135 @@
+"""
+Sprint 115 — Cached CSR relationship graph.
+
+  - sparse PageRank matches the original dict-based iteration
+  - csgraph components match a BFS partition
+  - the graph is cached and rebuilt on inserts, deletes and repoints
+  - relationship routes invalidate the cache
+"""
+from __future__ import annotations
+
+from collections import defaultdict
+
+import numpy as np
+from sqlalchemy import update
+
+from backend import models
+from backend.graph_analytics import CSRGraph, graph_cache, invalidate_graph_cache, pagerank
+
+
+def _reference_pagerank(edges, damping=0.85, max_iter=100, tol=1e-6):
+    """The Sprint 73 dict-of-lists implementation."""
+    nodes = {n for e in edges for n in e[:2]}
+    out_n, in_n = defaultdict(list), defaultdict(list)
+    for s, d, _, _ in edges:
+        out_n[s].append(d)
+        in_n[d].append(s)
+    N = len(nodes)
+    rank = {n: 1.0 / N for n in nodes}
+    for _ in range(max_iter):
+        new = {n: (1 - damping) / N + sum(damping * rank[p] / len(out_n[p]) for p in in_n[n])
+               for n in nodes}
+        diff = sum(abs(new[n] - rank[n]) for n in nodes)
+        rank = new
+        if diff < tol:
+            break
+    total = sum(rank.values())
+    return {n: v / total for n, v in rank.items()}
+
+
+def _random_edges(seed=7, n_nodes=60, n_edges=150):
+    rng = np.random.default_rng(seed)
+    ids = rng.choice(10_000, n_nodes, replace=False)
+    return [
+        (int(ids[a]), int(ids[b]), str(rng.choice(["cites", "related-to"])), 1.0)
+        for a, b in rng.integers(0, n_nodes, size=(n_edges, 2)) if a != b
+    ]
+
+
+def _entity(db, label):
+    e = models.RawEntity(primary_label=label, domain="default")
+    db.add(e)
+    db.commit()
+    return e
+
+
+def _rel(db, src, dst, rel="cites"):
+    r = models.EntityRelationship(source_id=src, target_id=dst, relation_type=rel, weight=1.0)
+    db.add(r)
+    db.commit()
+    return r
+
+
+class TestCSRGraph:
+    def test_pagerank_matches_reference(self):
+        edges = _random_edges()
+        expected = _reference_pagerank(edges)
+        got = pagerank(edges)
+        assert got.keys() == expected.keys()
+        assert max(abs(got[n] - expected[n]) for n in got) < 1e-5
+
+    def test_components_match_bfs_partition(self):
+        edges = _random_edges(seed=3, n_nodes=80, n_edges=50)
+        g = CSRGraph(edges)
+        adj = defaultdict(set)
+        for s, d, _, _ in edges:
+            adj[s].add(d)
+            adj[d].add(s)
+        for node, comp in g.components.items():
+            members = {n for n, c in g.components.items() if c == comp}
+            seen, stack = {node}, [node]
+            while stack:
+                for nb in adj[stack.pop()] - seen:
+                    seen.add(nb)
+                    stack.append(nb)
+            assert members == seen
+
+    def test_degree_and_rank(self):
+        edges = [(10, 40, "cites", 1.0), (20, 40, "cites", 1.0),
+                 (30, 40, "related-to", 1.0), (10, 20, "cites", 1.0)]
+        g = CSRGraph(edges)
+        assert g.degree(40)["in_by_type"] == {"cites": 2, "related-to": 1}
+        assert g.degree(10)["out_degree"] == 2
+        assert g.degree(99)["total_degree"] == 0
+        assert g.top_degree(2) == [(40, 3), (10, 2)]
+        assert g.rank_order[0] == 40 and g.rank_of(40) == 1
+        assert g.rank_of(99) is None
+
+
+class TestGraphCache:
+    def test_reused_until_relationships_change(self, db_session):
+        a, b, c = (_entity(db_session, f"G{i}").id for i in range(3))
+        invalidate_graph_cache()
+        _rel(db_session, a, b)
+        first = graph_cache.get(db_session)
+        assert graph_cache.get(db_session) is first
+        _rel(db_session, b, c)
+        second = graph_cache.get(db_session)
+        assert second is not first and second.n_edges == 2
+
+    def test_repoint_is_detected(self, db_session):
+        a, b, c = (_entity(db_session, f"R{i}").id for i in range(3))
+        rel = _rel(db_session, a, b)
+        assert graph_cache.get(db_session).components[a] == graph_cache.get(db_session).components[b]
+        db_session.execute(update(models.EntityRelationship.__table__)
+                           .where(models.EntityRelationship.__table__.c.id == rel.id)
+                           .values(target_id=c))
+        db_session.commit()
+        g = graph_cache.get(db_session)
+        assert g.index_of(b) is None and g.index_of(c) is not None
+
+    def test_routes_invalidate(self, client, editor_headers, auth_headers, db_session):
+        a, b = (_entity(db_session, f"W{i}").id for i in range(2))
+        graph_cache.get(db_session)
+        r = client.post(f"/entities/{a}/relationships", headers=editor_headers,
+                        json={"target_id": b, "relation_type": "cites"})
+        assert r.status_code == 201
+        assert graph_cache._entry is None
+        stats = client.get("/graph/stats", headers=auth_headers).json()
+        assert stats["total_edges"] == 1
+        assert stats["top_degree"][0]["total_degree"] == 1
+
+        graph_cache.get(db_session)
+        assert client.delete(f"/relationships/{r.json()['id']}", headers=editor_headers).status_code == 204
+        assert graph_cache._entry is None
+        assert client.get("/graph/stats", headers=auth_headers).json()["total_edges"] == 0
@@ -0,0 +1,130 @@
+"""
+Sprint 91 — Bulk entity merge tests.
+
+  - bulk_merge_entities merges many groups, deletes secondaries in chunks
+  - relationships / annotations are repointed, self-loops dropped
+  - POST /entities/link/merge-bulk validation and auth
+"""
+from __future__ import annotations
+
+from backend import models
+from backend import entity_linker
+
+
+def _seed(db, label, **kwargs):
+    e = models.RawEntity(primary_label=label, **kwargs)
+    db.add(e)
+    db.commit()
+    db.refresh(e)
+    return e
+
+
+class TestBulkMergeEngine:
+    def test_merges_groups_and_deletes_secondaries(self, db_session, monkeypatch):
+        monkeypatch.setattr(entity_linker, "_MERGE_CHUNK", 2)
+        p1 = _seed(db_session, "Alpha")
+        s1 = _seed(db_session, "Alpha", canonical_id="A-1", enrichment_citation_count=7)
+        p2 = _seed(db_session, "Beta", canonical_id="B")
+        s2 = _seed(db_session, "Beta Long Name", canonical_id="B-22")
+        s3 = _seed(db_session, "Beta", enrichment_status="completed")
+
+        result = entity_linker.bulk_merge_entities(db_session, [
+            {"primary_id": p1.id, "secondary_ids": [s1.id], "strategy": "keep_non_empty"},
+            {"primary_id": p2.id, "secondary_ids": [s2.id, s3.id], "strategy": "keep_longest"},
+        ])
+
+        assert result["groups_merged"] == 2
+        assert result["deleted_count"] == 3
+        db_session.expire_all()
+        a = db_session.get(models.RawEntity, p1.id)
+        assert a.canonical_id == "A-1"
+        assert a.enrichment_citation_count == 7
+        b = db_session.get(models.RawEntity, p2.id)
+        assert b.primary_label == "Beta Long Name"
+        assert b.canonical_id == "B-22"
+        assert b.enrichment_status == "completed"
+        remaining = {e.id for e in db_session.query(models.RawEntity).all()}
+        assert remaining == {p1.id, p2.id}
+
+    def test_references_are_repointed(self, db_session):
+        p = _seed(db_session, "Paper")
+        s = _seed(db_session, "Paper (dup)")
+        other = _seed(db_session, "Other")
+        db_session.add_all([
+            models.EntityRelationship(source_id=s.id, target_id=other.id, relation_type="cites"),
+            models.EntityRelationship(source_id=p.id, target_id=s.id, relation_type="related-to"),
+            models.Annotation(entity_id=s.id, author_id=1, author_name="t", content="note"),
+            models.LinkDismissal(entity_a_id=min(s.id, other.id), entity_b_id=max(s.id, other.id)),
+        ])
+        db_session.commit()
+
+        result = entity_linker.bulk_merge_entities(
+            db_session, [{"primary_id": p.id, "secondary_ids": [s.id], "strategy": "keep_primary"}]
+        )
+        assert result["references_updated"] >= 3
+
+        rels = db_session.query(models.EntityRelationship).all()
+        assert [(r.source_id, r.target_id) for r in rels] == [(p.id, other.id)]
+        note = db_session.query(models.Annotation).one()
+        assert note.entity_id == p.id
+        assert db_session.query(models.LinkDismissal).count() == 0
+
+    def test_overlapping_groups_rejected(self, db_session):
+        a = _seed(db_session, "A")
+        b = _seed(db_session, "B")
+        c = _seed(db_session, "C")
+        try:
+            entity_linker.bulk_merge_entities(db_session, [
+                {"primary_id": a.id, "secondary_ids": [b.id], "strategy": "keep_primary"},
+                {"primary_id": c.id, "secondary_ids": [b.id], "strategy": "keep_primary"},
+            ])
+        except ValueError as exc:
+            assert "overlap" in str(exc)
+        else:
+            raise AssertionError("expected ValueError")
+
+    def test_single_merge_repoints_relationships(self, db_session):
+        p = _seed(db_session, "Keep")
+        s = _seed(db_session, "Drop")
+        other = _seed(db_session, "Other")
+        db_session.add(models.EntityRelationship(
+            source_id=other.id, target_id=s.id, relation_type="cites"
+        ))
+        db_session.commit()
+        entity_linker.merge_entities(db_session, p.id, [s.id])
+        rel = db_session.query(models.EntityRelationship).one()
+        assert rel.target_id == p.id
+
+
+class TestBulkMergeEndpoint:
+    def test_bulk_merge_endpoint(self, client, db_session, editor_headers):
+        p = _seed(db_session, "Gamma")
+        s = _seed(db_session, "Gamma", secondary_label="Acme")
+        r = client.post("/entities/link/merge-bulk", json={"groups": [
+            {"primary_id": p.id, "secondary_ids": [s.id]},
+        ]}, headers=editor_headers)
+        assert r.status_code == 200
+        assert r.json()["deleted_count"] == 1
+        db_session.expire_all()
+        assert db_session.get(models.RawEntity, p.id).secondary_label == "Acme"
+
+    def test_unknown_strategy_returns_400(self, client, db_session, editor_headers):
+        p = _seed(db_session, "X")
+        s = _seed(db_session, "Y")
+        r = client.post("/entities/link/merge-bulk", json={"groups": [
+            {"primary_id": p.id, "secondary_ids": [s.id], "strategy": "coin_flip"},
+        ]}, headers=editor_headers)
+        assert r.status_code == 400
+
+    def test_missing_primary_returns_404(self, client, db_session, editor_headers):
+        s = _seed(db_session, "Y")
+        r = client.post("/entities/link/merge-bulk", json={"groups": [
+            {"primary_id": 999999, "secondary_ids": [s.id]},
+        ]}, headers=editor_headers)
+        assert r.status_code == 404
+
+    def test_viewer_forbidden(self, client, viewer_headers):
+        r = client.post("/entities/link/merge-bulk", json={"groups": [
+            {"primary_id": 1, "secondary_ids": [2]},
+        ]}, headers=viewer_headers)
+        assert r.status_code == 403
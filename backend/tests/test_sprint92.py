@@ -0,0 +1,158 @@
+"""
+Sprint 92 — Probabilistic record linkage (Fellegi–Sunter + EM) tests.
+
+  - comparison vectors: text levels, exact agreement, missing values
+  - EM learns agreement weights > disagreement weights
+  - per-domain persistence via POST /linker/model/train + GET /linker/model
+  - GET /linker/candidates?method=probabilistic
+"""
+from __future__ import annotations
+
+import numpy as np
+
+from backend import models, record_linkage
+from backend.record_linkage import (
+    COMPARISONS,
+    EntityColumns,
+    candidate_pairs,
+    comparison_vectors,
+    fit_em,
+)
+
+
+def _cols(rows: list[dict]) -> EntityColumns:
+    fields = [f for f, _ in COMPARISONS]
+    return EntityColumns(
+        ids=np.arange(1, len(rows) + 1, dtype=np.int64),
+        values={f: [r.get(f) for r in rows] for f in fields},
+    )
+
+
+def _k(field: str) -> int:
+    return [f for f, _ in COMPARISONS].index(field)
+
+
+def _seed_duplicates(db, domain="science", n=30):
+    for i in range(n):
+        label = f"Deep learning study number {i} on protein folding"
+        for variant in (label, label.upper() + "."):
+            db.add(models.RawEntity(
+                primary_label=variant, secondary_label=f"Lab {i}",
+                canonical_id=f"ID-{i}", entity_type="paper", domain=domain,
+            ))
+        db.add(models.RawEntity(
+            primary_label=f"Deep learning review {i * 7} of graph methods",
+            secondary_label="Other Lab", canonical_id=f"X-{i}",
+            entity_type="review", domain=domain,
+        ))
+    db.commit()
+
+
+class TestComparisonVectors:
+    def test_levels_and_missing(self):
+        cols = _cols([
+            {"primary_label": "Apple Inc", "canonical_id": "A-1", "entity_type": "org"},
+            {"primary_label": "apple, inc.", "canonical_id": "a1", "entity_type": "org"},
+            {"primary_label": "Banana Republic", "canonical_id": None, "entity_type": "brand"},
+        ])
+        a = np.array([0, 0])
+        b = np.array([1, 2])
+        gamma = comparison_vectors(cols, a, b)
+        assert gamma.shape == (2, len(COMPARISONS))
+        assert gamma[0, _k("primary_label")] == 2
+        assert gamma[1, _k("primary_label")] == 0
+        assert gamma[0, _k("canonical_id")] == 1
+        assert gamma[1, _k("canonical_id")] == -1
+        assert gamma[0, _k("secondary_label")] == -1
+        assert gamma[1, _k("entity_type")] == 0
+
+    def test_blocking_groups_by_label_and_identifier(self):
+        cols = _cols([
+            {"primary_label": "Protein folding", "canonical_id": "P1"},
+            {"primary_label": "folding protein", "canonical_id": None},
+            {"primary_label": "Unrelated", "canonical_id": "P1"},
+            {"primary_label": "Zebra"},
+        ])
+        a, b = candidate_pairs(cols)
+        pairs = set(zip(a.tolist(), b.tolist()))
+        assert (0, 1) in pairs
+        assert (0, 2) in pairs
+        assert all(x < y for x, y in pairs)
+        assert not any(3 in p for p in pairs)
+
+
+class TestEM:
+    def test_agreement_weights_exceed_disagreement(self):
+        rng = np.random.default_rng(1)
+        n_match, n_non = 300, 2700
+        matches = np.column_stack([
+            rng.choice(3, n_match, p=[0.05, 0.15, 0.80]),
+            rng.choice(3, n_match, p=[0.10, 0.20, 0.70]),
+            rng.choice(2, n_match, p=[0.10, 0.90]),
+            np.full(n_match, -1),
+            rng.choice(2, n_match, p=[0.05, 0.95]),
+            np.ones(n_match),
+        ])
+        non = np.column_stack([
+            rng.choice(3, n_non, p=[0.80, 0.15, 0.05]),
+            rng.choice(3, n_non, p=[0.85, 0.10, 0.05]),
+            rng.choice(2, n_non, p=[0.98, 0.02]),
+            np.full(n_non, -1),
+            rng.choice(2, n_non, p=[0.50, 0.50]),
+            np.ones(n_non),
+        ])
+        gamma = np.vstack([matches, non]).astype(np.int8)
+        params = fit_em(gamma)
+
+        w = params.weights()
+        assert w[_k("primary_label")][2] > 0 > w[_k("primary_label")][0]
+        assert w[_k("canonical_id")][1] > 0 > w[_k("canonical_id")][0]
+        assert 0.03 < params.prior < 0.3
+        prob = params.match_probability(gamma)
+        assert prob[:n_match].mean() > 0.7
+        assert prob[n_match:].mean() < 0.2
+
+
+class TestLinkageEndpoints:
+    def test_train_persists_per_domain(self, client, db_session, editor_headers):
+        _seed_duplicates(db_session)
+        r = client.post("/linker/model/train?domain=science", headers=editor_headers)
+        assert r.status_code == 200, r.text
+        body = r.json()
+        assert body["domain"] == "science"
+        assert body["pairs_trained"] > 0
+        assert body["weights"]["primary_label"][2] > body["weights"]["primary_label"][0]
+
+        r2 = client.get("/linker/model?domain=science", headers=editor_headers)
+        assert r2.status_code == 200
+        assert r2.json()["prior"] == body["prior"]
+        assert client.get("/linker/model?domain=healthcare",
+                          headers=editor_headers).status_code == 404
+
+    def test_probabilistic_candidates(self, client, db_session, auth_headers, editor_headers):
+        _seed_duplicates(db_session, n=10)
+        client.post("/linker/model/train?domain=science", headers=editor_headers)
+        r = client.get("/linker/candidates?method=probabilistic&domain=science&threshold=0.8",
+                       headers=auth_headers)
+        assert r.status_code == 200
+        data = r.json()
+        assert len(data) >= 5
+        for pair in data:
+            assert pair["entity_a"]["canonical_id"] == pair["entity_b"]["canonical_id"]
+            assert pair["score"] >= 0.8
+        assert "canonical_id" in data[0]["matched_fields"]
+
+    def test_train_requires_editor(self, client, viewer_headers):
+        r = client.post("/linker/model/train", headers=viewer_headers)
+        assert r.status_code == 403
+
+    def test_unknown_method_rejected(self, client, auth_headers):
+        r = client.get("/linker/candidates?method=magic", headers=auth_headers)
+        assert r.status_code == 422
+
+
+def test_score_candidates_without_stored_model(db_session):
+    _seed_duplicates(db_session, n=8)
+    pairs = record_linkage.score_candidates(db_session, "science", threshold=0.5, limit=50)
+    assert pairs
+    assert db_session.query(models.LinkageModel).count() == 0
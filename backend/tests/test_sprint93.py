@@ -0,0 +1,102 @@
+"""
+Sprint 93 — Set-based harmonization steps.
+
+  - SQL step expressions match the former per-row Python semantics
+  - preview counts / samples without writing
+  - apply captures change records via INSERT … SELECT and undo restores them
+"""
+from __future__ import annotations
+
+from backend import models
+from backend.harmonization import engine
+
+
+def _seed(db, **kwargs):
+    e = models.RawEntity(**kwargs)
+    db.add(e)
+    db.commit()
+    db.refresh(e)
+    return e
+
+
+class TestStepExpressions:
+    def test_normalize_labels_collapses_whitespace(self, db_session):
+        a = _seed(db_session, primary_label="  Deep \t learning\n ", secondary_label="ok")
+        b = _seed(db_session, primary_label="Clean", secondary_label=None)
+        per_field = engine.apply_step(db_session, engine.SQL_STEPS["normalize_labels"], log_id=1)
+        db_session.commit()
+        db_session.expire_all()
+
+        assert per_field == {"primary_label": 1, "secondary_label": 0}
+        assert db_session.get(models.RawEntity, a.id).primary_label == "Deep learning"
+        assert db_session.get(models.RawEntity, b.id).secondary_label is None
+
+    def test_canonical_blank_becomes_null(self, db_session):
+        a = _seed(db_session, primary_label="x", canonical_id="   ")
+        b = _seed(db_session, primary_label="y", canonical_id=" Q42 ")
+        engine.apply_step(db_session, engine.SQL_STEPS["normalize_canonical_ids"], log_id=1)
+        db_session.commit()
+        db_session.expire_all()
+        assert db_session.get(models.RawEntity, a.id).canonical_id is None
+        assert db_session.get(models.RawEntity, b.id).canonical_id == "Q42"
+
+    def test_entity_type_lowercases_unicode(self, db_session):
+        a = _seed(db_session, primary_label="x", entity_type=" ÉTUDE ")
+        engine.apply_step(db_session, engine.SQL_STEPS["normalize_entity_types"], log_id=1)
+        db_session.commit()
+        db_session.expire_all()
+        assert db_session.get(models.RawEntity, a.id).entity_type == "étude"
+
+    def test_default_validation_only_touches_blank(self, db_session):
+        a = _seed(db_session, primary_label="x")
+        _seed(db_session, primary_label="y", validation_status="")
+        _seed(db_session, primary_label="z", validation_status="confirmed")
+        db_session.query(models.RawEntity).filter_by(id=a.id).update({"validation_status": None})
+        db_session.commit()
+        step = engine.SQL_STEPS["set_default_validation"]
+        assert engine.count_changes(db_session, step) == 2
+        changes = engine.preview_changes(db_session, step, limit=10)
+        assert {c["old_value"] for c in changes} == {None, ""}
+        assert all(c["new_value"] == "pending" for c in changes)
+
+
+class TestHarmonizationEndpoints:
+    def test_preview_does_not_write(self, client, db_session, editor_headers):
+        e = _seed(db_session, primary_label="A  B")
+        r = client.post("/harmonization/preview/normalize_labels", headers=editor_headers)
+        assert r.status_code == 200
+        body = r.json()
+        assert body["total_affected"] == 1
+        assert body["changes"][0] == {
+            "record_id": e.id, "field": "primary_label",
+            "old_value": "A  B", "new_value": "A B",
+        }
+        db_session.expire_all()
+        assert db_session.get(models.RawEntity, e.id).primary_label == "A  B"
+
+    def test_apply_records_changes_and_undo_restores(self, client, db_session, editor_headers):
+        ids = [_seed(db_session, primary_label=f" Label {i} ").id for i in range(5)]
+        r = client.post("/harmonization/apply/normalize_labels", headers=editor_headers)
+        assert r.status_code == 200
+        body = r.json()
+        assert body["records_updated"] == 5
+        assert body["fields_modified"] == ["primary_label"]
+
+        records = db_session.query(models.HarmonizationChangeRecord).filter_by(
+            log_id=body["log_id"]
+        ).all()
+        assert {cr.record_id for cr in records} == set(ids)
+        db_session.expire_all()
+        assert db_session.get(models.RawEntity, ids[0]).primary_label == "Label 0"
+
+        u = client.post(f"/harmonization/undo/{body['log_id']}", headers=editor_headers)
+        assert u.status_code == 200
+        db_session.expire_all()
+        assert db_session.get(models.RawEntity, ids[0]).primary_label == " Label 0 "
+
+    def test_apply_all_is_idempotent(self, client, db_session, editor_headers):
+        _seed(db_session, primary_label=" x ", entity_type="Paper", canonical_id="")
+        first = client.post("/harmonization/apply-all", headers=editor_headers).json()
+        assert sum(s["records_updated"] for s in first["results"]) == 3
+        second = client.post("/harmonization/apply-all", headers=editor_headers).json()
+        assert all(s["records_updated"] == 0 for s in second["results"])
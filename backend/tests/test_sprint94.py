@@ -0,0 +1,111 @@
+"""
+Sprint 94 — Bulk change-record capture and set-based undo/redo.
+
+  - write_change_records batches executemany inserts by chunk size; the
+    fused pipeline and the transformation executor write through it
+  - revert_log restores / re-applies through UPDATE … FROM
+  - /harmonization/undo and /redo round-trip a multi-field step
+"""
+from __future__ import annotations
+
+from backend import models
+from backend.harmonization import engine
+
+
+def _seed(db, **kwargs):
+    e = models.RawEntity(**kwargs)
+    db.add(e)
+    db.commit()
+    db.refresh(e)
+    return e
+
+
+class TestChangeRecordWriter:
+    def test_chunked_insert_from_generator(self, db_session):
+        changes = (
+            {"record_id": i, "field": "primary_label", "old_value": f"o{i}", "new_value": f"n{i}"}
+            for i in range(1, 26)
+        )
+        written = engine.write_change_records(db_session, 7, changes, chunk_size=10)
+        db_session.commit()
+        assert written == 25
+        rows = db_session.query(models.HarmonizationChangeRecord).filter_by(log_id=7).all()
+        assert len(rows) == 25
+        assert rows[-1].new_value == "n25"
+
+    def test_empty_iterable(self, db_session):
+        assert engine.write_change_records(db_session, 1, iter(())) == 0
+
+    def test_changes_keep_their_own_log_ids(self, db_session):
+        changes = [
+            {"log_id": 11 + i % 2, "record_id": i, "field": "primary_label",
+             "old_value": "o", "new_value": "n"}
+            for i in range(5)
+        ]
+        assert engine.write_change_records(db_session, None, changes, chunk_size=2) == 5
+        db_session.commit()
+        q = db_session.query(models.HarmonizationChangeRecord)
+        assert (q.filter_by(log_id=11).count(), q.filter_by(log_id=12).count()) == (3, 2)
+
+
+class TestRevertLog:
+    def test_undo_then_redo(self, db_session):
+        a = _seed(db_session, primary_label="new A", entity_type="paper")
+        b = _seed(db_session, primary_label="new B")
+        engine.write_change_records(db_session, 3, [
+            {"record_id": a.id, "field": "primary_label", "old_value": "old A", "new_value": "new A"},
+            {"record_id": a.id, "field": "entity_type", "old_value": "Paper", "new_value": "paper"},
+            {"record_id": b.id, "field": "primary_label", "old_value": None, "new_value": "new B"},
+            {"record_id": 999_999, "field": "primary_label", "old_value": "x", "new_value": "y"},
+        ])
+        db_session.commit()
+
+        assert engine.revert_log(db_session, 3, "undo") == 3
+        db_session.commit()
+        db_session.expire_all()
+        ea = db_session.get(models.RawEntity, a.id)
+        assert (ea.primary_label, ea.entity_type) == ("old A", "Paper")
+        assert db_session.get(models.RawEntity, b.id).primary_label is None
+
+        assert engine.revert_log(db_session, 3, "redo") == 3
+        db_session.commit()
+        db_session.expire_all()
+        assert db_session.get(models.RawEntity, b.id).primary_label == "new B"
+
+    def test_other_logs_untouched(self, db_session):
+        a = _seed(db_session, primary_label="cur")
+        engine.write_change_records(db_session, 4, [
+            {"record_id": a.id, "field": "primary_label", "old_value": "log4", "new_value": "cur"},
+        ])
+        db_session.commit()
+        assert engine.revert_log(db_session, 5, "undo") == 0
+        db_session.expire_all()
+        assert db_session.get(models.RawEntity, a.id).primary_label == "cur"
+
+
+class TestUndoRedoEndpoints:
+    def test_round_trip(self, client, db_session, editor_headers):
+        e = _seed(db_session, primary_label=" A  b ", secondary_label="c  d")
+        log_id = client.post(
+            "/harmonization/apply/normalize_labels", headers=editor_headers
+        ).json()["log_id"]
+
+        u = client.post(f"/harmonization/undo/{log_id}", headers=editor_headers)
+        assert u.status_code == 200
+        assert u.json()["records_restored"] == 2
+        db_session.expire_all()
+        ent = db_session.get(models.RawEntity, e.id)
+        assert (ent.primary_label, ent.secondary_label) == (" A  b ", "c  d")
+
+        r = client.post(f"/harmonization/redo/{log_id}", headers=editor_headers)
+        assert r.status_code == 200
+        db_session.expire_all()
+        ent = db_session.get(models.RawEntity, e.id)
+        assert (ent.primary_label, ent.secondary_label) == ("A b", "c d")
+
+    def test_undo_without_records_rejected(self, client, db_session, editor_headers):
+        log = models.HarmonizationLog(step_id="legacy", step_name="Legacy", records_updated=3)
+        db_session.add(log)
+        db_session.commit()
+        r = client.post(f"/harmonization/undo/{log.id}", headers=editor_headers)
+        assert r.status_code == 400
@@ -0,0 +1,109 @@
+"""
+Sprint 95 — Fused single-pass harmonization pipeline.
+
+  - Python step equivalents agree with the SQL expressions for every step,
+    field and edge value (NULL, empty, whitespace-only, non-ASCII)
+  - run_pipeline applies all steps per row across chunks, attributing changes per step
+  - POST /harmonization/apply-all uses the pipeline; per-step undo still works
+"""
+from __future__ import annotations
+
+import pytest
+from sqlalchemy import select
+
+from backend import models
+from backend.harmonization import engine, pipeline
+
+_entities = models.RawEntity.__table__
+
+
+def _seed(db, **kwargs):
+    e = models.RawEntity(**kwargs)
+    db.add(e)
+    db.commit()
+    db.refresh(e)
+    return e
+
+
+# NULL, empty, whitespace-only (incl. tab / newline / NBSP), clean values and
+# non-ASCII case folding
+_EDGE_VALUES = [
+    None, "", " ", "\t\n", "\u00a0x\u00a0", "  a \t b\n", "clean", " Q1 ",
+    " ÉTUDE ", "Straße", "İstanbul", "ÀB  çD", "pending",
+]
+
+
+@pytest.mark.parametrize("step_id", sorted(engine.SQL_STEPS))
+def test_every_step_defines_both_forms(step_id):
+    step = engine.SQL_STEPS[step_id]
+    assert step.fields and set(step.fields) == set(step.py)
+
+
+@pytest.mark.parametrize("step_id,field", [
+    (step_id, field) for step_id, step in sorted(engine.SQL_STEPS.items()) for field in step.fields
+])
+def test_python_and_sql_steps_agree(db_session, step_id, field):
+    step = engine.SQL_STEPS[step_id]
+    ids = [_seed(db_session, **{"primary_label": "p", field: v}).id for v in _EDGE_VALUES]
+    rows = dict(db_session.execute(
+        select(_entities.c.id, step.new_value(field)).where(_entities.c.id.in_(ids))
+    ).all())
+    sql_new = [rows[i] for i in ids]
+    assert sql_new == [step.py[field](v) for v in _EDGE_VALUES]
+
+
+class TestRunPipeline:
+    def test_single_pass_over_chunks(self, db_session):
+        ids = [
+            _seed(db_session, primary_label=f" L{i} ", entity_type="Paper", canonical_id=" ").id
+            for i in range(7)
+        ]
+        _seed(db_session, primary_label="clean", entity_type="paper", validation_status="ok")
+        steps = [engine.SQL_STEPS[s] for s in ("normalize_labels", "normalize_entity_types",
+                                               "normalize_canonical_ids")]
+        counts = pipeline.run_pipeline(
+            db_session, steps,
+            {"normalize_labels": 1, "normalize_entity_types": 2, "normalize_canonical_ids": 3},
+            chunk_size=3,
+        )
+        db_session.commit()
+        assert counts == {
+            "normalize_labels": {"primary_label": 7, "secondary_label": 0},
+            "normalize_entity_types": {"entity_type": 7},
+            "normalize_canonical_ids": {"canonical_id": 7},
+        }
+        db_session.expire_all()
+        e = db_session.get(models.RawEntity, ids[-1])
+        assert (e.primary_label, e.entity_type, e.canonical_id) == ("L6", "paper", None)
+        recs = db_session.query(models.HarmonizationChangeRecord).filter_by(log_id=2).all()
+        assert len(recs) == 7 and recs[0].old_value == "Paper"
+
+    def test_chained_steps_record_intermediate_values(self, db_session):
+        e = _seed(db_session, primary_label="x", entity_type=" X ")
+        chain = [
+            engine.SqlStep("strip", {}, {"entity_type": lambda v: v.strip()}),
+            engine.SqlStep("lower", {}, {"entity_type": lambda v: v.lower()}),
+        ]
+        pipeline.run_pipeline(db_session, chain, {"strip": 10, "lower": 11})
+        db_session.commit()
+        recs = {
+            r.log_id: (r.old_value, r.new_value)
+            for r in db_session.query(models.HarmonizationChangeRecord).filter_by(record_id=e.id)
+        }
+        assert recs == {10: (" X ", "X"), 11: ("X", "x")}
+
+
+class TestApplyAllEndpoint:
+    def test_apply_all_and_undo_one_step(self, client, db_session, editor_headers):
+        e = _seed(db_session, primary_label=" Title ", entity_type="BOOK")
+        r = client.post("/harmonization/apply-all", headers=editor_headers)
+        assert r.status_code == 200
+        results = {s["step_id"]: s for s in r.json()["results"]}
+        assert results["normalize_labels"]["records_updated"] == 1
+        assert results["normalize_entity_types"]["fields_modified"] == ["entity_type"]
+
+        log_id = results["normalize_entity_types"]["log_id"]
+        assert client.post(f"/harmonization/undo/{log_id}", headers=editor_headers).status_code == 200
+        db_session.expire_all()
+        ent = db_session.get(models.RawEntity, e.id)
+        assert (ent.primary_label, ent.entity_type) == ("Title", "BOOK")
@@ -0,0 +1,104 @@
+"""
+Sprint 96 — Compiled, vectorized transformation expressions.
+
+  - compile_expression caches and reuses one op chain per expression
+  - per-value, pandas and SQL evaluations agree
+  - apply pushes simple chains down to one UPDATE and vectorizes the rest
+"""
+from __future__ import annotations
+
+import pandas as pd
+import pytest
+from sqlalchemy import select
+
+from backend import models
+from backend.transformations import executor
+from backend.transformations.engine import compile_expression
+
+_VALUES = ["  Hello World ", "dr. who", "ÉCOLE normale", "a,b,c", "<b>x</b> &amp; y", "$1,234.5", "Dr. Smith"]
+
+_EXPRESSIONS = [
+    "value.trim()", "value.upper()", "value.lower()", "value.title()",
+    'value.replace("o","0")', 'value.prefix("Dr. ")', 'value.suffix(" PhD")',
+    "value.slice(1,4)", "value.slice(-3)", 'value.split(",")[1]', "value.strip_html()",
+    "value.to_number()", 'value.strip("$.")', "value.upper()[0]",
+]
+
+
+def _seed(db, **kwargs):
+    e = models.RawEntity(**kwargs)
+    db.add(e)
+    db.commit()
+    db.refresh(e)
+    return e
+
+
+def test_compile_is_cached():
+    assert compile_expression("value.trim()") is compile_expression("value.trim()")
+
+
+@pytest.mark.parametrize("expr", _EXPRESSIONS)
+def test_series_matches_per_value(expr):
+    compiled = compile_expression(expr)
+    vec = compiled.apply_series(pd.Series(_VALUES)).tolist()
+    assert vec == [compiled(v) for v in _VALUES]
+
+
+@pytest.mark.parametrize("expr", _EXPRESSIONS)
+def test_sql_matches_per_value(db_session, expr):
+    compiled = compile_expression(expr)
+    col = models.RawEntity.__table__.c.primary_label
+    sql_expr = compiled.sql(col)
+    if sql_expr is None:
+        pytest.skip("not pushed down")
+    for v in _VALUES:
+        _seed(db_session, primary_label=v)
+    got = db_session.execute(
+        select(sql_expr).order_by(models.RawEntity.__table__.c.id)
+    ).scalars().all()
+    assert got == [compiled(v) for v in _VALUES]
+
+
+def test_pushdown_coverage():
+    col = models.RawEntity.__table__.c.primary_label
+    pushed = {e for e in _EXPRESSIONS if compile_expression(e).sql(col) is not None}
+    assert {"value.trim()", "value.upper()", 'value.prefix("Dr. ")', "value.slice(1,4)"} <= pushed
+    assert "value.title()" not in pushed
+    assert "value.slice(-3)" not in pushed
+
+
+class TestExecutor:
+    def test_sql_path_counts_only_changed(self, db_session):
+        _seed(db_session, primary_label=" pad ", domain="science")
+        _seed(db_session, primary_label="clean", domain="science")
+        _seed(db_session, primary_label=" other ", domain="health")
+        res = executor.apply_transformation(
+            db_session, compile_expression("value.trim()"), "primary_label", 1, "science"
+        )
+        db_session.commit()
+        assert res.pushed_down and res.affected == 1 and res.scanned == 2
+        labels = {e.domain + ":" + e.primary_label for e in db_session.query(models.RawEntity)}
+        assert labels == {"science:pad", "science:clean", "health: other "}
+
+    def test_vectorized_path_in_chunks(self, db_session):
+        for i in range(7):
+            _seed(db_session, primary_label=f"name {i}" if i % 2 else f"Name {i}")
+        res = executor.apply_transformation(
+            db_session, compile_expression("value.title()"), "primary_label", 1, chunk_size=3
+        )
+        db_session.commit()
+        assert not res.pushed_down
+        assert res.scanned == 7 and res.affected == 3
+        db_session.expire_all()
+        assert all(e.primary_label.startswith("Name") for e in db_session.query(models.RawEntity))
+
+
+def test_apply_endpoint_reports_scan(client, db_session, auth_headers):
+    _seed(db_session, primary_label="abc", domain="default")
+    _seed(db_session, primary_label="ABC", domain="default")
+    r = client.post("/transformations/apply", json={
+        "field": "primary_label", "expression": "value.upper()",
+    }, headers=auth_headers)
+    assert r.status_code == 200
+    assert r.json()["affected"] == 1
+    assert r.json()["total_scanned"] == 2
@@ -0,0 +1,110 @@
+"""
+Sprint 97 — Chainable transformation pipelines and multi-field batches.
+
+  - value.trim().replace(...).title() parses into one op chain
+  - subscripts can appear mid-chain
+  - POST /transformations/apply-batch: one scan, one harmonization log
+"""
+from __future__ import annotations
+
+import pytest
+
+from backend import models
+from backend.transformations import executor
+from backend.transformations.engine import TransformError, apply_expression, compile_expression
+
+
+def _seed(db, **kwargs):
+    e = models.RawEntity(**kwargs)
+    db.add(e)
+    db.commit()
+    db.refresh(e)
+    return e
+
+
+class TestChains:
+    def test_chain_applies_left_to_right(self):
+        expr = 'value.trim().replace("_"," ").title()'
+        assert apply_expression(expr, "  deep_learning_lab ") == "Deep Learning Lab"
+        assert len(compile_expression(expr).ops) == 3
+
+    def test_subscript_mid_chain(self):
+        assert apply_expression('value.split(";")[1].trim().upper()', "a; b ;c") == "B"
+
+    def test_quoted_parens_inside_args(self):
+        assert apply_expression('value.replace(")", "]").lower()', "(A)") == "(a]"
+
+    @pytest.mark.parametrize("bad", [
+        "value.trim().", "value.trim()foo", "value.trim(", "value", "value.trim().nope()",
+    ])
+    def test_invalid_chains(self, bad):
+        with pytest.raises(TransformError):
+            compile_expression(bad)
+
+    def test_chain_pushdown_when_all_ops_are_sql(self):
+        col = models.RawEntity.__table__.c.primary_label
+        assert compile_expression('value.trim().upper().prefix("X-")').sql(col) is not None
+        assert compile_expression("value.trim().title()").sql(col) is None
+
+
+class TestBatchExecutor:
+    def test_multi_field_pushdown(self, db_session):
+        a = _seed(db_session, primary_label=" a ", entity_type="PAPER")
+        b = _seed(db_session, primary_label="b", entity_type=None)
+        res = executor.apply_transformations(db_session, [
+            ("primary_label", compile_expression("value.trim()")),
+            ("primary_label", compile_expression("value.upper()")),
+            ("entity_type", compile_expression("value.lower()")),
+        ], log_id=1)
+        db_session.commit()
+        db_session.expire_all()
+        assert res.pushed_down
+        assert res.per_field == {"primary_label": 2, "entity_type": 1}
+        assert res.affected == 2 and res.scanned == 2
+        ea, eb = db_session.get(models.RawEntity, a.id), db_session.get(models.RawEntity, b.id)
+        assert (ea.primary_label, ea.entity_type) == ("A", "paper")
+        assert (eb.primary_label, eb.entity_type) == ("B", None)
+
+    def test_multi_field_vectorized(self, db_session):
+        ids = [_seed(db_session, primary_label=f"n {i}", secondary_label="" if i else "x y").id
+               for i in range(5)]
+        res = executor.apply_transformations(db_session, [
+            ("primary_label", compile_expression("value.title()")),
+            ("secondary_label", compile_expression("value.title()")),
+        ], log_id=1, chunk_size=2)
+        db_session.commit()
+        db_session.expire_all()
+        assert not res.pushed_down
+        assert res.per_field == {"primary_label": 5, "secondary_label": 1}
+        e0 = db_session.get(models.RawEntity, ids[0])
+        assert (e0.primary_label, e0.secondary_label) == ("N 0", "X Y")
+        assert db_session.get(models.RawEntity, ids[1]).secondary_label == ""
+
+
+class TestBatchEndpoint:
+    def test_single_log_entry(self, client, db_session, auth_headers):
+        _seed(db_session, primary_label=" x ", entity_type="Paper", domain="default")
+        before = db_session.query(models.HarmonizationLog).count()
+        r = client.post("/transformations/apply-batch", json={"steps": [
+            {"field": "primary_label", "expression": "value.trim().upper()"},
+            {"field": "entity_type", "expression": "value.lower()"},
+        ]}, headers=auth_headers)
+        assert r.status_code == 200, r.text
+        assert r.json()["per_field"] == {"primary_label": 1, "entity_type": 1}
+        assert db_session.query(models.HarmonizationLog).count() == before + 1
+        hist = client.get("/transformations/history", headers=auth_headers).json()
+        assert hist[0]["params"]["field"] == "primary_label, entity_type"
+        assert len(hist[0]["params"]["steps"]) == 2
+
+    def test_invalid_step_rejected(self, client, auth_headers):
+        r = client.post("/transformations/apply-batch", json={"steps": [
+            {"field": "primary_label", "expression": "value.trim()"},
+            {"field": "id", "expression": "value.trim()"},
+        ]}, headers=auth_headers)
+        assert r.status_code == 422
+
+    def test_requires_editor(self, client, viewer_headers):
+        r = client.post("/transformations/apply-batch", json={"steps": [
+            {"field": "primary_label", "expression": "value.trim()"},
+        ]}, headers=viewer_headers)
+        assert r.status_code == 403
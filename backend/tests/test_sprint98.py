@@ -0,0 +1,82 @@
+"""
+Sprint 98 — Diff-only undo data for transformations.
+
+  - only changed (record, field) pairs are stored, in harmonization_change_records
+  - HarmonizationLog.details holds a small sample, not a full snapshot
+  - /harmonization/undo reverts pushed-down and vectorized transformations
+"""
+from __future__ import annotations
+
+import json
+
+from backend import models
+
+
+def _seed(db, **kwargs):
+    e = models.RawEntity(**kwargs)
+    db.add(e)
+    db.commit()
+    db.refresh(e)
+    return e
+
+
+def _apply(client, headers, expression, field="primary_label"):
+    r = client.post("/transformations/apply", json={
+        "field": field, "expression": expression,
+    }, headers=headers)
+    assert r.status_code == 200, r.text
+    return r.json()
+
+
+class TestDiffOnlySnapshot:
+    def test_only_changed_rows_recorded(self, client, db_session, auth_headers):
+        changed = _seed(db_session, primary_label="abc")
+        for i in range(10):
+            _seed(db_session, primary_label=f"UNCHANGED {i}")
+        body = _apply(client, auth_headers, "value.upper()")
+        assert body["affected"] == 1 and body["total_scanned"] == 11
+
+        records = db_session.query(models.HarmonizationChangeRecord).filter_by(
+            log_id=body["log_id"]
+        ).all()
+        assert [(r.record_id, r.old_value, r.new_value) for r in records] == [
+            (changed.id, "abc", "ABC")
+        ]
+        log = db_session.get(models.HarmonizationLog, body["log_id"])
+        assert json.loads(log.details) == {"sample": [{
+            "record_id": changed.id, "field": "primary_label",
+            "old_value": "abc", "new_value": "ABC",
+        }]}
+
+
+class TestTransformationUndo:
+    def test_undo_pushed_down(self, client, db_session, auth_headers, editor_headers):
+        e = _seed(db_session, primary_label="  spaced  ")
+        body = _apply(client, auth_headers, "value.trim()")
+        r = client.post(f"/harmonization/undo/{body['log_id']}", headers=editor_headers)
+        assert r.status_code == 200
+        assert r.json()["records_restored"] == 1
+        db_session.expire_all()
+        assert db_session.get(models.RawEntity, e.id).primary_label == "  spaced  "
+
+    def test_undo_vectorized_batch(self, client, db_session, auth_headers, editor_headers):
+        e = _seed(db_session, primary_label="deep learning", entity_type="Paper Type")
+        r = client.post("/transformations/apply-batch", json={"steps": [
+            {"field": "primary_label", "expression": "value.title()"},
+            {"field": "entity_type", "expression": 'value.split(" ")[0].lower()'},
+        ]}, headers=auth_headers)
+        log_id = r.json()["log_id"]
+        db_session.expire_all()
+        ent = db_session.get(models.RawEntity, e.id)
+        assert (ent.primary_label, ent.entity_type) == ("Deep Learning", "paper")
+
+        u = client.post(f"/harmonization/undo/{log_id}", headers=editor_headers)
+        assert u.status_code == 200
+        assert u.json()["records_restored"] == 2
+        db_session.expire_all()
+        ent = db_session.get(models.RawEntity, e.id)
+        assert (ent.primary_label, ent.entity_type) == ("deep learning", "Paper Type")
+
+        client.post(f"/harmonization/redo/{log_id}", headers=editor_headers)
+        db_session.expire_all()
+        assert db_session.get(models.RawEntity, e.id).primary_label == "Deep Learning"
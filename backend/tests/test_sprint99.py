@@ -0,0 +1,69 @@
+"""
+Sprint 99 — Sampled previews with exact / estimated affected counts.
+
+  - pushed-down expressions count exactly with SQL
+  - small candidate sets are evaluated exactly; large ones are estimated from a sample
+  - preview endpoints expose total_affected without loading every row
+"""
+from __future__ import annotations
+
+from backend import models
+from backend.transformations import executor
+from backend.transformations.engine import compile_expression
+
+
+def _bulk(db, labels, **kwargs):
+    db.add_all(models.RawEntity(primary_label=l, **kwargs) for l in labels)
+    db.commit()
+
+
+class TestCountAffected:
+    def test_pushdown_is_exact(self, db_session):
+        _bulk(db_session, ["a", "B", "c", ""])
+        res = executor.count_affected(db_session, compile_expression("value.upper()"), "primary_label")
+        assert (res.candidates, res.affected, res.estimated) == (3, 2, False)
+
+    def test_small_set_exact_without_pushdown(self, db_session):
+        _bulk(db_session, ["one two", "One Two", "three"])
+        res = executor.count_affected(db_session, compile_expression("value.title()"), "primary_label")
+        assert (res.affected, res.estimated) == (2, False)
+
+    def test_large_set_estimated(self, db_session, monkeypatch):
+        monkeypatch.setattr(executor, "_SAMPLE_WINDOWS", 5)
+        _bulk(db_session, [f"item {i}" if i % 2 else f"Item {i}" for i in range(400)])
+        res = executor.count_affected(
+            db_session, compile_expression("value.title()"), "primary_label", sample_size=100
+        )
+        assert res.estimated
+        assert res.candidates == 400
+        assert 120 <= res.affected <= 280
+
+    def test_domain_filter(self, db_session):
+        _bulk(db_session, ["x", "y"], domain="science")
+        _bulk(db_session, ["z"], domain="health")
+        res = executor.count_affected(
+            db_session, compile_expression("value.upper()"), "primary_label", "health"
+        )
+        assert (res.candidates, res.affected) == (1, 1)
+
+
+class TestPreviewEndpoints:
+    def test_transformation_preview_counts(self, client, db_session, auth_headers):
+        _bulk(db_session, [f"v{i}" for i in range(30)] + ["V99"])
+        r = client.post("/transformations/preview", json={
+            "field": "primary_label", "expression": "value.upper()",
+        }, headers=auth_headers)
+        assert r.status_code == 200
+        body = r.json()
+        assert body["sample_size"] == 20
+        assert body["total_candidates"] == 31
+        assert body["total_affected"] == 30
+        assert body["affected_estimated"] is False
+
+    def test_harmonization_preview_caps_changes(self, client, db_session, editor_headers):
+        _bulk(db_session, [f" pad {i} " for i in range(250)])
+        r = client.post("/harmonization/preview/normalize_labels", headers=editor_headers)
+        body = r.json()
+        assert body["total_affected"] == 250
+        assert len(body["changes"]) == 200
+        assert body["affected_estimated"] is False
@@ -15,23 +15,39 @@ Supported expressions (case-insensitive function names):
   value.slice(0,10)          — substring [start:end]
   value.strip("chars")       — strip specific characters
 
+Calls can be chained and are applied left to right:
+  value.trim().replace("  "," ").title()
+  value.split(";")[0].trim().lower()
+
 No eval(), no exec(), no import. Pure regex parse + dispatch.
+
+Expressions are compiled once (compile_expression) into an op chain that can
+be evaluated per value, vectorized over a pandas Series, or — for trim,
+upper, lower, replace, prefix, suffix and non-negative slice — pushed down
+to SQL as a single set-based UPDATE.
 """
 import re
 import html
-from typing import Any, Optional
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Optional
+
+from sqlalchemy import and_, case, func, literal
+from sqlalchemy.sql.elements import ColumnElement
+
+from backend.harmonization.engine import strip_ws, unicode_lower, unicode_upper
+
+if TYPE_CHECKING:
+    import pandas as pd
 
 
 # ── Expression parsing ─────────────────────────────────────────────────────────
 
-# Matches: value.funcname(args)
-_EXPR_RE = re.compile(
-    r"^value\s*\.\s*([a-zA-Z_][a-zA-Z0-9_]*)\s*\((.*)\)\s*$",
-    re.DOTALL,
-)
+# Matches one chained call head: .funcname(
+_CALL_RE = re.compile(r'\s*\.\s*([a-zA-Z_][a-zA-Z0-9_]*)\s*\(')
 
-# Matches: ["..."] or [N] subscript after base expression
-_SUBSCRIPT_RE = re.compile(r'^(.*)\[([^\]]+)\]\s*$', re.DOTALL)
+# Matches an optional [N] subscript after a call
+_INDEX_RE = re.compile(r'\s*\[([^\]]+)\]')
 
 # Matches quoted string: "..." or '...'
 _QSTR_RE = re.compile(r'^["\'](.*)["\']\s*$', re.DOTALL)
@@ -87,124 +103,278 @@ def _split_args(raw: str) -> list[str]:
     return args
 
 
-def _apply_func(func_name: str, args_raw: str, value: str) -> str:
-    """Dispatch a single function call on value."""
+# ── Compiled operations ────────────────────────────────────────────────────────
+#
+# An expression is parsed once into a tuple of _Op. Each op has three
+# equivalent implementations:
+#   py     — per-value Python (the reference semantics)
+#   series — pandas .str vectorized form over a whole chunk of values
+#   sql    — SQLAlchemy expression, or None when the dialect-portable SQL
+#            cannot reproduce the Python semantics exactly
+
+_SUPPORTED = (
+    "trim, upper, lower, title, replace, prefix, suffix, strip_html, "
+    "to_number, slice, split, strip"
+)
+_HTML_TAG_RE = re.compile(r'<[^>]+>')
+_NON_NUMERIC_RE = re.compile(r'[^\d.\-]')
+
+
+def _py_strip_html(value: str) -> str:
+    return html.unescape(_HTML_TAG_RE.sub('', value)).strip()
+
+
+def _py_to_number(value: str) -> str:
+    cleaned = _NON_NUMERIC_RE.sub('', value)
+    try:
+        float(cleaned)
+        return cleaned
+    except ValueError:
+        return ""
+
+
+def _py_index(parts: list, i: int) -> str:
+    try:
+        return parts[i]
+    except IndexError:
+        return ""
+
+
+@dataclass(frozen=True)
+class _Op:
+    name: str
+    args: tuple = ()
+
+    def py(self, v: str) -> str:
+        n, a = self.name, self.args
+        if n == "trim":
+            return v.strip()
+        if n == "upper":
+            return v.upper()
+        if n == "lower":
+            return v.lower()
+        if n == "title":
+            return v.title()
+        if n == "replace":
+            return v.replace(a[0], a[1])
+        if n == "prefix":
+            return v if v.startswith(a[0]) else a[0] + v
+        if n == "suffix":
+            return v if v.endswith(a[0]) else v + a[0]
+        if n == "strip_html":
+            return _py_strip_html(v)
+        if n == "to_number":
+            return _py_to_number(v)
+        if n == "slice":
+            return v[a[0]:a[1]]
+        if n == "strip":
+            return v.strip(a[0])
+        if n == "split_index":
+            return _py_index(v.split(a[0]), a[1]).strip()
+        if n == "word_index":
+            return _py_index(v.split(), a[0])
+        return v  # split() without subscript is the identity
+
+    def series(self, s: "pd.Series") -> "pd.Series":
+        n, a = self.name, self.args
+        if n == "trim":
+            return s.str.strip()
+        if n == "upper":
+            return s.str.upper()
+        if n == "lower":
+            return s.str.lower()
+        if n == "title":
+            return s.str.title()
+        if n == "replace" and a[0]:
+            return s.str.replace(a[0], a[1], regex=False)
+        if n == "prefix":
+            return s.where(s.str.startswith(a[0]), a[0] + s)
+        if n == "suffix":
+            return s.where(s.str.endswith(a[0]), s + a[0])
+        if n == "slice":
+            return s.str.slice(a[0], a[1])
+        if n == "strip":
+            return s.str.strip(a[0])
+        if n == "split_index":
+            return s.str.split(a[0], regex=False).str.get(a[1]).fillna("").str.strip()
+        if n == "split":
+            return s
+        return s.map(self.py)
+
+    def sql(self, col: ColumnElement) -> Optional[ColumnElement]:
+        n, a = self.name, self.args
+        if n == "trim":
+            return strip_ws(col)
+        if n == "upper":
+            return unicode_upper(col)
+        if n == "lower":
+            return unicode_lower(col)
+        if n == "replace" and a[0]:
+            return func.replace(col, a[0], a[1])
+        if n == "prefix":
+            return case((func.substr(col, 1, len(a[0])) == a[0], col), else_=literal(a[0]) + col)
+        if n == "suffix":
+            k = len(a[0])
+            ends = and_(func.length(col) >= k, func.substr(col, func.length(col) - k + 1) == a[0])
+            return case((ends, col), else_=col + literal(a[0]))
+        if n == "slice":
+            start, end = a
+            if start < 0 or (end is not None and end < 0):
+                return None
+            if end is None:
+                return func.substr(col, start + 1)
+            return func.substr(col, start + 1, max(end - start, 0))
+        if n == "split":
+            return col
+        return None
+
+
+def _compile_call(func_name: str, args_raw: str) -> _Op:
+    """Validate one call's arguments and turn it into an _Op."""
     fn = func_name.lower()
     args = _split_args(args_raw) if args_raw.strip() else []
 
-    if fn == "trim":
-        return value.strip()
-    elif fn == "upper":
-        return value.upper()
-    elif fn == "lower":
-        return value.lower()
-    elif fn == "title":
-        return value.title()
-    elif fn == "replace":
+    if fn in ("trim", "upper", "lower", "title", "strip_html", "to_number"):
+        return _Op(fn)
+    if fn == "replace":
         if len(args) != 2:
             raise TransformError("replace() requires exactly 2 arguments: replace('old','new')")
-        old = _parse_str_arg(args[0])
-        new = _parse_str_arg(args[1])
-        return value.replace(old, new)
-    elif fn == "prefix":
-        if len(args) != 1:
-            raise TransformError("prefix() requires exactly 1 argument")
-        pfx = _parse_str_arg(args[0])
-        return pfx + value if not value.startswith(pfx) else value
-    elif fn == "suffix":
+        return _Op(fn, (_parse_str_arg(args[0]), _parse_str_arg(args[1])))
+    if fn in ("prefix", "suffix"):
         if len(args) != 1:
-            raise TransformError("suffix() requires exactly 1 argument")
-        sfx = _parse_str_arg(args[0])
-        return value + sfx if not value.endswith(sfx) else value
-    elif fn == "strip_html":
-        text = re.sub(r'<[^>]+>', '', value)
-        return html.unescape(text).strip()
-    elif fn == "to_number":
-        cleaned = re.sub(r'[^\d.\-]', '', value)
-        try:
-            float(cleaned)
-            return cleaned
-        except ValueError:
-            return ""
-    elif fn == "slice":
+            raise TransformError(f"{fn}() requires exactly 1 argument")
+        return _Op(fn, (_parse_str_arg(args[0]),))
+    if fn == "slice":
         if len(args) not in (1, 2):
             raise TransformError("slice() requires 1 or 2 integer arguments: slice(start) or slice(start,end)")
         start = _parse_int_arg(args[0])
         end = _parse_int_arg(args[1]) if len(args) == 2 else None
-        return value[start:end]
-    elif fn == "split":
+        return _Op(fn, (start, end))
+    if fn == "split":
         if len(args) != 1:
             raise TransformError("split() requires exactly 1 argument: split(',')")
-        delim = _parse_str_arg(args[0])
-        # Returns the full list as a pipe-joined string; subscript applied after
-        return delim.join(value.split(delim))  # returns original — subscript handles indexing
-    elif fn == "strip":
-        if len(args) == 0:
-            return value.strip()
-        chars = _parse_str_arg(args[0])
-        return value.strip(chars)
-    else:
-        raise TransformError(
-            f"Unknown function '{func_name}'. Supported: trim, upper, lower, title, "
-            "replace, prefix, suffix, strip_html, to_number, slice, split, strip"
-        )
-
-
-def apply_expression(expr: str, value: Any) -> str:
+        return _Op(fn, (_parse_str_arg(args[0]),))
+    if fn == "strip":
+        if not args:
+            return _Op("trim")
+        return _Op(fn, (_parse_str_arg(args[0]),))
+    raise TransformError(f"Unknown function '{func_name}'. Supported: {_SUPPORTED}")
+
+
+@dataclass(frozen=True)
+class CompiledExpression:
+    """An expression parsed once into an op chain; see compile_expression()."""
+    source: str
+    ops: tuple
+
+    def __call__(self, value: Any) -> str:
+        if value is None:
+            return ""
+        value = str(value)
+        for op in self.ops:
+            value = op.py(value)
+        return value
+
+    def apply_series(self, values: "pd.Series") -> "pd.Series":
+        """Vectorized evaluation over a Series of non-null strings."""
+        out = values.astype(str)
+        for op in self.ops:
+            out = op.series(out)
+        return out
+
+    def sql(self, col: ColumnElement) -> Optional[ColumnElement]:
+        """SQL equivalent of the whole chain, or None if any op can't be pushed down."""
+        expr = col
+        for op in self.ops:
+            expr = op.sql(expr)
+            if expr is None:
+                return None
+        return expr
+
+
+def _invalid(expr: str) -> TransformError:
+    return TransformError(
+        f"Invalid expression: {expr!r}. Must be value.function(args) — "
+        "e.g. value.trim(), value.replace('old','new'), value.trim().title()"
+    )
+
+
+def _parse_calls(expr: str) -> list[tuple[str, str, Optional[int]]]:
+    """Split `value.f(a).g(b)[i]…` into (name, raw_args, subscript) triples."""
+    if not expr.startswith("value"):
+        raise _invalid(expr)
+    calls = []
+    pos = len("value")
+    while expr[pos:].strip():
+        m = _CALL_RE.match(expr, pos)
+        if not m:
+            raise _invalid(expr)
+        pos = start = m.end()
+        depth, quote = 1, None
+        while pos < len(expr):
+            ch = expr[pos]
+            if quote:
+                if ch == quote:
+                    quote = None
+            elif ch in ('"', "'"):
+                quote = ch
+            elif ch == '(':
+                depth += 1
+            elif ch == ')':
+                depth -= 1
+                if depth == 0:
+                    break
+            pos += 1
+        if depth:
+            raise _invalid(expr)
+        args_raw = expr[start:pos]
+        pos += 1
+        index = None
+        sub = _INDEX_RE.match(expr, pos)
+        if sub:
+            index = _parse_int_arg(sub.group(1))
+            pos = sub.end()
+        calls.append((m.group(1), args_raw, index))
+    if not calls:
+        raise _invalid(expr)
+    return calls
+
+
+@lru_cache(maxsize=256)
+def compile_expression(expr: str) -> CompiledExpression:
     """
-    Parse and evaluate a transformation expression on a single value.
-    Returns the transformed string.
+    Parse an expression — a single call or a chain such as
+    value.trim().replace("a","b").title() — into a CompiledExpression.
     Raises TransformError on invalid expressions.
     """
-    if value is None:
-        return ""
-    value = str(value)
-
-    expr = expr.strip()
-
-    # Check for subscript: value.split(",")[0]
-    sub_match = _SUBSCRIPT_RE.match(expr)
-    subscript_index: Optional[int] = None
-    if sub_match:
-        inner_expr = sub_match.group(1).strip()
-        idx_raw = sub_match.group(2).strip()
-        subscript_index = _parse_int_arg(idx_raw)
-        expr = inner_expr
-
-    # Parse main expression: value.funcname(args)
-    m = _EXPR_RE.match(expr)
-    if not m:
-        raise TransformError(
-            f"Invalid expression: {expr!r}. Must be value.function(args) — "
-            "e.g. value.trim(), value.replace('old','new')"
-        )
+    ops = []
+    for name, args_raw, index in _parse_calls(expr.strip()):
+        op = _compile_call(name, args_raw)
+        if index is None:
+            ops.append(op)
+        elif op.name == "split":
+            ops.append(_Op("split_index", (op.args[0], index)))
+        else:
+            # Subscript on a non-list result indexes whitespace-separated words
+            ops.extend((op, _Op("word_index", (index,))))
+    return CompiledExpression(expr, tuple(ops))
 
-    func_name = m.group(1)
-    args_raw = m.group(2)
 
-    # For split with subscript, handle specially
-    if func_name.lower() == "split" and subscript_index is not None:
-        args = _split_args(args_raw)
-        if len(args) != 1:
-            raise TransformError("split() requires exactly 1 argument")
-        delim = _parse_str_arg(args[0])
-        parts = value.split(delim)
-        try:
-            return parts[subscript_index].strip()
-        except IndexError:
-            return ""
+def compose(expressions: list[CompiledExpression]) -> CompiledExpression:
+    """Chain several compiled expressions into one (applied left to right)."""
+    return CompiledExpression(
+        " | ".join(e.source for e in expressions),
+        tuple(op for e in expressions for op in e.ops),
+    )
 
-    result = _apply_func(func_name, args_raw, value)
-
-    # Apply subscript to generic result (list-like operations)
-    if subscript_index is not None:
-        parts = result.split()  # fallback
-        try:
-            return parts[subscript_index]
-        except IndexError:
-            return ""
 
-    return result
+def apply_expression(expr: str, value: Any) -> str:
+    """
+    Evaluate a transformation expression on a single value.
+    Returns the transformed string.
+    Raises TransformError on invalid expressions.
+    """
+    return compile_expression(expr)(value)
 
 
 def validate_expression(expr: str) -> None:
@@ -212,7 +382,7 @@ def validate_expression(expr: str) -> None:
     Validate an expression without applying it.
     Raises TransformError if invalid.
     """
-    apply_expression(expr, "test_value")
+    compile_expression(expr)
 
 
 # ── ALLOWED FIELDS (columns on RawEntity that can be transformed) ─────────────
@@ -0,0 +1,243 @@
+"""
+Bulk execution of compiled transformation expressions over raw_entities.
+
+A batch maps one or more fields to a compiled expression chain (several
+steps on the same field are composed into one chain). Two paths:
+
+  SQL        — every chain has a SQL form: one
+               UPDATE raw_entities SET f1 = <e1>, f2 = <e2> … WHERE any changed
+  vectorized — otherwise: id + batch fields are read in id-keyset chunks,
+               each field is transformed with pandas .str ops, and only
+               changed rows are written back with one executemany per chunk.
+
+Either way no ORM entities are loaded and values are read at most once.
+Only non-empty values are transformed; NULL / '' are left untouched.
+
+Undo data is diff-only: one harmonization_change_records row per changed
+(record, field) — captured with INSERT … SELECT on the SQL path and with a
+per-chunk executemany on the vectorized path — so /harmonization/undo can
+revert a transformation with a set-based UPDATE … FROM.
+"""
+from __future__ import annotations
+
+import random
+from dataclasses import dataclass, field as dc_field
+from typing import Optional, Sequence
+
+import pandas as pd
+from sqlalchemy import and_, bindparam, case, func, insert, literal, or_, select, update
+from sqlalchemy.orm import Session
+
+from backend import models
+from backend.harmonization.engine import write_change_records
+from backend.transformations.engine import CompiledExpression, compose
+
+_entities = models.RawEntity.__table__
+_changes = models.HarmonizationChangeRecord.__table__
+
+TRANSFORM_CHUNK = 5_000
+ESTIMATE_SAMPLE = 2_000   # values evaluated when a preview count must be estimated
+_SAMPLE_WINDOWS = 20      # random id windows the estimate sample is drawn from
+
+
+@dataclass
+class TransformResult:
+    affected: int = 0
+    scanned: int = 0
+    pushed_down: bool = False
+    per_field: dict = dc_field(default_factory=dict)
+
+
+def _non_empty(field: str):
+    col = _entities.c[field]
+    return and_(col.is_not(None), col != "")
+
+
+def _read_chunks(db: Session, fields: list[str], conds: list, chunk_size: int):
+    """Yield DataFrames of (id, *fields) in ascending id order."""
+    cols = [_entities.c.id] + [_entities.c[f] for f in fields]
+    last_id = 0
+    while True:
+        rows = db.execute(
+            select(*cols)
+            .where(*conds, _entities.c.id > last_id)
+            .order_by(_entities.c.id)
+            .limit(chunk_size)
+        ).all()
+        if not rows:
+            return
+        last_id = rows[-1][0]
+        yield pd.DataFrame(rows, columns=["id", *fields])
+
+
+def apply_transformations(
+    db: Session,
+    steps: Sequence[tuple[str, CompiledExpression]],
+    log_id: int,
+    domain_id: Optional[str] = None,
+    chunk_size: int = TRANSFORM_CHUNK,
+) -> TransformResult:
+    """
+    Apply a batch of (field, expression) steps in one scan, recording changed
+    values under `log_id`. Does not commit.
+    """
+    chains: dict[str, list[CompiledExpression]] = {}
+    for f, compiled in steps:
+        chains.setdefault(f, []).append(compiled)
+    batch = {f: exprs[0] if len(exprs) == 1 else compose(exprs) for f, exprs in chains.items()}
+    fields = list(batch)
+
+    conds = [or_(*[_non_empty(f) for f in fields])]
+    if domain_id:
+        conds.append(_entities.c.domain == domain_id)
+    result = TransformResult(per_field={f: 0 for f in fields})
+
+    sql_new = {f: batch[f].sql(_entities.c[f]) for f in fields}
+    pushdown = all(e is not None for e in sql_new.values())
+
+    if pushdown:
+        result.scanned = db.execute(
+            select(func.count()).select_from(_entities).where(*conds)
+        ).scalar() or 0
+        changed = {
+            f: and_(_non_empty(f), sql_new[f] != _entities.c[f]) for f in fields
+        }
+        for f in fields:
+            captured = db.execute(
+                insert(_changes).from_select(
+                    ["log_id", "record_id", "field", "old_value", "new_value"],
+                    select(
+                        literal(log_id), _entities.c.id, literal(f),
+                        _entities.c[f], sql_new[f],
+                    ).where(*conds, changed[f]),
+                )
+            )
+            result.per_field[f] = captured.rowcount or 0
+        res = db.execute(
+            update(_entities)
+            .where(*conds, or_(*changed.values()))
+            .values({
+                f: case((_non_empty(f), sql_new[f]), else_=_entities.c[f]) for f in fields
+            })
+            .execution_options(synchronize_session=False)
+        )
+        result.affected = res.rowcount or 0
+        result.pushed_down = True
+        return result
+
+    stmt = (
+        update(_entities)
+        .where(_entities.c.id == bindparam("_id"))
+        .values({f: bindparam(f"_{f}") for f in fields})
+    )
+    for chunk in _read_chunks(db, fields, conds, chunk_size):
+        result.scanned += len(chunk)
+        new = chunk.copy()
+        any_changed = pd.Series(False, index=chunk.index)
+        changes: list[dict] = []
+        for f in fields:
+            mask = chunk[f].notna() & (chunk[f] != "")
+            if not mask.any():
+                continue
+            transformed = batch[f].apply_series(chunk.loc[mask, f])
+            changed = transformed != chunk.loc[mask, f]
+            idx = changed[changed].index
+            new.loc[idx, f] = transformed[changed]
+            any_changed |= changed.reindex(chunk.index, fill_value=False)
+            result.per_field[f] += len(idx)
+            changes.extend(
+                {"record_id": int(i), "field": f,
+                 "old_value": old, "new_value": nv}
+                for i, old, nv in zip(chunk.loc[idx, "id"], chunk.loc[idx, f], new.loc[idx, f])
+            )
+        if not any_changed.any():
+            continue
+        db.execute(stmt, [
+            {"_id": int(row[0]), **{f"_{f}": v for f, v in zip(fields, row[1:])}}
+            for row in new[any_changed].itertuples(index=False)
+        ])
+        write_change_records(db, log_id, changes)
+        result.affected += int(any_changed.sum())
+    return result
+
+
+def apply_transformation(
+    db: Session,
+    compiled: CompiledExpression,
+    field: str,
+    log_id: int,
+    domain_id: Optional[str] = None,
+    chunk_size: int = TRANSFORM_CHUNK,
+) -> TransformResult:
+    """Single-field convenience wrapper around apply_transformations()."""
+    return apply_transformations(db, [(field, compiled)], log_id, domain_id, chunk_size)
+
+
+# ── Preview counts ────────────────────────────────────────────────────────────
+
+@dataclass
+class AffectedCount:
+    candidates: int
+    affected: int
+    estimated: bool
+
+
+def _sample_values(db: Session, field: str, conds: list, size: int) -> pd.Series:
+    """~size values drawn from random id windows (index range scans only)."""
+    ids = _entities.c.id
+    lo, hi = db.execute(select(func.min(ids), func.max(ids)).where(*conds)).one()
+    if lo is None:
+        return pd.Series([], dtype=object)
+    per_window = max(size // _SAMPLE_WINDOWS, 1)
+    seen: dict[int, str] = {}
+    for start in sorted(random.randint(lo, hi) for _ in range(_SAMPLE_WINDOWS)):
+        rows = db.execute(
+            select(ids, _entities.c[field])
+            .where(*conds, ids >= start)
+            .order_by(ids)
+            .limit(per_window)
+        ).all()
+        seen.update(rows)
+    return pd.Series(list(seen.values()), dtype=object)
+
+
+def count_affected(
+    db: Session,
+    compiled: CompiledExpression,
+    field: str,
+    domain_id: Optional[str] = None,
+    sample_size: int = ESTIMATE_SAMPLE,
+) -> AffectedCount:
+    """
+    How many non-empty `field` values `compiled` would change. Exact (SQL
+    COUNT) when the expression pushes down or the candidate set is no larger
+    than sample_size; otherwise extrapolated from a random sample and flagged
+    as an estimate.
+    """
+    col = _entities.c[field]
+    conds = [_non_empty(field)]
+    if domain_id:
+        conds.append(_entities.c.domain == domain_id)
+
+    def _count(*extra) -> int:
+        return db.execute(
+            select(func.count()).select_from(_entities).where(*conds, *extra)
+        ).scalar() or 0
+
+    candidates = _count()
+    sql_new = compiled.sql(col)
+    if sql_new is not None:
+        return AffectedCount(candidates, _count(sql_new != col), estimated=False)
+
+    if candidates <= sample_size:
+        values = pd.Series(db.execute(select(col).where(*conds)).scalars().all(), dtype=object)
+        estimated = False
+    else:
+        values = _sample_values(db, field, conds, sample_size)
+        estimated = True
+    if values.empty:
+        return AffectedCount(candidates, 0, estimated)
+
+    changed = int((compiled.apply_series(values) != values).sum())
+    affected = changed if not estimated else round(changed / len(values) * candidates)
+    return AffectedCount(candidates, affected, estimated)
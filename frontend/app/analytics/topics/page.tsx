@@ -24,6 +24,7 @@ interface CooccPair {
   concept_b: string;
   count: number;
   pmi: number;
+  npmi: number;
 }
 
 interface CooccResult {
@@ -55,12 +56,16 @@ interface Correlation {
   field_b: string;
   cramers_v: number;
   strength: "weak" | "moderate" | "strong";
+  ci_low: number | null;
+  ci_high: number | null;
 }
 
 interface CorrelationResult {
   domain_id: string;
   n_entities: number;
   fields_analyzed: number;
+  sampled: boolean;
+  rows_analyzed: number;
   correlations: Correlation[];
 }
 